@@ -0,0 +1,218 @@
+"""Time the hot paths against a (synthetic) database and track regressions.
+
+    python benchmarks/synthetic_data.py --db bench.db --patients 100000 --orders 1000000
+    python benchmarks/bench_hot_paths.py --db bench.db --repeat 5
+
+Each case runs once to warm up and then ``--repeat`` times. The decrypt
+cache is cleared before every run, so each one measures a cold tab load.
+Every invocation appends a line to the history file: git commit, dataset
+size and the per-case timings. Cases are then compared with the latest
+earlier entry for the same dataset size that has a different commit, or
+with ``--baseline <commit>``. A median that is more than ``--threshold``
+slower is reported as a regression. ``--fail-on-regression`` turns that
+into exit status 1.
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from synthetic_data import scratch_db_path
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_HISTORY = os.path.join(ROOT, 'bench_history.jsonl')
+PATIENT_SEARCHES = [('name', 'kumar'), ('name', 'pri'), ('contact', '98765')]
+REPORT_GROUPS = 20
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class Cases:
+    """The benchmarked operations; every public method is one case."""
+
+    def __init__(self, app, workdir):
+        from sqlalchemy import select, func
+        from database import Session
+        from models import Order, Patient, Result
+
+        self.app = app
+        self.workdir = workdir
+        with Session() as session:
+            self.dataset = {
+                'patients': session.execute(select(func.count(Patient.id))).scalar(),
+                'orders': session.execute(select(func.count(Order.id))).scalar(),
+                'results': session.execute(select(func.count(Result.id))).scalar(),
+            }
+            # ResultTab opens on the last 7 days; an old dataset leaves it (and the dashboard) empty
+            self.recent_orders = session.execute(select(func.count(Order.id)).where(
+                Order.order_date >= datetime.datetime.now() - datetime.timedelta(days=7))).scalar()
+            # Recent completed visits, as printed from the Reports tab
+            groups = session.execute(
+                select(Order.group_id).join(Order.results).where(Order.group_id.isnot(None))
+                .group_by(Order.group_id).order_by(Order.group_id.desc()).limit(REPORT_GROUPS)).scalars().all()
+            self.visits = [session.execute(select(Order.id).where(Order.group_id == g).order_by(Order.id))
+                           .scalars().all() for g in groups]
+        Session.remove()
+        self.result_tab = None
+
+    def dashboard_refresh(self):
+        from database import Session
+        from ui.tabs.dashboard import DataUpdateThread
+        thread = DataUpdateThread()
+        with Session() as session:
+            thread.full_refresh(session)
+        Session.remove()
+
+    def result_tab_load_orders(self):
+        # First page plus COUNT, delivered through the background runner
+        if self.result_tab is None:
+            from ui.tabs.result import ResultTab
+            self.result_tab = ResultTab()
+            self.result_tab.query_runner.wait(120)
+        self.result_tab.load_orders()
+        if not self.result_tab.query_runner.wait(120):
+            raise RuntimeError("ResultTab.load_orders did not finish")
+
+    def patient_search(self):
+        from database import Session
+        from models import Patient, patient_search_clause
+        with Session() as session:
+            for field, term in PATIENT_SEARCHES:
+                patients = session.query(Patient).filter(patient_search_clause(field, term)).all()
+                Patient.prefetch_decrypted(patients)
+                [p for p in patients if p.matches_search(field, term)]
+        Session.remove()
+
+    def pdf_report(self):
+        from reports.pdf_generator import render_pdf_report
+        for number, order_ids in enumerate(self.visits):
+            render_pdf_report(order_ids, os.path.join(self.workdir, f'report_{number}.pdf'))
+
+    def invoice(self):
+        from reports.invoice_generator import InvoiceGenerator
+        for order_ids in self.visits:
+            generator = InvoiceGenerator(order_ids)
+            generator.reports_path = self.workdir
+            generator.generate_pdf()
+
+    @classmethod
+    def names(cls):
+        return [name for name in vars(cls) if not name.startswith('_') and name != 'names']
+
+
+def time_case(fn, repeat):
+    from database import decrypt_cache
+    decrypt_cache.clear()
+    fn()  # warm-up: imports, prepared statements, OS file cache
+    samples = []
+    for _ in range(repeat):
+        decrypt_cache.clear()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {'min_ms': round(samples[0], 2), 'median_ms': round(statistics.median(samples), 2),
+            'p90_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.9))], 2),
+            'samples': len(samples)}
+
+
+def load_history(path):
+    entries = []
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entries.append(json.loads(line))
+    except OSError:
+        pass
+    return entries
+
+
+def find_baseline(history, entry, commit=None):
+    """Latest earlier entry on the same dataset, from ``commit`` or else from any other commit."""
+    for previous in reversed(history):
+        if previous.get('dataset') != entry['dataset']:
+            continue
+        if commit is not None:
+            if previous['commit'].startswith(commit):
+                return previous
+        elif previous['commit'] != entry['commit']:
+            return previous
+    return None
+
+
+def compare(entry, baseline, threshold):
+    """Print current vs baseline medians; return the names of regressed cases."""
+    regressions = []
+    print(f"\n{'case':<24}{'median ms':>12}{'baseline':>12}{'change':>10}")
+    for name, stats in entry['cases'].items():
+        base = (baseline or {}).get('cases', {}).get(name)
+        if base is None:
+            print(f"{name:<24}{stats['median_ms']:>12.1f}{'-':>12}{'-':>10}")
+            continue
+        change = stats['median_ms'] / base['median_ms'] - 1 if base['median_ms'] else 0.0
+        flag = '  REGRESSION' if change > threshold else ''
+        if flag:
+            regressions.append(name)
+        print(f"{name:<24}{stats['median_ms']:>12.1f}{base['median_ms']:>12.1f}{change:>+10.0%}{flag}")
+    if baseline:
+        print(f"baseline: {baseline['commit']} ({baseline['recorded_at']})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', required=True, help='scratch database to benchmark (never the live lab.db)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--case', action='append', choices=Cases.names(), help='run only these cases')
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help='JSONL file results are appended to')
+    parser.add_argument('--no-record', action='store_true', help='compare only, do not append to the history')
+    parser.add_argument('--baseline', help='commit to compare against (default: the previous other commit)')
+    parser.add_argument('--threshold', type=float, default=0.10, help='slowdown counted as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    # Must be set before database is imported
+    os.environ['LIMS_DB_PATH'] = scratch_db_path(args.db)
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    with tempfile.TemporaryDirectory(prefix='lims_bench_') as workdir:
+        cases = Cases(app, workdir)
+        print(f"dataset: {cases.dataset}")
+        if not cases.recent_orders:
+            print("warning: no orders in the last 7 days; regenerate the dataset so the dashboard "
+                  "and ResultTab cases time real rows")
+        entry = {'recorded_at': datetime.datetime.now().isoformat(timespec='seconds'), 'commit': git_commit(),
+                 'python': sys.version.split()[0], 'dataset': cases.dataset, 'repeat': args.repeat, 'cases': {}}
+        for name in args.case or Cases.names():
+            entry['cases'][name] = stats = time_case(getattr(cases, name), args.repeat)
+            print(f"{name}: median {stats['median_ms']:.1f} ms (min {stats['min_ms']:.1f}, p90 {stats['p90_ms']:.1f})")
+
+    history = load_history(args.history)
+    regressions = compare(entry, find_baseline(history, entry, args.baseline), args.threshold)
+    if not args.no_record:
+        with open(args.history, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
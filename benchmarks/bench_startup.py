@@ -0,0 +1,143 @@
+"""Cold-start benchmark: launch main.py headless N times and report percentiles.
+
+Every run is a fresh interpreter started with ``QT_QPA_PLATFORM=offscreen``
+and startup profiling on (see startup_profile.py). The login dialog is
+filled in automatically and the app quits as soon as the first tab is
+shown. Then the timelines are aggregated per phase::
+
+    python benchmarks/bench_startup.py -n 20 --warmup 1 --json startup_bench.json
+
+The password is passed to the child processes in an environment variable,
+never on the command line. Use a throwaway account on a copy of lab.db.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PASSWORD_ENV_VAR = 'LIMS_BENCH_PASSWORD'
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of a non-empty list."""
+    values = sorted(values)
+    if len(values) == 1:
+        return values[0]
+    rank = (len(values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+def run_child(username):
+    """Runs inside each benchmark process: start the real app and log in automatically."""
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    import main  # the imports main.py does are part of the timeline
+    from PyQt6.QtWidgets import QDialog
+    import ui.login_dialog as login_dialog
+
+    def fail(parent, title, text, *args, **kwargs):
+        print(f"Login failed: {text}", file=sys.stderr)
+        sys.exit(3)
+
+    def auto_exec(dialog):
+        dialog.username_input.setText(username)
+        dialog.password_input.setText(os.environ.get(PASSWORD_ENV_VAR, ''))
+        dialog.login()
+        return dialog.result() or QDialog.DialogCode.Rejected
+
+    login_dialog.QMessageBox.warning = fail
+    login_dialog.QMessageBox.critical = fail
+    login_dialog.LoginDialog.exec = auto_exec
+    main.main()
+
+
+def run_once(username, password, timeout):
+    """Launch one app process; return its timeline with the process wall time added."""
+    fd, profile_path = tempfile.mkstemp(suffix='.json', prefix='startup_')
+    os.close(fd)
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen', LIMS_STARTUP_PROFILE=profile_path,
+               LIMS_STARTUP_PROFILE_EXIT='1')
+    env[PASSWORD_ENV_VAR] = password
+    try:
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', '--user', username],
+                              cwd=ROOT, env=env, capture_output=True, text=True, timeout=timeout)
+        wall = (time.perf_counter() - start) * 1000
+        if proc.returncode != 0:
+            raise RuntimeError(f"run exited with {proc.returncode}: {proc.stderr.strip()[-500:]}")
+        with open(profile_path, encoding='utf-8') as f:
+            timeline = json.load(f)
+        timeline['wall_ms'] = round(wall, 2)
+        return timeline
+    finally:
+        os.remove(profile_path)
+
+
+def summarize(timelines):
+    """{metric: {"p50": .., ..., "max": ..}} over runs, for totals and every phase."""
+    series = {'process wall': [t['wall_ms'] for t in timelines],
+              'profiled total': [t['total_ms'] for t in timelines],
+              'profiled active': [t['active_ms'] for t in timelines]}
+    for t in timelines:
+        per_run = {}
+        for p in t['phases']:
+            per_run[p['name']] = per_run.get(p['name'], 0.0) + p['duration_ms']
+        for name, duration in per_run.items():
+            series.setdefault(name, []).append(duration)
+    summary = {}
+    for name, values in series.items():
+        stats = {f'p{pct}': round(percentile(values, pct), 2) for pct in PERCENTILES}
+        stats['max'] = round(max(values), 2)
+        stats['runs'] = len(values)
+        summary[name] = stats
+    return summary
+
+
+def print_summary(summary):
+    width = max(len(name) for name in summary)
+    columns = [f'p{pct}' for pct in PERCENTILES] + ['max']
+    print(f"{'phase (ms)':<{width}}  " + ''.join(f'{c:>10}' for c in columns))
+    for name, stats in summary.items():
+        if name.startswith('first tab') or stats['max'] == 0:
+            continue
+        print(f'{name:<{width}}  ' + ''.join(f'{stats[c]:>10.1f}' for c in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--runs', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=1, help='runs to discard first (fills the OS file cache)')
+    parser.add_argument('--user', default='admin')
+    parser.add_argument('--timeout', type=float, default=120)
+    parser.add_argument('--json', dest='json_path', help='also write the summary and raw timelines here')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.user)
+        return
+
+    password = os.environ.get(PASSWORD_ENV_VAR, 'admin')
+    timelines = []
+    for i in range(args.warmup + args.runs):
+        timeline = run_once(args.user, password, args.timeout)
+        if i >= args.warmup:
+            timelines.append(timeline)
+        print(f"run {i + 1}/{args.warmup + args.runs}: {timeline['wall_ms']:.0f} ms wall, "
+              f"{timeline['active_ms']:.0f} ms profiled{' (warmup)' if i < args.warmup else ''}")
+    summary = summarize(timelines)
+    print_summary(summary)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'summary': summary, 'runs': timelines}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
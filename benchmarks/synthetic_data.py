@@ -0,0 +1,343 @@
+"""Deterministic synthetic data for benchmarks.
+
+Fills a database with patients, orders, results and result values at
+realistic volumes, e.g.::
+
+    python benchmarks/synthetic_data.py --db bench.db --patients 100000 --orders 1000000
+
+Patients are encrypted and blind-indexed just like the app does it. Orders
+come in visits of one to four tests. Results follow each test's template:
+numeric values mostly inside the reference range and sometimes outside it.
+The tests in the database are used as they are. The built-in catalogue
+below only adds the codes that are missing.
+
+The same seed and --end always give the same plaintext data. The
+ciphertexts still differ between runs, because Fernet uses a random IV.
+Order dates end today by default, so the dashboard's "today" cards and
+ResultTab's last-7-days listing have rows to show. --db is required, and
+the configured lab.db is refused: fake patients cannot be taken back out
+of a live database.
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+BATCH_SIZE = 5000
+
+# code, name, department, rate, template (same shape as TestTab saves)
+TEST_CATALOGUE = [
+    ('CBC', 'Complete Blood Count', 'Hematology', 250.0, [
+        {'name': 'Hemoglobin', 'type': 'float', 'unit': 'g/dL', 'decimals': 1,
+         'reference': {'male': '13-17', 'female': '12-16', 'age_based': {'child': '11-14', 'adult': '12-17'}}},
+        {'name': 'WBC', 'type': 'int', 'unit': '/uL', 'reference': '4000-11000'},
+        {'name': 'Platelets', 'type': 'int', 'unit': '/uL', 'reference': '150000-450000'},
+        {'name': 'RBC', 'type': 'float', 'unit': '10^6/uL', 'decimals': 2,
+         'reference': {'male': '4.5-5.9', 'female': '4.1-5.1'}},
+        {'name': 'PCV', 'type': 'float', 'unit': '%', 'decimals': 1,
+         'reference': {'male': '40-50', 'female': '36-46'}},
+    ]),
+    ('LFT', 'Liver Function Test', 'Biochemistry', 600.0, [
+        {'name': 'Total Bilirubin', 'type': 'float', 'unit': 'mg/dL', 'decimals': 2, 'reference': '0.3-1.2'},
+        {'name': 'Direct Bilirubin', 'type': 'float', 'unit': 'mg/dL', 'decimals': 2, 'reference': '0-0.3'},
+        {'name': 'SGOT', 'type': 'int', 'unit': 'U/L', 'reference': '<40'},
+        {'name': 'SGPT', 'type': 'int', 'unit': 'U/L', 'reference': '<41'},
+        {'name': 'ALP', 'type': 'int', 'unit': 'U/L', 'reference': '44-147'},
+        {'name': 'Albumin', 'type': 'float', 'unit': 'g/dL', 'decimals': 1, 'reference': '3.5-5.2'},
+    ]),
+    ('LIPID', 'Lipid Profile', 'Biochemistry', 500.0, [
+        {'name': 'Total Cholesterol', 'type': 'int', 'unit': 'mg/dL', 'reference': '<200'},
+        {'name': 'Triglycerides', 'type': 'int', 'unit': 'mg/dL', 'reference': '<150'},
+        {'name': 'HDL', 'type': 'int', 'unit': 'mg/dL', 'reference': '>40'},
+        {'name': 'LDL', 'type': 'int', 'unit': 'mg/dL', 'reference': '<100'},
+    ]),
+    ('RFT', 'Renal Function Test', 'Biochemistry', 450.0, [
+        {'name': 'Urea', 'type': 'int', 'unit': 'mg/dL', 'reference': '15-40'},
+        {'name': 'Creatinine', 'type': 'float', 'unit': 'mg/dL', 'decimals': 2,
+         'reference': {'male': '0.7-1.3', 'female': '0.6-1.1'}},
+        {'name': 'Uric Acid', 'type': 'float', 'unit': 'mg/dL', 'decimals': 1,
+         'reference': {'male': '3.4-7.0', 'female': '2.4-6.0'}},
+    ]),
+    ('FBS', 'Fasting Blood Sugar', 'Biochemistry', 80.0, [
+        {'name': 'Glucose Fasting', 'type': 'int', 'unit': 'mg/dL', 'reference': '70-100'},
+    ]),
+    ('HBA1C', 'Glycated Hemoglobin', 'Biochemistry', 400.0, [
+        {'name': 'HbA1c', 'type': 'float', 'unit': '%', 'decimals': 1, 'reference': '<6.5'},
+    ]),
+    ('TSH', 'Thyroid Stimulating Hormone', 'Immunology', 350.0, [
+        {'name': 'TSH', 'type': 'float', 'unit': 'uIU/mL', 'decimals': 2, 'reference': '0.4-4.0'},
+    ]),
+    ('CRP', 'C-Reactive Protein', 'Immunology', 300.0, [
+        {'name': 'CRP', 'type': 'float', 'unit': 'mg/L', 'decimals': 1, 'reference': '<5'},
+    ]),
+    ('URINE', 'Urine Routine', 'Clinical Pathology', 150.0, [
+        {'name': 'Colour', 'type': 'text', 'unit': ''},
+        {'name': 'Appearance', 'type': 'text', 'unit': ''},
+        {'name': 'pH', 'type': 'float', 'unit': '', 'decimals': 1, 'reference': '4.5-8.0'},
+        {'name': 'Specific Gravity', 'type': 'float', 'unit': '', 'decimals': 3, 'reference': '1.005-1.030'},
+        {'name': 'Protein', 'type': 'text', 'unit': ''},
+        {'name': 'Sugar', 'type': 'text', 'unit': ''},
+        {'name': 'Pus Cells', 'type': 'text', 'unit': '/hpf'},
+    ]),
+]
+
+TEXT_VALUES = {
+    'Colour': ['Pale Yellow', 'Yellow', 'Dark Yellow'],
+    'Appearance': ['Clear', 'Slightly Turbid', 'Turbid'],
+    'Protein': ['Nil', 'Nil', 'Nil', 'Trace', '+'],
+    'Sugar': ['Nil', 'Nil', 'Nil', 'Trace', '+'],
+    'Pus Cells': ['0-2', '2-4', '4-6', '8-10'],
+}
+FIRST_NAMES = {
+    'Male': ['Arun', 'Vijay', 'Karthik', 'Suresh', 'Ramesh', 'Rahul', 'Anand', 'Pradeep', 'Manoj', 'Ganesh',
+             'Senthil', 'Prakash', 'Arjun', 'Naveen', 'Dinesh', 'Mohammed', 'John', 'Ravi', 'Sanjay', 'Ashok'],
+    'Female': ['Priya', 'Lakshmi', 'Divya', 'Kavitha', 'Meena', 'Anitha', 'Deepa', 'Revathi', 'Sangeetha',
+               'Fathima', 'Mary', 'Nandhini', 'Gayathri', 'Uma', 'Saranya', 'Keerthana', 'Radha', 'Sumathi'],
+}
+LAST_NAMES = ['Kumar', 'Raj', 'Krishnan', 'Subramanian', 'Natarajan', 'Rajendran', 'Murugan', 'Pillai',
+              'Iyer', 'Reddy', 'Sharma', 'Nair', 'Selvam', 'Balaji', 'Ganesan', 'Joseph', 'Khan', 'Das']
+STREETS = ['Gandhi Road', 'Anna Nagar', 'Main Bazaar', 'Temple Street', 'Station Road', 'Nehru Street',
+           'Church Road', 'Lake View Road', 'Market Street', 'Kamaraj Salai']
+CITIES = ['Trichy', 'Chennai', 'Madurai', 'Coimbatore', 'Salem', 'Thanjavur', 'Karur', 'Erode']
+PHYSICIANS = ['Dr. Ramesh', 'Dr. Kavitha', 'Dr. Senthil', 'Dr. Anand', 'Dr. Meena', 'Dr. Joseph', 'Self']
+PAYMENT_METHODS = ['Cash', 'UPI', 'Card', 'E-Wallet']
+VISIT_SIZES = [1, 2, 3, 4]
+VISIT_WEIGHTS = [50, 25, 15, 10]
+ABNORMAL_RATE = 0.15
+
+_NUMBER = r'(-?\d+(?:\.\d+)?)'
+
+
+def reference_bounds(reference):
+    """(low, high) of a reference string such as "12-16", "<200" or ">40"; either may be None."""
+    text = str(reference or '').strip()
+    match = re.fullmatch(_NUMBER + r'\s*-\s*' + _NUMBER, text)
+    if match:
+        return float(match.group(1)), float(match.group(2))
+    match = re.fullmatch(r'(<=?|>=?)\s*' + _NUMBER, text)
+    if match:
+        bound = float(match.group(2))
+        return (None, bound) if match.group(1).startswith('<') else (bound, None)
+    return None, None
+
+
+def field_value(rng, field, reference):
+    """A plausible value for one template field; numeric fields are sometimes abnormal."""
+    if field.get('type') not in ('float', 'int'):
+        return rng.choice(TEXT_VALUES.get(field.get('name'), ['Normal']))
+    low, high = reference_bounds(reference)
+    if low is None and high is None:
+        low, high = 1.0, 100.0
+    elif low is None:
+        low = high * 0.4
+    elif high is None:
+        high = low * 2.0
+    span = (high - low) or abs(high) or 1.0
+    if rng.random() < ABNORMAL_RATE:
+        value = (high + rng.uniform(0.05, 0.6) * span) if rng.random() < 0.6 \
+            else max(0.0, low - rng.uniform(0.05, 0.4) * span)
+    else:
+        value = rng.uniform(low, high)
+    if field.get('type') == 'int':
+        return int(round(value))
+    return round(value, int(field.get('decimals', 1)))
+
+
+def fake_patient(rng, start, end):
+    gender = rng.choice(['Male', 'Female'])
+    age = rng.choice([rng.randint(1, 12), rng.randint(18, 45), rng.randint(18, 45), rng.randint(46, 90)])
+    if age < 13:
+        title = 'Baby'
+    elif gender == 'Male':
+        title = 'Mr.'
+    else:
+        title = rng.choice(['Mrs.', 'Miss'])
+    name = f"{rng.choice(FIRST_NAMES[gender])} {rng.choice(LAST_NAMES)}"
+    contact = f"{rng.choice('6789')}{rng.randrange(10 ** 9):09d}"
+    address = f"{rng.randint(1, 250)}, {rng.choice(STREETS)}, {rng.choice(CITIES)}"
+    created = start + datetime.timedelta(seconds=rng.uniform(0, (end - start).total_seconds()))
+    return title, name, age, gender, contact, address, created
+
+
+def ensure_tests(session):
+    """Add the catalogue tests that are missing; return every test with a usable template."""
+    from models import Test
+    existing = {code for (code,) in session.query(Test.code)}
+    for code, name, department, rate, template in TEST_CATALOGUE:
+        if code not in existing:
+            session.add(Test(code=code, name=name, department=department, rate_inr=rate,
+                             template=json.dumps(template)))
+    session.commit()
+    tests = []
+    for test in session.query(Test).order_by(Test.id):
+        try:
+            template = json.loads(test.template) if test.template else []
+        except (TypeError, ValueError):
+            continue
+        fields = [f for f in template if isinstance(f, dict) and f.get('name')]
+        if fields:
+            tests.append((test.id, fields))
+    return tests
+
+
+def insert_patients(session, rng, count, start, end, progress):
+    """Insert ``count`` encrypted, blind-indexed patients; return [(id, gender, age, created_at)]."""
+    from sqlalchemy import insert
+    from database import blind_index, blind_index_tokens, normalize_search_value
+    from models import Patient, PatientSearchToken, cipher, reserve_pids
+
+    def encrypt(value):
+        return cipher.encrypt(value.encode('utf-8')).decode('utf-8')
+
+    patients = []
+    for offset in range(0, count, BATCH_SIZE):
+        size = min(BATCH_SIZE, count - offset)
+        pids = reserve_pids(size)
+        rows, tokens = [], []
+        for pid in pids:
+            title, name, age, gender, contact, address, created = fake_patient(rng, start, end)
+            plain = {'name': normalize_search_value('name', name),
+                     'contact': normalize_search_value('contact', contact)}
+            rows.append({'pid': pid, 'title': encrypt(title), 'name': encrypt(name), 'age': age,
+                         'gender': gender, 'contact': encrypt(contact), 'address': encrypt(address),
+                         'created_at': created,
+                         'name_index': blind_index('name', plain['name']),
+                         'contact_index': blind_index('contact', plain['contact'])})
+            tokens.append({field: blind_index_tokens(field, value) for field, value in plain.items()})
+        ids = session.execute(insert(Patient).returning(Patient.id, sort_by_parameter_order=True),
+                              rows).scalars().all()
+        # Plain table inserts (no RETURNING needed) skip the ORM bulk machinery
+        session.execute(insert(PatientSearchToken.__table__), [
+            {'patient_id': patient_id, 'field': field, 'token': token}
+            for patient_id, fields in zip(ids, tokens)
+            for field, values in fields.items() for token in values])
+        session.commit()
+        patients.extend((patient_id, row['gender'], row['age'], row['created_at'])
+                        for patient_id, row in zip(ids, rows))
+        progress('patients', len(patients), count)
+    return patients
+
+
+def insert_orders(session, rng, count, patients, tests, end, result_ratio, progress):
+    """Insert about ``count`` orders in visits, with results for ``result_ratio`` of them."""
+    from sqlalchemy import insert
+    from models import Order, Result, ResultValue, allocate_group_id, reference_range, reference_flag
+
+    written = results_written = 0
+    while written < count:
+        visits = []
+        size_left = min(BATCH_SIZE, count - written)
+        while size_left > 0:
+            size = min(size_left, rng.choices(VISIT_SIZES, VISIT_WEIGHTS)[0], len(tests))
+            patient = rng.choice(patients)
+            created = patient[3]
+            date = created + datetime.timedelta(seconds=rng.uniform(0, max(0.0, (end - created).total_seconds())))
+            visits.append((patient, date, rng.sample(tests, size)))
+            size_left -= size
+        first_group = allocate_group_id(len(visits))
+
+        order_rows, planned = [], []
+        for number, (patient, date, visit_tests) in enumerate(visits):
+            physician = rng.choice(PHYSICIANS)
+            payment = f"{rng.choice(PAYMENT_METHODS)}:{rng.randint(1, 40) * 50}"
+            discount = rng.choice([0.0, 0.0, 0.0, 5.0, 10.0])
+            for test_id, fields in visit_tests:
+                has_result = rng.random() < result_ratio
+                order_rows.append({'patient_id': patient[0], 'test_id': test_id, 'group_id': first_group + number,
+                                   'order_date': date, 'status': 'Completed' if has_result else 'Pending',
+                                   'referring_physician': physician, 'payment_method': payment,
+                                   'discount': discount})
+                planned.append((patient, date, fields, has_result))
+        order_ids = session.execute(insert(Order).returning(Order.id, sort_by_parameter_order=True),
+                                    order_rows).scalars().all()
+
+        result_rows, value_rows = [], []
+        for order_id, (patient, date, fields, has_result) in zip(order_ids, planned):
+            if not has_result:
+                continue
+            values, numeric = {}, []
+            for field in fields:
+                reference = reference_range(field.get('reference'), patient[1], patient[2])
+                value = field_value(rng, field, reference)
+                values[field['name']] = value
+                if field.get('type') in ('float', 'int'):
+                    numeric.append({'parameter': field['name'], 'value': float(value), 'unit': field.get('unit'),
+                                    'flag': reference_flag(float(value), reference)})
+            result_rows.append({'order_id': order_id, 'results': json.dumps(values),
+                                'result_date': date + datetime.timedelta(hours=rng.uniform(1, 48))})
+            value_rows.append(numeric)
+        if result_rows:
+            result_ids = session.execute(insert(Result).returning(Result.id, sort_by_parameter_order=True),
+                                         result_rows).scalars().all()
+            flat = [dict(row, result_id=result_id)
+                    for result_id, rows in zip(result_ids, value_rows) for row in rows]
+            if flat:
+                session.execute(insert(ResultValue.__table__), flat)
+        session.commit()
+        written += len(order_ids)
+        results_written += len(result_rows)
+        progress('orders', written, count)
+    return written, results_written
+
+
+def scratch_db_path(path):
+    """Absolute path of a benchmark database; exits if it is the live lab.db."""
+    sys.path.insert(0, ROOT)
+    from config import get_app_data_dir
+    path = os.path.realpath(path)
+    if path == os.path.realpath(os.path.join(get_app_data_dir(), 'lab.db')):
+        sys.exit(f"Refusing to use the live database {path}; pass a scratch file to --db")
+    return path
+
+
+def generate(patients=1000, orders=10000, days=365, end=None, seed=42, result_ratio=0.8, progress=None):
+    """Populate the configured database; returns {"patients": n, "orders": n, "results": n}."""
+    from database import Session, init_db
+
+    init_db()
+    rng = random.Random(seed)
+    end = end or datetime.datetime.now().replace(second=0, microsecond=0)
+    start = end - datetime.timedelta(days=days)
+    progress = progress or (lambda what, done, total: None)
+    with Session() as session:
+        tests = ensure_tests(session)
+        if not tests:
+            raise RuntimeError("No tests with a template to order")
+        patient_rows = insert_patients(session, rng, patients, start, end, progress)
+        order_count, result_count = insert_orders(session, rng, orders, patient_rows, tests, end,
+                                                  result_ratio, progress)
+    return {'patients': len(patient_rows), 'orders': order_count, 'results': result_count}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', required=True, help='scratch database file to fill (never the live lab.db)')
+    parser.add_argument('--patients', type=int, default=1000)
+    parser.add_argument('--orders', type=int, default=10000)
+    parser.add_argument('--days', type=int, default=365, help='order dates span this many days')
+    parser.add_argument('--end', type=datetime.date.fromisoformat, help='last order date (default: now)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--result-ratio', type=float, default=0.8, help='share of orders with a result')
+    args = parser.parse_args()
+
+    # Must be set before database is imported
+    os.environ['LIMS_DB_PATH'] = scratch_db_path(args.db)
+    started = time.perf_counter()
+
+    def progress(what, done, total):
+        print(f"\r{what}: {done}/{total}", end='\n' if done >= total else '', flush=True)
+
+    end = datetime.datetime.combine(args.end, datetime.time(18, 0)) if args.end else None
+    counts = generate(args.patients, args.orders, args.days, end, args.seed, args.result_ratio, progress)
+    print(f"Generated {counts['patients']} patients, {counts['orders']} orders and "
+          f"{counts['results']} results in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
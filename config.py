@@ -1,15 +1,65 @@
 import json
 import os
+import sys
+from pathlib import Path
 
 CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app_config.json')
 
 DEFAULTS = {
     "use_glass": False,
     "theme": "Premium Light",
-    "inactivity_timeout_minutes": 30
+    "inactivity_timeout_minutes": 30,
+    # Build the remaining tabs in idle time after login instead of on first use
+    "prewarm_tabs": False,
+    "decrypt_cache_size": 20000,
+    # SQL instrumentation (query_stats.py): statements slower than this go to
+    # slow_queries.log; one repeated this often within a UI action is flagged as N+1
+    "slow_query_ms": 200,
+    "n_plus_one_threshold": 20,
+    # Central logging (log_config.py). "levels" sets per-logger levels, e.g.
+    # {"pagination": "DEBUG"}; a relative file is put in the app data directory
+    "logging": {
+        "level": "INFO",
+        "file": "lims.log",
+        "console": True,
+        "max_bytes": 5242880,
+        "backup_count": 3,
+        "levels": {
+            "sqlalchemy": "WARNING",
+            "PyQt6": "WARNING"
+        }
+    },
+    # Applied to every SQLite connection; set a pragma to null to keep SQLite's default
+    "sqlite_pragmas": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+        "foreign_keys": "ON"
+    }
 }
 
 
+def get_app_data_dir():
+    """Get the application data directory for both dev and packaged mode"""
+    if getattr(sys, 'frozen', False):
+        # Running in packaged mode - use user data directory
+        if sys.platform == 'win32':
+            app_data = Path(os.environ['APPDATA']) / 'ClinicalLabSoftware'
+        elif sys.platform == 'darwin':
+            app_data = Path.home() / 'Library' / 'Application Support' / 'ClinicalLabSoftware'
+        else:
+            app_data = Path.home() / '.local' / 'share' / 'ClinicalLabSoftware'
+        
+        app_data.mkdir(parents=True, exist_ok=True)
+        return app_data
+    else:
+        # Development mode - use current directory
+        return Path(__file__).parent
+
+
 def load_config():
     try:
         if os.path.exists(CONFIG_FILE):
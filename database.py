@@ -2,13 +2,25 @@
 import os
 import sys
 from pathlib import Path
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.ext.declarative import declarative_base
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 import base64
+import hashlib
+import hmac
+import re
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config import DEFAULTS as CONFIG_DEFAULTS, load_config, get_app_data_dir
+from startup_profile import phase as profile_phase
+
+logger = logging.getLogger(__name__)
 
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
@@ -20,25 +32,10 @@ def resource_path(relative_path):
     
     return os.path.join(base_path, relative_path)
 
-def get_app_data_dir():
-    """Get the application data directory for both dev and packaged mode"""
-    if getattr(sys, 'frozen', False):
-        # Running in packaged mode - use user data directory
-        if sys.platform == 'win32':
-            app_data = Path(os.environ['APPDATA']) / 'ClinicalLabSoftware'
-        elif sys.platform == 'darwin':
-            app_data = Path.home() / 'Library' / 'Application Support' / 'ClinicalLabSoftware'
-        else:
-            app_data = Path.home() / '.local' / 'share' / 'ClinicalLabSoftware'
-        
-        app_data.mkdir(parents=True, exist_ok=True)
-        return app_data
-    else:
-        # Development mode - use current directory
-        return Path(__file__).parent
-
 def get_database_path():
-    """Get the database path"""
+    """Get the database path; LIMS_DB_PATH overrides it (benchmarks use a scratch copy)"""
+    if os.environ.get('LIMS_DB_PATH'):
+        return Path(os.environ['LIMS_DB_PATH'])
     app_data_dir = get_app_data_dir()
     return app_data_dir / 'lab.db'
 
@@ -51,10 +48,34 @@ def get_key_file_path():
 DB_PATH = get_database_path()
 KEY_FILE = get_key_file_path()
 
-print(f"Database path: {DB_PATH}")  # Debug info
-print(f"Key file path: {KEY_FILE}")  # Debug info
+logger.info("Database path: %s", DB_PATH)
+logger.info("Key file path: %s", KEY_FILE)
 
 engine = create_engine(f'sqlite:///{DB_PATH}', echo=False)
+
+def get_sqlite_pragmas():
+    """Engine profile from app_config.json, layered over the built-in defaults"""
+    pragmas = dict(CONFIG_DEFAULTS['sqlite_pragmas'])
+    configured = load_config().get('sqlite_pragmas')
+    if isinstance(configured, dict):
+        pragmas.update(configured)
+    return {name: value for name, value in pragmas.items()
+            if value is not None and re.fullmatch(r'[a-z_]+', name)
+            and re.fullmatch(r'-?\w+', str(value))}
+
+SQLITE_PRAGMAS = get_sqlite_pragmas()
+
+@event.listens_for(engine, 'connect')
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets the dashboard thread read while the GUI thread writes results;
+    # busy_timeout makes a blocked writer wait instead of failing immediately.
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
 Session = scoped_session(sessionmaker(bind=engine))
 Base = declarative_base()
 
@@ -70,21 +91,99 @@ def load_or_create_key():
             test_fernet.encrypt(b"test")
             return key
         except Exception as e:
-            print(f"Existing key invalid, generating new one: {e}")
+            logger.warning("Existing key invalid, generating new one: %s", e)
             os.remove(KEY_FILE)  # Remove corrupted key file
     
     # Generate new key
     key = Fernet.generate_key()
     with open(KEY_FILE, 'wb') as f:
         f.write(key)
-    print("New encryption key generated")
+    logger.warning("New encryption key generated")
     return key
 
-KEY = load_or_create_key()
-cipher = Fernet(KEY)
+with profile_phase('key load'):
+    KEY = load_or_create_key()
+    cipher = Fernet(KEY)
+
+# Separate key for the searchable blind index so the HMAC tokens never reuse
+# the Fernet key material directly.
+BLIND_INDEX_KEY = HKDF(
+    algorithm=hashes.SHA256(), length=32, salt=None, info=b'lims-blind-index'
+).derive(KEY)
+
+class DecryptCache:
+    """Bounded, thread-safe LRU of decrypted values keyed by (column, ciphertext).
+
+    Fernet ciphertexts are unique per write, so an entry can never go stale;
+    writes only evict the old ciphertext to free memory. The cache is shared
+    by every session and by the dashboard thread.
+    """
+
+    def __init__(self, maxsize=20000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, column, ciphertext):
+        """Return ``(True, plaintext)`` on a hit or ``(False, None)`` on a miss."""
+        key = (column, ciphertext)
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True, self._data[key]
+            self.misses += 1
+            return False, None
+
+    def get(self, column, ciphertext, decrypt):
+        """Return the cached plaintext, calling ``decrypt(ciphertext)`` on a miss."""
+        found, value = self.lookup(column, ciphertext)
+        if found:
+            return value
+        value = decrypt(ciphertext)
+        self.put(column, ciphertext, value)
+        return value
+
+    def put(self, column, ciphertext, value):
+        with self._lock:
+            self._data[(column, ciphertext)] = value
+            self._data.move_to_end((column, ciphertext))
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, column, ciphertext):
+        with self._lock:
+            self._data.pop((column, ciphertext), None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+decrypt_cache = DecryptCache(int(load_config().get('decrypt_cache_size', 20000)))
 
 def init_db():
-    Base.metadata.create_all(engine)
+    # Imported here because migrations imports models, which imports this module;
+    # it also registers every model on Base before create_all runs.
+    from migrations import run_migrations
+    with profile_phase('create_all'):
+        Base.metadata.create_all(engine)
+    # Bring existing lab.db files up to date (new columns, indexes, backfills)
+    with profile_phase('migrations'):
+        run_migrations()
 
 def encrypt_data(data):
     """Encrypt data with proper error handling"""
@@ -96,9 +195,71 @@ def encrypt_data(data):
         else:
             return cipher.encrypt(str(data).encode('utf-8')).decode('utf-8')
     except Exception as e:
-        print(f"Encryption error: {e}")
+        logger.error("Encryption error: %s", e)
         return data  # Return original data if encryption fails
 
+_decrypt_pool = None
+_decrypt_pool_lock = threading.Lock()
+# Below this many values the thread pool costs more than it saves
+PARALLEL_DECRYPT_THRESHOLD = 64
+DECRYPT_CHUNK_SIZE = 256
+
+def _get_decrypt_pool():
+    global _decrypt_pool
+    with _decrypt_pool_lock:
+        if _decrypt_pool is None:
+            workers = min(8, os.cpu_count() or 2)
+            _decrypt_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='decrypt')
+        return _decrypt_pool
+
+def _decrypt_chunk(fernet, values):
+    # Same outcome as Patient._decrypted: anything Fernet rejects, including
+    # values that are not tokens at all, is a failure and is never cached
+    plain = []
+    for value in values:
+        try:
+            plain.append(fernet.decrypt(value.encode('utf-8')).decode('utf-8'))
+        except Exception:
+            plain.append(None)
+    return plain
+
+def decrypt_many(ciphertexts, fernet=None, column=None, failed="Decryption Failed"):
+    """Decrypt a batch of values, returning plaintexts in input order.
+
+    Duplicates are decrypted once and large batches are split across a thread
+    pool (the cryptography primitives release the GIL). When ``column`` is
+    given, results are read from and stored in ``decrypt_cache``. Empty values
+    come back as "", and values Fernet cannot decrypt (including ones that
+    are not Fernet tokens) as ``failed``; failures are not cached.
+    """
+    fernet = fernet or cipher
+    ciphertexts = list(ciphertexts)
+    plain = {}
+    todo = []
+    for value in dict.fromkeys(c for c in ciphertexts if c):
+        if column is not None:
+            found, cached = decrypt_cache.lookup(column, value)
+            if found:
+                plain[value] = cached
+                continue
+        todo.append(value)
+
+    if len(todo) < PARALLEL_DECRYPT_THRESHOLD:
+        decrypted = _decrypt_chunk(fernet, todo)
+    else:
+        chunks = [todo[i:i + DECRYPT_CHUNK_SIZE] for i in range(0, len(todo), DECRYPT_CHUNK_SIZE)]
+        decrypted = [p for part in _get_decrypt_pool().map(lambda c: _decrypt_chunk(fernet, c), chunks)
+                     for p in part]
+
+    for value, result in zip(todo, decrypted):
+        if result is None:
+            plain[value] = failed
+            continue
+        plain[value] = result
+        if column is not None:
+            decrypt_cache.put(column, value, result)
+    return [plain[c] if c else "" for c in ciphertexts]
+
 def decrypt_data(encrypted_data):
     """Decrypt data with proper error handling"""
     if not encrypted_data:
@@ -112,11 +273,58 @@ def decrypt_data(encrypted_data):
         decrypted = cipher.decrypt(encrypted_data.encode('utf-8')).decode('utf-8')
         return decrypted
     except Exception as e:
-        print(f"Decryption error for data '{encrypted_data[:50]}...': {e}")
+        # Never log the value itself, not even a prefix of the ciphertext
+        logger.debug("Decryption failed: %s", type(e).__name__)
         # Try to return the original data if it might not be encrypted
         try:
             # If it's valid UTF-8 text, return it
             encrypted_data.encode('utf-8').decode('utf-8')
             return encrypted_data
         except:
-            return "Decryption Failed"
\ No newline at end of file
+            return "Decryption Failed"
+
+# Blind index helpers
+# Encrypted columns cannot be searched in SQL because Fernet ciphertexts are
+# randomized. Instead we store keyed HMAC tokens of the normalized plaintext
+# (full value, word prefixes and trigrams) and search on those.
+def normalize_search_value(field, value):
+    """Normalize a plaintext value before it is tokenized for the blind index"""
+    if not value:
+        return ""
+    value = str(value).strip().lower()
+    if field == 'contact':
+        digits = re.sub(r'\D', '', value)
+        return digits or value
+    return re.sub(r'\s+', ' ', value)
+
+def blind_index(field, value, kind='full'):
+    """Return the HMAC token for a single normalized value"""
+    message = f"{field}:{kind}:{value}".encode('utf-8')
+    return hmac.new(BLIND_INDEX_KEY, message, hashlib.sha256).hexdigest()[:32]
+
+def _trigrams(value):
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+def _prefixes(field, value):
+    words = [value] if field == 'contact' else value.split(' ')
+    return {word[:length] for word in words for length in (1, 2) if len(word) >= length}
+
+def blind_index_tokens(field, value):
+    """Return the set of prefix/trigram tokens stored for a plaintext value"""
+    normalized = normalize_search_value(field, value)
+    tokens = {blind_index(field, p, 'prefix') for p in _prefixes(field, normalized)}
+    tokens.update(blind_index(field, t, 'trigram') for t in _trigrams(normalized))
+    return tokens
+
+def blind_index_query_tokens(field, term):
+    """Return the tokens a row must contain to match a search term.
+
+    Terms of three or more characters match as substrings (all trigrams must
+    be present); shorter terms match the start of a word.
+    """
+    normalized = normalize_search_value(field, term)
+    if not normalized:
+        return set()
+    if len(normalized) < 3:
+        return {blind_index(field, normalized, 'prefix')}
+    return {blind_index(field, t, 'trigram') for t in _trigrams(normalized)}
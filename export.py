@@ -0,0 +1,150 @@
+# export.py
+"""Streaming CSV export of patients, orders, tests, results and users.
+
+Rows are read with ``yield_per`` in batches, encrypted columns are decrypted
+one batch at a time and every batch is written before the next is fetched,
+so memory stays flat however large the table is. Each table is read with a
+single sequential query; a path ending in ``.gz`` is written gzip-compressed.
+"""
+import csv
+import gzip
+import logging
+from sqlalchemy import select, func, case
+from database import Session, decrypt_many
+from models import Patient, Order, Test, Result, User, cipher
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_SIZE = 1000
+
+
+def _patients(ids):
+    stmt = select(Patient.id, Patient.title, Patient.pid, Patient.name, Patient.age, Patient.gender,
+                  Patient.contact, Patient.address, Patient.created_at)
+    return stmt.where(Patient.id.in_(ids)) if ids is not None else stmt
+
+
+def _orders(ids):
+    stmt = (
+        select(Order.id, Order.group_id, Order.patient_id, Patient.pid, Patient.name, Test.code, Test.name,
+               Test.department, Order.order_date, Order.status,
+               case((Result.id.isnot(None), "Completed"), else_="Pending"),
+               Order.referring_physician, Order.payment_method, Order.discount)
+        .outerjoin(Order.patient).outerjoin(Order.test).outerjoin(Order.results)
+    )
+    return stmt.where(Order.id.in_(ids)) if ids is not None else stmt
+
+
+def _tests(ids):
+    stmt = select(Test.id, Test.code, Test.name, Test.department, Test.rate_inr, Test.notes)
+    return stmt.where(Test.id.in_(ids)) if ids is not None else stmt
+
+
+def _results(ids):
+    stmt = select(Result.id, Result.order_id, Result.result_date, Result.results, Result.notes)
+    return stmt.where(Result.id.in_(ids)) if ids is not None else stmt
+
+
+def _users(ids):
+    # Password hashes are never exported
+    stmt = select(User.id, User.username, User.role)
+    return stmt.where(User.id.in_(ids)) if ids is not None else stmt
+
+
+def _format(value):
+    if value is None:
+        return ""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat(sep=' ', timespec='seconds')
+    return value
+
+
+# table -> (CSV headers, statement builder taking an optional id list,
+#           positions of encrypted columns in each row)
+EXPORT_TABLES = {
+    'patients': (
+        ["ID", "Title", "PID", "Name", "Age", "Gender", "Contact", "Address", "Created At"],
+        _patients, (1, 3, 6, 7),
+    ),
+    'orders': (
+        ["Order ID", "Group ID", "Patient ID", "PID", "Patient Name", "Test Code", "Test Name",
+         "Department", "Order Date", "Status", "Result", "Referring Physician", "Payment Method",
+         "Discount"],
+        _orders, (4,),
+    ),
+    'tests': (["Test ID", "Code", "Name", "Department", "Rate (INR)", "Notes"], _tests, ()),
+    'results': (["Result ID", "Order ID", "Result Date", "Values", "Notes"], _results, ()),
+    'users': (["User ID", "Username", "Role"], _users, ()),
+}
+
+
+def export_headers(table):
+    return list(EXPORT_TABLES[table][0])
+
+
+def iter_export_rows(session, table, ids=None, batch_size=EXPORT_BATCH_SIZE):
+    """Yield lists of decrypted, formatted rows of ``table``, one list per batch.
+
+    ``ids`` restricts the export to those primary keys.
+    """
+    headers, build, encrypted = EXPORT_TABLES[table]
+    key = build(None).selected_columns[0]
+    stmt = build(ids).order_by(key).execution_options(yield_per=batch_size)
+    for batch in session.execute(stmt).partitions():
+        rows = [list(row) for row in batch]
+        for position in encrypted:
+            # No decrypt_cache here: every value is read once, and caching a
+            # full-table scan would just evict the entries the tabs reuse
+            plain = decrypt_many((row[position] for row in rows), fernet=cipher)
+            for row, value in zip(rows, plain):
+                row[position] = value
+        yield [[_format(value) for value in row] for row in rows]
+
+
+def open_export_file(path):
+    """Open ``path`` for CSV writing, gzip-compressed when it ends in ``.gz``."""
+    if str(path).lower().endswith('.gz'):
+        return gzip.open(path, 'wt', newline='', encoding='utf-8')
+    return open(path, 'w', newline='', encoding='utf-8')
+
+
+def iter_export(table, path, ids=None, batch_size=EXPORT_BATCH_SIZE):
+    """Write ``table`` to ``path`` batch by batch, yielding ``(written, total)`` after each."""
+    headers, build, _ = EXPORT_TABLES[table]
+    with Session() as session:
+        if ids is not None:
+            ids = list(ids)
+            total = len(ids)
+        else:
+            # Every export has one row per row of its base table
+            key_table = build(None).selected_columns[0].table
+            total = session.execute(select(func.count()).select_from(key_table)).scalar() or 0
+        written = 0
+        with open_export_file(path) as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            yield written, total
+            for rows in iter_export_rows(session, table, ids, batch_size):
+                writer.writerows(rows)
+                written += len(rows)
+                yield written, total
+    logger.info("Exported %s %s row(s) to %s", written, table, path)
+
+
+def export_table(table, path, ids=None, progress=None, batch_size=EXPORT_BATCH_SIZE):
+    """Export ``table`` to CSV; ``progress(written, total)`` is called after every batch.
+
+    Returns the number of rows written.
+    """
+    written = 0
+    for written, total in iter_export(table, path, ids, batch_size):
+        if progress:
+            progress(written, total)
+    return written
+
+
+def preview_rows(table, limit=5):
+    """Header plus the first ``limit`` rows of ``table``, as strings."""
+    with Session() as session:
+        rows = next(iter_export_rows(session, table, batch_size=limit), [])[:limit]
+    return [export_headers(table)] + [[str(value) for value in row] for row in rows]
@@ -0,0 +1,87 @@
+# log_config.py
+"""Central logging setup, called once by main.py before anything else logs.
+
+Callers only put records on a queue. A QueueListener thread does the
+formatting and the writing to the rotating log file and the console, so
+the GUI thread never waits on disk or terminal I/O. Levels come from the
+"logging" section of app_config.json: one root level, plus per-logger
+overrides under "levels".
+
+Hot paths log with %-style arguments, e.g.
+``logger.debug("Fetched %d row(s)", n)``. A disabled level then costs one
+level check and the message is never built.
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+from config import DEFAULTS, load_config, get_app_data_dir
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener = None
+
+
+def logging_config(cfg=None):
+    """The "logging" settings, layered over the built-in defaults."""
+    settings = dict(DEFAULTS['logging'])
+    configured = (cfg if cfg is not None else load_config()).get('logging')
+    if isinstance(configured, dict):
+        levels = dict(settings['levels'])
+        levels.update(configured.get('levels') or {})
+        settings.update(configured)
+        settings['levels'] = levels
+    return settings
+
+
+def _level(name, default=logging.INFO):
+    level = logging.getLevelName(str(name).upper())
+    return level if isinstance(level, int) else default
+
+
+def setup_logging(cfg=None):
+    """Route all logging through a queue to the configured handlers; safe to call twice."""
+    global _listener
+    if _listener is not None:
+        return _listener
+    settings = logging_config(cfg)
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    if settings.get('file'):
+        path = settings['file']
+        if not os.path.isabs(path):
+            path = os.path.join(get_app_data_dir(), path)
+        try:
+            file_handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=int(settings.get('max_bytes', 5 * 1024 * 1024)),
+                backupCount=int(settings.get('backup_count', 3)), encoding='utf-8')
+            handlers.append(file_handler)
+        except OSError as e:
+            logging.getLogger(__name__).warning("Cannot open log file %s: %s", path, e)
+    if settings.get('console', True):
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(_level(settings.get('level', 'INFO')))
+    for name, level in settings['levels'].items():
+        logging.getLogger(name).setLevel(_level(level))
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Flush the queue and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
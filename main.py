@@ -1,30 +1,46 @@
 # main.py
 import os
 import sys
+import multiprocessing
 
 # Add the project root directory to Python path
 root_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, root_dir)
 
+# Imported first so the startup timeline covers every import below
+import startup_profile
+sys.argv[:] = startup_profile.configure(sys.argv)
+from startup_profile import phase as profile_phase
+
+import logging
+from log_config import setup_logging
+setup_logging()
+logger = logging.getLogger('main')
+
 # Qt6 compatibility fixes
 os.environ["QT_QPA_PLATFORM_PLUGIN_PATH"] = ""
 os.environ["QT_API"] = "pyqt6"
 
 # Add this before any Qt imports
 try:
-    from PyQt6 import QtCore, QtWidgets
-    print("PyQt6 imported successfully")
+    with profile_phase('import PyQt6'):
+        from PyQt6 import QtCore, QtWidgets
+    logger.debug("PyQt6 imported successfully")
 except ImportError as e:
-    print(f"PyQt6 import failed: {e}")
+    logger.critical("PyQt6 import failed: %s", e)
     sys.exit(1)
 
 # Rest of your imports
 from PyQt6.QtWidgets import QApplication, QDialog
 from PyQt6.QtGui import QFontDatabase
-from ui.login_dialog import LoginDialog
-from ui.main_window import MainWindow
-from database import Session, Base, engine, init_db
-from models import User, Result, Order, Patient
+from PyQt6.QtCore import QTimer
+with profile_phase('import database'):
+    from database import Session, Base, engine, init_db
+with profile_phase('import models'):
+    from models import User, Result, Order, Patient
+with profile_phase('import ui'):
+    from ui.login_dialog import LoginDialog
+    from ui.main_window import MainWindow
 
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
@@ -36,6 +52,17 @@ def resource_path(relative_path):
     
     return os.path.join(base_path, relative_path)
 
+def startup_finished():
+    """Runs once the main window has shown its first tab."""
+    startup_profile.mark('first tab shown')
+    path = startup_profile.write()
+    if path:
+        logger.info("Startup profile written to %s", path)
+    if startup_profile.exit_after():
+        # exit() rather than quit(): quit() would ask the windows to close
+        # and the main window confirms that with a dialog
+        QApplication.exit(0)
+
 def main():
     # Set up paths for packaged mode
     if getattr(sys, 'frozen', False):
@@ -44,7 +71,8 @@ def main():
     
     try:
         # Initialize database
-        init_db()
+        with profile_phase('init_db'):
+            init_db()
         
         # Create default admin user if needed
         session = Session()
@@ -53,20 +81,21 @@ def main():
                 default_user = User(username="admin", password="admin", role="admin")
                 session.add(default_user)
                 session.commit()
-                print("Default user created: admin/admin")
+                logger.info("Default user created: admin")
             else:
-                print("Admin user already exists")
+                logger.debug("Admin user already exists")
         except Exception as e:
-            print(f"Error creating default user: {e}")
+            logger.error("Error creating default user: %s", e)
             session.rollback()
         finally:
             session.close()
     except Exception as e:
-        print(f"Database initialization error: {e}")
+        logger.critical("Database initialization error: %s", e)
         sys.exit(1)
 
     # Create application
-    app = QApplication(sys.argv)
+    with profile_phase('QApplication'):
+        app = QApplication(sys.argv)
     
     # Register Inter fonts after QApplication creation
     def register_inter_fonts():
@@ -74,7 +103,7 @@ def main():
         try:
             fonts_dir = resource_path("fonts")
             if not os.path.isdir(fonts_dir):
-                print(f"Fonts directory not found: {fonts_dir}")
+                logger.warning("Fonts directory not found: %s", fonts_dir)
                 return
 
             # Minimal set of required Inter fonts (18pt versions)
@@ -83,22 +112,22 @@ def main():
             for fn in required:
                 path = os.path.join(fonts_dir, fn)
                 if not os.path.exists(path):
-                    print(f"Required font not found: {path}")
+                    logger.warning("Required font not found: %s", path)
                     continue
                 try:
-                    print(f"Loading font: {fn}")
                     res = QFontDatabase.addApplicationFont(path)
                     if res != -1:
                         loaded += 1
-                        print(f"Successfully loaded font: {fn}")
+                        logger.debug("Loaded font: %s", fn)
                 except Exception as e:
-                    print(f"Failed to load font {fn}: {e}")
+                    logger.warning("Failed to load font %s: %s", fn, e)
 
-            print(f"Loaded {loaded} Inter fonts from {fonts_dir}")
+            logger.debug("Loaded %d Inter fonts from %s", loaded, fonts_dir)
         except Exception as e:
-            print(f"Error registering Inter fonts: {e}")
+            logger.error("Error registering Inter fonts: %s", e)
 
-    register_inter_fonts()
+    with profile_phase('fonts'):
+        register_inter_fonts()
     
     # Set application properties
     app.setApplicationName("Clinical Laboratory Software")
@@ -106,24 +135,29 @@ def main():
     app.setOrganizationName("ClinicalLab")
     
     # Show login dialog
-    login = LoginDialog()
-    print("Showing LoginDialog")
-    result = login.exec()
-    print(f"LoginDialog result: {result}")
+    with profile_phase('login dialog'):
+        login = LoginDialog()
+    with profile_phase('login', interactive=True):
+        result = login.exec()
+    logger.debug("LoginDialog result: %s", result)
     
     if result == QDialog.DialogCode.Accepted:
         try:
-            print(f"Opening MainWindow for user: {login.current_user.username}")
-            window = MainWindow(login.current_user)
-            window.show()
-            print("MainWindow shown")
+            logger.info("Opening MainWindow for user: %s", login.current_user.username)
+            with profile_phase('main window'):
+                window = MainWindow(login.current_user)
+                window.show()
+            # Queued behind the main window's own first-tab build
+            QTimer.singleShot(0, startup_finished)
             sys.exit(app.exec())
         except Exception as e:
-            print(f"MainWindow initialization error: {e}")
+            logger.exception("MainWindow initialization error: %s", e)
             sys.exit(1)
     else:
-        print("Login dialog not accepted")
+        logger.info("Login dialog not accepted")
         sys.exit(0)
 
 if __name__ == "__main__":
+    # Batch PDF rendering starts worker processes; needed in the frozen build
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,177 @@
+# migrations.py
+"""Idempotent schema migrations for existing lab.db files.
+
+``Base.metadata.create_all`` only creates missing tables, so databases created
+by older versions never receive new columns or indexes. ``run_migrations`` is
+called from ``init_db`` on every start and only does work that is still needed.
+"""
+import logging
+from sqlalchemy import func, inspect, text
+from sqlalchemy.orm import joinedload
+from database import Base, Session, engine
+from models import Patient, Order, Result, DataVersion
+
+logger = logging.getLogger(__name__)
+
+
+def add_missing_columns():
+    """ALTER TABLE ... ADD COLUMN for model columns missing from existing tables."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {col['name'] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {col_type}'))
+                added.append(f"{table.name}.{column.name}")
+    if added:
+        logger.info("Added columns: %s", ', '.join(added))
+    return added
+
+
+def create_missing_indexes():
+    """Create indexes declared on the models that an existing database lacks."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine)
+                created.append(index.name)
+    if created:
+        # Refresh planner statistics so SQLite starts using the new indexes
+        with engine.begin() as conn:
+            conn.execute(text('ANALYZE'))
+        logger.info("Created indexes: %s", ', '.join(created))
+    return created
+
+
+PATIENT_INDEX_WATERMARK = 'patient_search_backfill'
+
+
+def backfill_patient_search_index(batch_size=500):
+    """Build blind index tokens for patients saved before the index existed.
+
+    Walks patients by id past a watermark kept in data_versions. A patient
+    whose name decrypts to nothing (or fails to decrypt) keeps a NULL index
+    and is skipped rather than stopping the backfill. New patients are
+    indexed by the before_flush listener.
+    """
+    total = 0
+    session = Session()
+    try:
+        watermark = session.get(DataVersion, PATIENT_INDEX_WATERMARK)
+        if watermark is None:
+            watermark = DataVersion(table_name=PATIENT_INDEX_WATERMARK, version=0)
+            session.add(watermark)
+        last_id = watermark.version
+        ceiling = session.query(func.max(Patient.id)).scalar() or 0
+        while last_id < ceiling:
+            patients = (session.query(Patient)
+                        .filter(Patient.id > last_id, Patient.id <= ceiling,
+                                Patient.name_index.is_(None), Patient.name.isnot(None))
+                        .order_by(Patient.id).limit(batch_size).all())
+            if not patients:
+                break
+            for patient in patients:
+                try:
+                    patient.refresh_search_index()
+                except Exception as e:
+                    logger.warning("Cannot index patient %s: %s", patient.id, type(e).__name__)
+            last_id = watermark.version = patients[-1].id
+            session.commit()
+            total += sum(1 for p in patients if p.name_index is not None)
+        watermark.version = ceiling
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+    if total:
+        logger.info("Indexed %s patient(s) for encrypted search", total)
+    return total
+
+
+RESULT_VALUES_WATERMARK = 'result_values_backfill'
+
+
+def backfill_result_values(batch_size=500):
+    """Fill result_values for results saved before the table existed.
+
+    Results without numeric values get no rows, so "has no values" cannot
+    tell processed results apart. The highest result id scanned is kept in
+    data_versions instead, and each start only looks past it. Results saved
+    by the app are synced by the before_flush listener.
+    """
+    total = 0
+    session = Session()
+    try:
+        watermark = session.get(DataVersion, RESULT_VALUES_WATERMARK)
+        if watermark is None:
+            watermark = DataVersion(table_name=RESULT_VALUES_WATERMARK, version=0)
+            session.add(watermark)
+        last_id = watermark.version
+        ceiling = session.query(func.max(Result.id)).scalar() or 0
+        while last_id < ceiling:
+            results = (session.query(Result)
+                       .options(joinedload(Result.order).joinedload(Order.test),
+                                joinedload(Result.order).joinedload(Order.patient))
+                       .filter(Result.id > last_id, Result.id <= ceiling, Result.results.isnot(None),
+                               ~Result.parameter_values.any())
+                       .order_by(Result.id).limit(batch_size).all())
+            if not results:
+                break
+            for result in results:
+                result.refresh_values()
+            last_id = watermark.version = results[-1].id
+            session.commit()
+            total += len(results)
+        watermark.version = ceiling
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+    if total:
+        logger.info("Extracted parameter values of %s result(s)", total)
+    return total
+
+
+# Tables whose writes are counted in data_versions for change watermarks
+VERSIONED_TABLES = ('orders', 'results')
+
+
+def install_change_triggers():
+    """Keep data_versions.version in step with every write to VERSIONED_TABLES."""
+    with engine.begin() as conn:
+        for table in VERSIONED_TABLES:
+            conn.execute(text(
+                "INSERT OR IGNORE INTO data_versions (table_name, version) VALUES (:table, 0)"
+            ), {'table': table})
+            for op in ('INSERT', 'UPDATE', 'DELETE'):
+                conn.execute(text(
+                    f'CREATE TRIGGER IF NOT EXISTS "trg_{table}_{op.lower()}_version" '
+                    f'AFTER {op} ON "{table}" BEGIN '
+                    f"UPDATE data_versions SET version = version + 1 WHERE table_name = '{table}'; "
+                    f'END'
+                ))
+
+
+def run_migrations():
+    add_missing_columns()
+    create_missing_indexes()
+    install_change_triggers()
+    backfill_patient_search_index()
+    backfill_result_values()
@@ -1,9 +1,17 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Text, Float
-from sqlalchemy.orm import relationship, backref
-from database import Base, Session
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Text, Float, Index
+from sqlalchemy import event, inspect, insert, select, update, func, or_, true, false, cast
+from sqlalchemy.orm import relationship, backref, contains_eager, Session as OrmSession
+from database import (
+    Base, engine, decrypt_cache, decrypt_many, blind_index, blind_index_tokens, blind_index_query_tokens,
+    normalize_search_value
+)
 from cryptography.fernet import Fernet
 import os
+import json
 import datetime
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Load or generate encryption key
 key_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'encryption_key.key')
@@ -16,27 +24,74 @@ with open(key_file, 'rb') as f:
     try:
         cipher = Fernet(key_data)
     except ValueError as e:
-        print(f"Invalid encryption key: {e}. Regenerating key...")
+        logger.warning("Invalid encryption key: %s. Regenerating key...", e)
         key = Fernet.generate_key()
         with open(key_file, 'wb') as f:
             f.write(key)
         cipher = Fernet(key)
 
+PID_PREFIX = 'TRY'
+PID_DIGITS = 5
+
+
+def _last_pid_number(conn, prefix):
+    """Highest numeric suffix among existing PIDs with this prefix (sequence seeding only)."""
+    last_pid = conn.execute(
+        select(Patient.pid).where(Patient.pid.like(f'{prefix}%')).order_by(Patient.pid.desc()).limit(1)
+    ).scalar()
+    suffix = last_pid[len(prefix):] if last_pid else ''
+    return int(suffix) if suffix.isdigit() else 0
+
+
+def reserve_sequence(name, count=1, seed=None, connection=None):
+    """Claim ``count`` numbers from the named sequence and return the last one.
+
+    The block is claimed with a single UPDATE ... RETURNING, so concurrent
+    terminals never receive the same number. It runs in its own transaction
+    unless ``connection`` is given. Pass the session's connection when the
+    caller has already written in its transaction: SQLite allows one writer,
+    so a second connection would wait on the caller's own lock.
+    ``seed(conn)`` supplies the starting value the first time a sequence is used.
+    """
+    claim = (
+        update(IdSequence)
+        .where(IdSequence.name == name)
+        .values(last_value=IdSequence.last_value + count)
+        .returning(IdSequence.last_value)
+    )
+
+    def run(conn):
+        last = conn.execute(claim).scalar()
+        if last is None:
+            conn.execute(insert(IdSequence).prefix_with('OR IGNORE').values(
+                name=name, last_value=seed(conn) if seed else 0))
+            last = conn.execute(claim).scalar()
+        return last
+
+    if connection is not None:
+        return run(connection)
+    with engine.begin() as conn:
+        return run(conn)
+
+
+def reserve_pids(count=1, prefix=PID_PREFIX):
+    """Reserve ``count`` consecutive PIDs, e.g. ['TRY00009', 'TRY00010'].
+
+    Numbers of patients that are never saved are simply skipped. The UI only
+    needs one at a time (generate_pid); blocks are for bulk loaders such as
+    benchmarks/synthetic_data.py.
+    """
+    if count < 1:
+        return []
+    last = reserve_sequence(f'pid:{prefix}', count, lambda conn: _last_pid_number(conn, prefix))
+    if last >= 10 ** PID_DIGITS:
+        raise ValueError(f"PID sequence {prefix} exhausted")
+    return [f"{prefix}{number:0{PID_DIGITS}d}" for number in range(last - count + 1, last + 1)]
+
+
 def generate_pid():
     """Generate a sequential PID in the format TRY00001, TRY00002, etc."""
-    session = Session()
-    try:
-        # Query the highest PID with prefix 'TRY'
-        last_patient = session.query(Patient).filter(Patient.pid.like('TRY%')).order_by(Patient.pid.desc()).first()
-        if last_patient and last_patient.pid and last_patient.pid.startswith('TRY'):
-            last_number = int(last_patient.pid[3:])  # Extract number after 'TRY'
-            next_number = last_number + 1
-        else:
-            next_number = 1
-        pid = f"TRY{next_number:05d}"
-        return pid
-    finally:
-        session.close()
+    return reserve_pids(1)[0]
 
 class Patient(Base):
     __tablename__ = 'patients'
@@ -49,50 +104,171 @@ class Patient(Base):
     gender = Column(String)
     contact = Column(String)
     address = Column(String)
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
+    # Blind index of the full normalized name/contact (see PatientSearchToken)
+    name_index = Column(String, index=True)
+    contact_index = Column(String, index=True)
 
     # Configure cascading delete from Patient to Order
     orders = relationship("Order", 
                         back_populates="patient",
                         cascade="all, delete-orphan",
                         passive_deletes=True)
+    search_tokens = relationship("PatientSearchToken",
+                               cascade="all, delete-orphan")
 
-    @property
-    def decrypted_name(self):
+    def _decrypted(self, column):
+        """Decrypt a column through the process-wide cache."""
         try:
-            decrypted = cipher.decrypt(self.name.encode()).decode()
-            return decrypted
+            return decrypt_cache.get(column, getattr(self, column), _fernet_decrypt)
         except Exception as e:
-            print(f"Decryption error for patient {self.id} name: {e}")
+            logger.warning("Decryption error for patient %s %s: %s", self.id, column, type(e).__name__)
             return "Decryption Failed"
 
+    @property
+    def decrypted_name(self):
+        return self._decrypted('name')
+
     @property
     def decrypted_contact(self):
-        try:
-            return cipher.decrypt(self.contact.encode()).decode() if self.contact else ""
-        except Exception as e:
-            print(f"Decryption error for patient {self.id} contact: {e}")
-            return "Decryption Failed"
+        return self._decrypted('contact') if self.contact else ""
 
     @property
     def decrypted_address(self):
-        try:
-            return cipher.decrypt(self.address.encode()).decode() if self.address else ""
-        except Exception as e:
-            print(f"Decryption error for patient {self.id} address: {e}")
-            return "Decryption Failed"
+        return self._decrypted('address') if self.address else ""
 
     @property
     def decrypted_title(self):
-        try:
-            return cipher.decrypt(self.title.encode()).decode() if self.title else ""
-        except Exception as e:
-            print(f"Decryption error for patient {self.id} title: {e}")
-            return "Decryption Failed"
+        return self._decrypted('title') if self.title else ""
+
+    @staticmethod
+    def prefetch_decrypted(patients, columns=None):
+        """Decrypt the given columns for many patients in one batch.
+
+        The plaintexts land in ``decrypt_cache``, so the ``decrypted_*``
+        properties of these patients are cache hits afterwards.
+        """
+        patients = [p for p in patients if p is not None]
+        for column in columns or ENCRYPTED_PATIENT_FIELDS:
+            decrypt_many((getattr(p, column) for p in patients), fernet=cipher, column=column)
+
+    def refresh_search_index(self):
+        """Recompute the blind index tokens from the encrypted name and contact."""
+        tokens = []
+        for field in SEARCHABLE_PATIENT_FIELDS:
+            plain = normalize_search_value(field, _plaintext(getattr(self, field), field))
+            setattr(self, f"{field}_index", blind_index(field, plain) if plain else None)
+            tokens.extend(PatientSearchToken(field=field, token=t)
+                          for t in blind_index_tokens(field, plain))
+        self.search_tokens = tokens
+
+    def matches_search(self, field, term):
+        """Confirm a blind index candidate against the decrypted value."""
+        value = self.decrypted_name if field == 'name' else self.decrypted_contact
+        needle = normalize_search_value(field, term)
+        return not needle or needle in normalize_search_value(field, value)
 
     def __repr__(self):
         return f"<Patient(name={self.decrypted_name}, pid={self.pid})>"
 
+
+SEARCHABLE_PATIENT_FIELDS = ('name', 'contact')
+
+
+class PatientSearchToken(Base):
+    """Keyed HMAC tokens (word prefixes and trigrams) of a patient's name/contact."""
+    __tablename__ = 'patient_search_tokens'
+    id = Column(Integer, primary_key=True)
+    patient_id = Column(Integer, ForeignKey('patients.id', ondelete='CASCADE'), nullable=False, index=True)
+    field = Column(String, nullable=False)
+    token = Column(String, nullable=False)
+
+    __table_args__ = (
+        Index('ix_patient_search_tokens_field_token', 'field', 'token', 'patient_id'),
+    )
+
+
+ENCRYPTED_PATIENT_FIELDS = ('title', 'name', 'contact', 'address')
+
+
+def _fernet_decrypt(value):
+    return cipher.decrypt(value.encode()).decode()
+
+
+def _evict_on_write(column):
+    @event.listens_for(getattr(Patient, column), 'set')
+    def _evict(target, value, oldvalue, initiator):
+        if isinstance(oldvalue, str) and oldvalue != value:
+            decrypt_cache.invalidate(column, oldvalue)
+
+
+for _column in ENCRYPTED_PATIENT_FIELDS:
+    _evict_on_write(_column)
+
+
+def _plaintext(value, column=None):
+    """Decrypt a column value, returning it unchanged if it is not a Fernet token."""
+    if not value:
+        return ""
+    try:
+        return decrypt_cache.get(column, value, _fernet_decrypt)
+    except Exception:
+        return value
+
+
+def patient_search_clause(field, term):
+    """Return a SQL criterion for patients whose encrypted ``field`` contains ``term``.
+
+    The criterion is evaluated entirely on the blind index, so it may return
+    a few false positives; callers that display the rows can confirm them with
+    ``Patient.matches_search``.
+    """
+    normalized = normalize_search_value(field, term)
+    if not normalized:
+        return true()
+    index_column = getattr(Patient, f"{field}_index")
+    clauses = [index_column == blind_index(field, normalized)]
+    tokens = blind_index_query_tokens(field, term)
+    if tokens:
+        candidates = (
+            select(PatientSearchToken.patient_id)
+            .where(PatientSearchToken.field == field, PatientSearchToken.token.in_(tokens))
+            .group_by(PatientSearchToken.patient_id)
+            .having(func.count(func.distinct(PatientSearchToken.token)) == len(tokens))
+        )
+        clauses.append(Patient.id.in_(candidates))
+    return or_(*clauses)
+
+
+@event.listens_for(OrmSession, 'before_flush')
+def _sync_patient_search_index(session, flush_context, instances):
+    """Keep the blind index in step with every write to Patient.name/contact."""
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Patient):
+            continue
+        state = inspect(obj)
+        if state.pending or any(state.attrs[f].history.has_changes() for f in SEARCHABLE_PATIENT_FIELDS):
+            obj.refresh_search_index()
+
+class IdSequence(Base):
+    """Last number handed out per named sequence (see reserve_sequence)."""
+    __tablename__ = 'id_sequences'
+    name = Column(String, primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
+
+
+@event.listens_for(Patient, 'after_insert')
+def _advance_pid_sequence(mapper, connection, target):
+    """Keep the sequence ahead of PIDs typed in by hand, e.g. TRY00500."""
+    pid = target.pid or ''
+    prefix, suffix = pid[:-PID_DIGITS], pid[-PID_DIGITS:]
+    if prefix and suffix.isdigit():
+        connection.execute(
+            update(IdSequence)
+            .where(IdSequence.name == f'pid:{prefix}')
+            .values(last_value=func.max(IdSequence.last_value, int(suffix)))
+        )
+
 class Test(Base):
     __tablename__ = 'tests'
     id = Column(Integer, primary_key=True)
@@ -117,6 +293,8 @@ class Order(Base):
     payment_method = Column(String)
     discount = Column(Float, default=0.0)
     group_id = Column(Integer)
+    # Last insert/update (UTC); incremental analytics snapshots re-export changed months
+    changed_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow, index=True)
 
     # Configure relationships with proper cascading
     patient = relationship("Patient", back_populates="orders")
@@ -129,16 +307,172 @@ class Order(Base):
                           cascade="all, delete-orphan",
                           passive_deletes=True)
 
+    __table_args__ = (
+        # Date-range listings, dashboard counters and status filters
+        Index('ix_orders_order_date_id', 'order_date', 'id'),
+        Index('ix_orders_status_order_date', 'status', 'order_date'),
+        # Patient order history and patient deletes
+        Index('ix_orders_patient_id_order_date', 'patient_id', 'order_date'),
+        Index('ix_orders_group_id', 'group_id'),
+        Index('ix_orders_test_id', 'test_id'),
+    )
+
 class Result(Base):
     __tablename__ = 'results'
     id = Column(Integer, primary_key=True)
     order_id = Column(Integer, ForeignKey('orders.id', ondelete='CASCADE'), nullable=False, unique=True)
-    result_date = Column(DateTime, default=datetime.datetime.utcnow)
+    result_date = Column(DateTime, default=datetime.datetime.utcnow, index=True)
     results = Column(JSON)
     notes = Column(String)
+    changed_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow, index=True)
     
     # Configure one-to-one relationship with Order
     order = relationship("Order", back_populates="results")
+    # Numeric parameters of ``results``, one row each (see refresh_values)
+    parameter_values = relationship("ResultValue",
+                                    cascade="all, delete-orphan",
+                                    passive_deletes=True)
+
+    def refresh_values(self, order=None):
+        """Rebuild parameter_values from the ``results`` JSON.
+
+        Units and H/L/N flags come from the test template and the patient's
+        gender and age; parameters without a numeric value are skipped.
+        """
+        order = order or self.order
+        test = order.test if order else None
+        patient = order.patient if order else None
+        try:
+            template = json.loads(test.template) if test and test.template else []
+        except ValueError:
+            template = []
+        fields = {field.get('name'): field for field in template if isinstance(field, dict)}
+        values = self.results
+        if isinstance(values, str):
+            try:
+                values = json.loads(values)
+            except ValueError:
+                values = {}
+        rows = []
+        for name, raw in (values.items() if isinstance(values, dict) else ()):
+            number = _as_number(raw)
+            if number is None:
+                continue
+            field = fields.get(name, {})
+            reference = reference_range(field.get('reference'), getattr(patient, 'gender', None),
+                                        is_child_age(getattr(patient, 'age', None)))
+            rows.append(ResultValue(parameter=name, value=number, unit=field.get('unit'),
+                                    flag=reference_flag(number, reference)))
+        self.parameter_values = rows
+
+
+class ResultValue(Base):
+    """One numeric parameter of a Result, so parameter queries need no JSON parsing."""
+    __tablename__ = 'result_values'
+    id = Column(Integer, primary_key=True)
+    result_id = Column(Integer, ForeignKey('results.id', ondelete='CASCADE'), nullable=False, index=True)
+    parameter = Column(String, nullable=False)
+    value = Column(Float)
+    unit = Column(String)
+    # 'H' above, 'L' below, 'N' within the reference range; NULL without one
+    flag = Column(String(1))
+
+    __table_args__ = (
+        # "HbA1c > 6.5" and parameter trends
+        Index('ix_result_values_parameter_value', 'parameter', 'value'),
+        # Abnormal-value reports
+        Index('ix_result_values_flag_parameter', 'flag', 'parameter'),
+    )
+
+
+def _as_number(value):
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).strip())
+    except ValueError:
+        return None
+
+
+def is_child_age(age):
+    """Whether an age selects the "child" reference ranges."""
+    try:
+        return int(age) < 18
+    except (TypeError, ValueError):
+        return False
+
+
+def reference_range(reference, gender=None, is_child=False):
+    """The reference range of a template field that applies to a patient, or None.
+
+    ``reference`` is a plain range ("80-100", "<200", ">40") or a dict keyed by
+    gender with "default" and optional "age_based" child/adult overrides. The
+    PDF report and the stored result_values flags both go through this.
+    """
+    if isinstance(reference, dict):
+        selected = reference.get((gender or '').lower(), reference.get('default'))
+        age_based = reference.get('age_based') or {}
+        selected = age_based.get('child' if is_child else 'adult', selected)
+        reference = selected
+    if reference in (None, '', 'N/A'):
+        return None
+    return str(reference).strip()
+
+
+def reference_flag(value, reference):
+    """'H', 'L' or 'N' for ``value`` against a range such as "80-100", "<200" or ">40".
+
+    ``value`` may be the raw entered text; None when it is not numeric or
+    the range cannot be parsed.
+    """
+    value = _as_number(value)
+    if value is None or not reference:
+        return None
+    try:
+        if reference.startswith('<'):
+            return 'H' if value >= float(reference[1:]) else 'N'
+        if reference.startswith('>'):
+            return 'L' if value <= float(reference[1:]) else 'N'
+        low, high = (float(part) for part in reference.split('-'))
+    except ValueError:
+        return None
+    return 'L' if value < low else 'H' if value > high else 'N'
+
+
+@event.listens_for(OrmSession, 'before_flush')
+def _sync_result_values(session, flush_context, instances):
+    """Keep result_values in step with every write to Result.results."""
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Result):
+            continue
+        state = inspect(obj)
+        if state.pending or state.attrs.results.history.has_changes():
+            order = obj.order or (session.get(Order, obj.order_id) if obj.order_id else None)
+            obj.refresh_values(order)
+
+
+def query_result_values(session, parameter=None, start=None, end=None, above=None, below=None, flags=None):
+    """ResultValue rows with their result date and order, filtered on indexed columns.
+
+    E.g. all HbA1c above 6.5 this month, or every 'H'/'L' value of a day.
+    """
+    query = (session.query(ResultValue, Result.result_date, Result.order_id)
+             .join(Result, Result.id == ResultValue.result_id))
+    if parameter:
+        query = query.filter(ResultValue.parameter == parameter)
+    if above is not None:
+        query = query.filter(ResultValue.value > above)
+    if below is not None:
+        query = query.filter(ResultValue.value < below)
+    if flags:
+        query = query.filter(ResultValue.flag.in_(list(flags)))
+    if start is not None:
+        query = query.filter(Result.result_date >= start)
+    if end is not None:
+        query = query.filter(Result.result_date <= end)
+    return query.order_by(Result.result_date)
 
 class User(Base):
     __tablename__ = 'users'
@@ -158,6 +492,11 @@ class AuditLog(Base):
     details = Column(Text)
     user = relationship("User")
 
+    __table_args__ = (
+        Index('ix_audit_logs_timestamp', 'timestamp'),
+        Index('ix_audit_logs_entity', 'entity_type', 'entity_id'),
+    )
+
 
 class ArchiveEntry(Base):
     __tablename__ = 'archive_entries'
@@ -169,6 +508,11 @@ class ArchiveEntry(Base):
     data = Column(JSON)
     user = relationship("User")
 
+    __table_args__ = (
+        Index('ix_archive_entries_deleted_at', 'deleted_at'),
+        Index('ix_archive_entries_entity', 'entity_type', 'entity_id'),
+    )
+
 
 def _serialize_model(obj):
     """Return a dict of column values for a SQLAlchemy model instance."""
@@ -210,6 +554,125 @@ def archive_patient(session, patient, deleted_by=None):
     session.flush()
     return entry
 
+def allocate_group_id(count=1, connection=None):
+    """Next order group id, unique across terminals sharing the database.
+
+    With ``count`` > 1 a block of consecutive ids is claimed and the first
+    one is returned. ``connection`` is passed on to reserve_sequence.
+    """
+    last = reserve_sequence(
+        'order_group', count, seed=lambda conn: conn.execute(select(func.max(Order.group_id))).scalar() or 0,
+        connection=connection)
+    return last - count + 1
+
+
+def create_orders(session, patient_ids, test_ids, group_id=None, **values):
+    """Insert one order per (patient, test) pair in a single INSERT ... RETURNING.
+
+    All orders share ``group_id`` (allocated when not given). Extra keyword
+    arguments are applied to every row. Returns ``(group_id, order_ids)`` with
+    ids in patient-major, test-minor order. The caller commits the session.
+    """
+    if group_id is None:
+        # In the session's transaction: it may already hold SQLite's write lock
+        group_id = allocate_group_id(connection=session.connection())
+    values.setdefault('status', 'Pending')
+    rows = [
+        dict(values, patient_id=patient_id, test_id=int(test_id), group_id=group_id)
+        for patient_id in patient_ids
+        for test_id in test_ids
+    ]
+    if not rows:
+        return group_id, []
+    result = session.execute(insert(Order).returning(Order.id, sort_by_parameter_order=True), rows)
+    return group_id, list(result.scalars())
+
+
+ORDER_SEARCH_FIELDS = ('id', 'pid', 'test', 'name', 'contact')
+
+
+def order_search_clause(term, fields=ORDER_SEARCH_FIELDS):
+    """Return a SQL criterion for orders whose ID, patient PID, test name or
+    patient name/contact (via the blind index) contains ``term``.
+
+    The query must already be joined to Patient and Test, as order_search_query
+    does. Blind index matches may include a few false positives; confirm them
+    with ``order_matches_search``.
+    """
+    term = (term or '').strip()
+    if not term:
+        return true()
+    clauses = []
+    if 'id' in fields:
+        clauses.append(cast(Order.id, String).contains(term, autoescape=True))
+    if 'pid' in fields:
+        clauses.append(Patient.pid.icontains(term, autoescape=True))
+    if 'test' in fields:
+        clauses.append(Test.name.icontains(term, autoescape=True))
+    clauses.extend(patient_search_clause(field, term) for field in _patient_search_fields(term, fields))
+    return or_(*clauses) if clauses else false()
+
+
+def _patient_search_fields(term, fields):
+    """Patient fields an order search term can match on.
+
+    Contacts are only searched for terms without letters: their blind index
+    keeps just the digits, so 'TRY00012' would otherwise match phone numbers.
+    """
+    return [
+        field for field in SEARCHABLE_PATIENT_FIELDS
+        if field in fields and normalize_search_value(field, term)
+        and not (field == 'contact' and any(c.isalpha() for c in term))
+    ]
+
+
+def order_matches_search(order, term, fields=ORDER_SEARCH_FIELDS):
+    """Confirm an order_search_clause candidate against the decrypted patient values."""
+    term = (term or '').strip()
+    if not term:
+        return True
+    needle = term.lower()
+    patient, test = order.patient, order.test
+    if 'id' in fields and needle in str(order.id):
+        return True
+    if 'pid' in fields and patient is not None and needle in (patient.pid or '').lower():
+        return True
+    if 'test' in fields and test is not None and needle in (test.name or '').lower():
+        return True
+    return patient is not None and any(
+        patient.matches_search(field, term) for field in _patient_search_fields(term, fields))
+
+
+def order_search_query(session, search_text=None, fields=ORDER_SEARCH_FIELDS, start=None, end=None,
+                       statuses=None, department=None, test_name=None, patient_id=None):
+    """Orders matching every given filter, with Patient and Test joined exactly once.
+
+    Both relationships are populated from that join, so each order comes back
+    as one row and only matching orders are ever loaded. The query has no
+    ORDER BY, so it can be handed straight to a KeysetPager.
+    """
+    query = (
+        session.query(Order)
+        .outerjoin(Order.patient)
+        .outerjoin(Order.test)
+        .options(contains_eager(Order.patient), contains_eager(Order.test))
+    )
+    if start is not None:
+        query = query.filter(Order.order_date >= start)
+    if end is not None:
+        query = query.filter(Order.order_date <= end)
+    if statuses:
+        query = query.filter(Order.status.in_(list(statuses)))
+    if department:
+        query = query.filter(Test.department == department)
+    if test_name:
+        query = query.filter(Test.name == test_name)
+    if patient_id:
+        query = query.filter(Order.patient_id == patient_id)
+    if search_text and search_text.strip():
+        query = query.filter(order_search_clause(search_text, fields))
+    return query
+
 class Location(Base):
     __tablename__ = 'locations'
     id = Column(Integer, primary_key=True)
@@ -233,7 +696,7 @@ class OrderTemplate(Base):
 class OrderComment(Base):
     __tablename__ = 'order_comments'
     id = Column(Integer, primary_key=True)
-    order_id = Column(Integer, ForeignKey('orders.id', ondelete='CASCADE'), nullable=False)
+    order_id = Column(Integer, ForeignKey('orders.id', ondelete='CASCADE'), nullable=False, index=True)
     comment = Column(String, nullable=False)
     timestamp = Column(DateTime, default=datetime.datetime.utcnow)
 
@@ -244,7 +707,19 @@ class Package(Base):
     test_ids = Column(String)
     description = Column(String)
 
+class DataVersion(Base):
+    """Per-table write counter, bumped by SQLite triggers (see migrations.py).
+
+    Rows named after a backfill instead hold the last id it processed.
+    """
+    __tablename__ = 'data_versions'
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
 # Make these available for import
-__all__ = ['Base', 'Patient', 'Test', 'Order', 'Result', 'User', 'AuditLog', 
+__all__ = ['Base', 'Patient', 'PatientSearchToken', 'Test', 'Order', 'Result', 'User', 'AuditLog', 
            'Location', 'ReferringPhysician', 'OrderTemplate', 'OrderComment', 
-           'Package', 'cipher', 'generate_pid']
\ No newline at end of file
+           'Package', 'DataVersion', 'IdSequence', 'cipher', 'generate_pid', 'reserve_pids',
+           'allocate_group_id', 'create_orders', 'patient_search_clause', 'order_search_clause',
+           'order_matches_search', 'order_search_query', 'ResultValue', 'query_result_values',
+           'reference_range', 'reference_flag', 'is_child_age']
\ No newline at end of file
@@ -0,0 +1,94 @@
+# pagination.py
+"""Keyset (cursor) pagination for order listings.
+
+Pages are cut on the (order_date, id) key instead of OFFSET, so every page is
+an index range scan on ix_orders_order_date_id no matter how deep the user
+scrolls, and rows inserted meanwhile never shift a page boundary. A listing
+sorted on another column pages on (column, id) the same way.
+"""
+import logging
+from sqlalchemy import func, tuple_
+from database import Session
+from models import Order
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 200
+DEFAULT_KEYS = (Order.order_date, Order.id)
+
+
+def sort_keys(*columns):
+    """Pager keys for a listing sorted on ``columns``, with ties broken by Order.id.
+
+    A NULL would drop out of the row-value comparison that cuts the pages,
+    so NULLs sort as empty strings.
+    """
+    return tuple(func.coalesce(column, '') for column in columns) + (Order.id,)
+
+
+class KeysetPager:
+    """Fetch rows of a query page by page, newest first by default.
+
+    ``build_query(session)`` returns the filtered query (without ORDER BY) and
+    ``to_rows(items)`` turns a page of ORM objects into table rows while the
+    session is still open. ``to_rows`` may drop items that can only be
+    matched in Python (e.g. on decrypted values); pages then hold fewer rows.
+    Pass ``exact=False`` when it may, so matched() reports count() as an
+    upper bound. ``keys`` are the SQL expressions the listing is sorted on,
+    the last one unique (see sort_keys).
+    """
+
+    def __init__(self, build_query, to_rows, page_size=DEFAULT_PAGE_SIZE,
+                 keys=DEFAULT_KEYS, descending=True, exact=True):
+        self.build_query = build_query
+        self.to_rows = to_rows
+        self.page_size = page_size
+        self.keys = keys
+        self.descending = descending
+        self.exact = exact
+        self.cursor = None
+        self.exhausted = False
+        self.fetched = 0
+        self.dropped = 0
+        self.total = None
+
+    def count(self):
+        """Total number of rows the query matches, counted in SQL (also kept in ``total``)."""
+        with Session() as session:
+            query = self.build_query(session).order_by(None)
+            self.total = query.with_entities(func.count(self.keys[-1])).scalar() or 0
+        return self.total
+
+    def matched(self):
+        """``(rows, exact)``: how many rows the listing holds, or ``(None, False)`` before count().
+
+        Once every page is fetched that is the rows to_rows kept; until then
+        count() less the items dropped so far, an upper bound unless ``exact``.
+        """
+        if self.exhausted:
+            return self.fetched, True
+        if self.total is None:
+            return None, False
+        return self.total - self.dropped, self.exact
+
+    def fetch_next(self):
+        """Return the next page of rows, or [] once the listing is exhausted."""
+        rows = []
+        while not self.exhausted and not rows:
+            with Session() as session:
+                # The key values ride along with each item to become the next cursor
+                query = self.build_query(session).add_columns(*self.keys)
+                if self.cursor is not None:
+                    position, cursor = tuple_(*self.keys), tuple_(*self.cursor)
+                    query = query.filter(position < cursor if self.descending else position > cursor)
+                page = (query.order_by(*(key.desc() if self.descending else key.asc() for key in self.keys))
+                        .limit(self.page_size).all())
+                if len(page) < self.page_size:
+                    self.exhausted = True
+                if page:
+                    self.cursor = tuple(page[-1][1:])
+                rows = self.to_rows([row[0] for row in page])
+                self.dropped += len(page) - len(rows)
+        self.fetched += len(rows)
+        logger.debug("Fetched page of %s row(s), %s so far", len(rows), self.fetched)
+        return rows
@@ -0,0 +1,237 @@
+# query_stats.py
+"""SQL statement timing, per-action counts, N+1 detection and a slow-query log.
+
+Every statement on ``database.engine`` is timed by a pair of cursor
+events. Statements are grouped by their SQL text, with expanded
+``IN (?, ?, ...)`` lists collapsed so different list lengths count as one
+statement. Each statement is also charged to the UI action running at the
+time, e.g. ``with action('ResultTab.orders'):``. QueryRunner carries the
+submitting action over to its pool threads.
+
+A statement that runs ``n_plus_one_threshold`` times within one action is
+logged as a probable N+1 pattern. A statement slower than ``slow_query_ms``
+is appended to ``slow_queries.log`` next to the database, with its EXPLAIN
+QUERY PLAN. Bound parameters are never written there; they can hold patient
+data. All thresholds come from app_config.json.
+"""
+import collections
+import contextlib
+import datetime
+import logging
+import logging.handlers
+import os
+import re
+import threading
+import time
+from sqlalchemy import event
+from config import load_config
+from database import engine, get_app_data_dir
+
+logger = logging.getLogger(__name__)
+slow_logger = logging.getLogger('query_stats.slow')
+
+_config = load_config()
+SLOW_QUERY_MS = float(_config.get('slow_query_ms', 200))
+N_PLUS_ONE_THRESHOLD = int(_config.get('n_plus_one_threshold', 20))
+SLOW_QUERY_LOG = os.path.join(get_app_data_dir(), 'slow_queries.log')
+
+MAX_STATEMENTS = 1000
+MAX_ACTIONS = 200
+MAX_SLOW_QUERIES = 50
+NO_ACTION = '(no action)'
+
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_lock = threading.Lock()
+_local = threading.local()
+_normalized = {}
+_statements = {}
+_actions = collections.deque(maxlen=MAX_ACTIONS)
+_slow = collections.deque(maxlen=MAX_SLOW_QUERIES)
+_totals = {'statements': 0, 'total_ms': 0.0, 'slow': 0, 'n_plus_one': 0}
+_slow_handler = None
+
+
+class StatementStats:
+    __slots__ = ('sql', 'count', 'total_ms', 'max_ms')
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+
+class ActionStats:
+    """Statements issued on behalf of one UI action, possibly from several threads."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = datetime.datetime.now()
+        self.statements = 0
+        self.total_ms = 0.0
+        self.counts = collections.Counter()
+        self.n_plus_one = []
+
+    def as_dict(self):
+        return {'name': self.name, 'started': self.started, 'statements': self.statements,
+                'total_ms': self.total_ms, 'n_plus_one': list(self.n_plus_one)}
+
+
+def normalize(statement):
+    """SQL text with expanded IN lists collapsed, used as the grouping key."""
+    sql = _normalized.get(statement)
+    if sql is None:
+        sql = _IN_LIST.sub('(?, ...)', ' '.join(statement.split()))
+        if len(_normalized) < MAX_STATEMENTS * 4:
+            _normalized[statement] = sql
+    return sql
+
+
+def new_action(name, record=True):
+    """Register an action without entering it (see QueryRunner.submit).
+
+    ``record=False`` keeps it out of recent_actions, for actions repeated on
+    a timer; their statements still count in the totals and per statement.
+    """
+    stats = ActionStats(name)
+    if record:
+        with _lock:
+            _actions.append(stats)
+    return stats
+
+
+def current_action():
+    stack = getattr(_local, 'actions', None)
+    return stack[-1] if stack else None
+
+
+@contextlib.contextmanager
+def action(name, record=True):
+    """Charge the statements run in this block (on this thread) to an action.
+
+    ``name`` is a string for a new action, or an ActionStats to continue an
+    existing one on another thread. ``record`` is passed to new_action.
+    """
+    stats = name if isinstance(name, ActionStats) else new_action(name, record)
+    stack = getattr(_local, 'actions', None)
+    if stack is None:
+        stack = _local.actions = []
+    stack.append(stats)
+    try:
+        yield stats
+    finally:
+        stack.pop()
+
+
+def _explain(cursor, statement, parameters):
+    # Only reads are explained; the plan of a write is rarely the slow part
+    if statement.lstrip()[:4].upper() not in ('SELE', 'WITH'):
+        return []
+    try:
+        rows = cursor.connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ()).fetchall()
+        return [row[-1] for row in rows]
+    except Exception as e:
+        return [f"(EXPLAIN failed: {e})"]
+
+
+def _write_slow(entry):
+    global _slow_handler
+    with _lock:
+        if _slow_handler is None:
+            try:
+                _slow_handler = logging.handlers.RotatingFileHandler(
+                    SLOW_QUERY_LOG, maxBytes=2 * 1024 * 1024, backupCount=2, encoding='utf-8')
+            except OSError as e:
+                logger.warning("Cannot open slow query log %s: %s", SLOW_QUERY_LOG, e)
+                _slow_handler = logging.NullHandler()
+            _slow_handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            slow_logger.addHandler(_slow_handler)
+            slow_logger.propagate = False
+            slow_logger.setLevel(logging.INFO)
+    plan = ''.join(f"\n    {line}" for line in entry['plan'])
+    slow_logger.info("%.1f ms [%s] %s%s", entry['ms'], entry['action'], entry['sql'], plan)
+
+
+@event.listens_for(engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(engine, 'handle_error')
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start
+    # time so the next statement on this connection is not timed against it
+    conn = context.connection
+    starts = conn.info.get('query_start') if conn is not None else None
+    if starts:
+        starts.pop()
+
+
+@event.listens_for(engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    ms = (time.perf_counter() - starts.pop()) * 1000
+    sql = normalize(statement)
+    current = current_action()
+    suspect = False
+    with _lock:
+        _totals['statements'] += 1
+        _totals['total_ms'] += ms
+        stats = _statements.get(sql)
+        if stats is None and len(_statements) < MAX_STATEMENTS:
+            stats = _statements[sql] = StatementStats(sql)
+        if stats is not None:
+            stats.count += 1
+            stats.total_ms += ms
+            stats.max_ms = max(stats.max_ms, ms)
+        if current is not None:
+            current.statements += 1
+            current.total_ms += ms
+            current.counts[sql] += 1
+            if current.counts[sql] == N_PLUS_ONE_THRESHOLD:
+                current.n_plus_one.append(sql)
+                _totals['n_plus_one'] += 1
+                suspect = True
+    if suspect:
+        logger.warning("Possible N+1 in %s: ran %d+ times: %s", current.name, N_PLUS_ONE_THRESHOLD, sql[:200])
+    if ms >= SLOW_QUERY_MS:
+        entry = {'at': datetime.datetime.now(), 'ms': ms, 'action': current.name if current else NO_ACTION,
+                 'sql': sql, 'plan': [] if executemany else _explain(cursor, statement, parameters)}
+        with _lock:
+            _totals['slow'] += 1
+            _slow.append(entry)
+        _write_slow(entry)
+
+
+def summary():
+    """Totals since start (or reset()): statements, total_ms, slow, n_plus_one."""
+    with _lock:
+        return dict(_totals)
+
+
+def top_statements(limit=10, key='total_ms'):
+    """The ``limit`` statements with the highest ``key`` (total_ms, max_ms or count), as dicts."""
+    with _lock:
+        rows = [{'sql': s.sql, 'count': s.count, 'total_ms': s.total_ms, 'max_ms': s.max_ms,
+                 'avg_ms': s.total_ms / s.count if s.count else 0.0} for s in _statements.values()]
+    return sorted(rows, key=lambda row: row[key], reverse=True)[:limit]
+
+
+def recent_actions(limit=10):
+    with _lock:
+        return [stats.as_dict() for stats in list(_actions)[-limit:]][::-1]
+
+
+def slow_queries(limit=10):
+    with _lock:
+        return list(_slow)[-limit:][::-1]
+
+
+def reset():
+    with _lock:
+        _statements.clear()
+        _actions.clear()
+        _slow.clear()
+        _totals.update(statements=0, total_ms=0.0, slow=0, n_plus_one=0)
@@ -11,27 +11,31 @@ from database import Session, get_app_data_dir
 from models import Order, Patient, Test
 from sqlalchemy.orm import joinedload
 
+# Built once and shared by every invoice
+SAMPLE_STYLES = getSampleStyleSheet()
+INVOICE_STYLES = {
+    'centered': ParagraphStyle(name="centered", parent=SAMPLE_STYLES['Normal'], alignment=1),
+    'bold': ParagraphStyle(name="bold", parent=SAMPLE_STYLES['Normal'], fontName='Helvetica-Bold'),
+    'right_align': ParagraphStyle(name="right_align", parent=SAMPLE_STYLES['Normal'], alignment=2),
+    'bold_centered': ParagraphStyle(
+        name="bold_centered", parent=SAMPLE_STYLES['Normal'], fontName='Helvetica-Bold', alignment=1
+    ),
+    'title': ParagraphStyle(name="Title", parent=SAMPLE_STYLES['Heading1'], alignment=1),
+    'invoice_title': ParagraphStyle(name="InvoiceTitle", parent=SAMPLE_STYLES['Heading2'], alignment=1),
+}
+
 class InvoiceGenerator:
     def __init__(self, order_ids):
         self.order_ids = order_ids
         self.reports_path = os.path.join(get_app_data_dir(), "reports")
         os.makedirs(self.reports_path, exist_ok=True)
-        self.styles = getSampleStyleSheet()
+        self.styles = SAMPLE_STYLES
 
         # Custom styles
-        self.centered = ParagraphStyle(
-            name="centered", parent=self.styles['Normal'], alignment=1
-        )
-        self.bold = ParagraphStyle(
-            name="bold", parent=self.styles['Normal'], fontName='Helvetica-Bold'
-        )
-        self.right_align = ParagraphStyle(
-            name="right_align", parent=self.styles['Normal'], alignment=2
-        )
-        self.bold_centered = ParagraphStyle(
-            name="bold_centered", parent=self.styles['Normal'], 
-            fontName='Helvetica-Bold', alignment=1
-        )
+        self.centered = INVOICE_STYLES['centered']
+        self.bold = INVOICE_STYLES['bold']
+        self.right_align = INVOICE_STYLES['right_align']
+        self.bold_centered = INVOICE_STYLES['bold_centered']
 
         self.data = self.fetch_data()
 
@@ -140,15 +144,9 @@ class InvoiceGenerator:
         if os.path.exists(logo_path):
             header_data = [[
                 Table([
-                    [Paragraph(self.data['lab_name'], ParagraphStyle(
-                        name="Title", parent=self.styles['Heading1'], alignment=1
-                    ))],
-                    [Paragraph(self.data['lab_contact'], ParagraphStyle(
-                        name="NormalCentered", parent=self.styles['Normal'], alignment=1
-                    ))],
-                    [Paragraph(self.data['lab_address'], ParagraphStyle(
-                        name="NormalCentered", parent=self.styles['Normal'], alignment=1
-                    ))]
+                    [Paragraph(self.data['lab_name'], INVOICE_STYLES['title'])],
+                    [Paragraph(self.data['lab_contact'], self.centered)],
+                    [Paragraph(self.data['lab_address'], self.centered)]
                 ], colWidths=[5.5*inch]),
                 Image(logo_path, width=1.2*inch, height=1.2*inch)
             ]]
@@ -160,15 +158,9 @@ class InvoiceGenerator:
             elements.append(header_table)
         else:
             # Fallback to centered header without logo
-            elements.append(Paragraph(self.data['lab_name'], ParagraphStyle(
-                name="Title", parent=self.styles['Heading1'], alignment=1
-            )))
-            elements.append(Paragraph(self.data['lab_contact'], ParagraphStyle(
-                name="NormalCentered", parent=self.styles['Normal'], alignment=1
-            )))
-            elements.append(Paragraph(self.data['lab_address'], ParagraphStyle(
-                name="NormalCentered", parent=self.styles['Normal'], alignment=1
-            )))
+            elements.append(Paragraph(self.data['lab_name'], INVOICE_STYLES['title']))
+            elements.append(Paragraph(self.data['lab_contact'], self.centered))
+            elements.append(Paragraph(self.data['lab_address'], self.centered))
         elements.append(Spacer(1, 0.2*inch))
 
         # Add a line separator
@@ -200,9 +192,7 @@ class InvoiceGenerator:
         elements.append(Spacer(1, 0.3*inch))
 
         # Invoice Section
-        elements.append(Paragraph("INVOICE", ParagraphStyle(
-            name="InvoiceTitle", parent=self.styles['Heading2'], alignment=1
-        )))
+        elements.append(Paragraph("INVOICE", INVOICE_STYLES['invoice_title']))
         elements.append(Spacer(1, 0.1*inch))
 
         # Tests Table - Fixed structure
@@ -15,11 +15,21 @@ import json
 from datetime import datetime
 from contextlib import contextmanager
 from database import Session
-from models import Order, Result
+from models import Order, Patient, reference_range, reference_flag
 from sqlalchemy.orm import joinedload
 import re
 from io import BytesIO
 import webbrowser
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    from pypdf import PdfWriter
+except ImportError:  # merging batch reports is optional
+    PdfWriter = None
+
+logger = logging.getLogger(__name__)
 
 
 # -----------------------------------------------------------------
@@ -61,6 +71,10 @@ class RoundedTable(Table):
 # -----------------------------------------------------------------
 bold_font_name = 'Helvetica-Bold'
 
+# Names of the form XObjects holding the static page decorations
+LETTERHEAD_FORM = 'letterhead'
+FOOTER_FORM = 'footer_branding'
+
 
 # -----------------------------------------------------------------
 # Custom DocTemplate for Repeating Headers
@@ -69,15 +83,15 @@ class MyDocTemplate(BaseDocTemplate):
     def __init__(self, filename, **kwargs):
         super().__init__(filename, **kwargs)
         self.current_patient = None
-        self.current_styles = create_styles()
+        self.current_styles = STYLES
         self.current_order = None
         # Adjust frame to accommodate patient details in header
         frame = Frame(15*mm, 20*mm, 180*mm, A4[1] - 20*mm - 70*mm, id='normal')
         template = PageTemplate(id='all', frames=[frame], onPage=self.draw_header, onPageEnd=self.draw_footer)
         self.addPageTemplates([template])
 
-    def draw_header(self, canvas, doc):
-        canvas.saveState()
+    @staticmethod
+    def draw_letterhead(canvas):
         page_height = A4[1]
         y = page_height - 10 * mm  # Start near top
 
@@ -104,6 +118,17 @@ class MyDocTemplate(BaseDocTemplate):
         y -= 6 * mm
         canvas.drawString(title_x, y, "Phone: 8667626117 | WhatsApp: 9176403894")
 
+    def draw_header(self, canvas, doc):
+        canvas.saveState()
+        # The letterhead is the same on every page: record it once per PDF as a
+        # form XObject and reference it from each page
+        if not canvas.hasForm(LETTERHEAD_FORM):
+            canvas.beginForm(LETTERHEAD_FORM)
+            self.draw_letterhead(canvas)
+            canvas.endForm()
+        canvas.doForm(LETTERHEAD_FORM)
+        y = A4[1] - 30 * mm  # Below the letterhead
+
         # Patient details section - ALWAYS SHOW PATIENT DETAILS
         if self.current_patient:
             y -= 10 * mm
@@ -170,9 +195,13 @@ class MyDocTemplate(BaseDocTemplate):
         canvas.drawRightString(195 * mm, 10 * mm, f"Page {doc.page}")
 
         # Footer branding
-        canvas.setFont("Helvetica", 7)
-        canvas.setFillColor(colors.grey)
-        canvas.drawCentredString(105 * mm, 15 * mm, "Home Care Service Available")
+        if not canvas.hasForm(FOOTER_FORM):
+            canvas.beginForm(FOOTER_FORM)
+            canvas.setFont("Helvetica", 7)
+            canvas.setFillColor(colors.grey)
+            canvas.drawCentredString(105 * mm, 15 * mm, "Home Care Service Available")
+            canvas.endForm()
+        canvas.doForm(FOOTER_FORM)
 
         canvas.restoreState()
 
@@ -237,6 +266,17 @@ def create_styles():
     }
 
 
+# Styles are immutable once built, so every report shares one set instead
+# of allocating a ParagraphStyle per result value
+STYLES = create_styles()
+VALUE_STYLES = {
+    'normal': ParagraphStyle(name='normal_value', parent=STYLES['table_cell'], textColor=colors.black),
+    'in_range': ParagraphStyle(name='in_range_value', parent=STYLES['table_cell'],
+                               textColor=colors.green, fontName=bold_font_name),
+    'abnormal': ParagraphStyle(name='abnormal_value', parent=STYLES['table_cell'],
+                               textColor=colors.red, fontName=bold_font_name),
+}
+
 def get_patient_info(order):
     try:
         patient = order['patient']
@@ -285,19 +325,6 @@ def create_patient_info_table(patient_info, order, styles):
     return table
 
 
-def get_reference_range(ref, patient_gender, is_child):
-    if isinstance(ref, dict):
-        gender_ref = ref.get(patient_gender.lower(), ref.get("default", "N/A"))
-        age_ref = ref.get("age_based", {})
-        if age_ref:
-            if is_child and "child" in age_ref:
-                gender_ref = age_ref.get("child", gender_ref)
-            elif not is_child and "adult" in age_ref:
-                gender_ref = age_ref.get("adult", gender_ref)
-        return str(gender_ref)
-    return str(ref) if ref not in ('N/A', None) else 'N/A'
-
-
 def create_department_content(patient_info, order, dept, dept_orders, all_results_data, all_test_notes, styles):
     elements = []
 
@@ -405,74 +432,17 @@ def create_results_data(order, results_dict, template, patient_gender, is_child,
         # Clean up method display - remove duplicate "Method:" and parentheses
         if test_method:
             test_method = test_method.replace('(Method:', '').replace(')', '').strip()
-        ref_range = get_reference_range(ref, patient_gender, is_child)
+        ref_range = reference_range(ref, patient_gender, is_child) or 'N/A'
 
+        # Same flag as the stored result_values, so report styling and queries agree
         display_value = value
-        value_style = ParagraphStyle(
-            name="normal_value", parent=styles['table_cell'],
-            textColor=colors.black
-        )
-
-        if ref_range != 'N/A' and value not in ('N/A', ''):
-            try:
-                # Handle different types of reference ranges
-                if isinstance(ref_range, str):
-                    ref_range_clean = ref_range.strip()
-                    
-                    # Handle range format (e.g., "80-100")
-                    if '-' in ref_range_clean:
-                        low, high = map(float, ref_range_clean.split('-'))
-                        val = float(value)
-                        if val < low or val > high:
-                            display_value = f"{value}"
-                            value_style = ParagraphStyle(
-                                name="abnormal_value", parent=styles['table_cell'],
-                                textColor=colors.red, fontName=bold_font_name
-                            )
-                        else:
-                            display_value = f"{value}"
-                            value_style = ParagraphStyle(
-                                name="normal_value", parent=styles['table_cell'],
-                                textColor=colors.green, fontName=bold_font_name
-                            )
-                    
-                    # Handle less than format (e.g., "<200")
-                    elif ref_range_clean.startswith('<'):
-                        threshold = float(ref_range_clean[1:])
-                        val = float(value)
-                        if val >= threshold:
-                            display_value = f"{value}"
-                            value_style = ParagraphStyle(
-                                name="abnormal_value", parent=styles['table_cell'],
-                                textColor=colors.red, fontName=bold_font_name
-                            )
-                        else:
-                            display_value = f"{value}"
-                            value_style = ParagraphStyle(
-                                name="normal_value", parent=styles['table_cell'],
-                                textColor=colors.green, fontName=bold_font_name
-                            )
-                    
-                    # Handle greater than format (e.g., ">40")
-                    elif ref_range_clean.startswith('>'):
-                        threshold = float(ref_range_clean[1:])
-                        val = float(value)
-                        if val <= threshold:
-                            display_value = f"{value}"
-                            value_style = ParagraphStyle(
-                                name="abnormal_value", parent=styles['table_cell'],
-                                textColor=colors.red, fontName=bold_font_name
-                            )
-                        else:
-                            display_value = f"{value}"
-                            value_style = ParagraphStyle(
-                                name="normal_value", parent=styles['table_cell'],
-                                textColor=colors.green, fontName=bold_font_name
-                            )
-                            
-            except (ValueError, TypeError):
-                # If conversion fails, keep normal styling
-                pass
+        flag = reference_flag(value, ref_range) if ref_range != 'N/A' else None
+        if flag in ('H', 'L'):
+            value_style = VALUE_STYLES['abnormal']
+        elif flag == 'N':
+            value_style = VALUE_STYLES['in_range']
+        else:
+            value_style = VALUE_STYLES['normal']
 
         # Build the method display text
         method_display = ""
@@ -508,12 +478,57 @@ def add_signature_section(elements, styles):
     ]))
 
 
-def generate_pdf_report(patient_orders):
-    output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'reports')
-    os.makedirs(output_dir, exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    pdf_file = os.path.join(output_dir, f'report_{timestamp}.pdf')
-
+def _parse_template(test, templates):
+    """Parse a test's JSON template once per test id."""
+    if test.id not in templates:
+        templates[test.id] = json.loads(test.template) if test.template else []
+    return templates[test.id]
+
+
+def load_report_orders(session, order_ids):
+    """Load the orders of a report as plain dicts.
+
+    Orders, patients, tests and results come back in a single joined query,
+    whatever the number of orders, and every test template is parsed once.
+    """
+    orders = session.query(Order).options(
+        joinedload(Order.patient), joinedload(Order.test), joinedload(Order.results)
+    ).filter(Order.id.in_(order_ids)).all()
+    Patient.prefetch_decrypted(order.patient for order in orders)
+
+    templates = {}
+    order_dicts = []
+    for order in orders:
+        patient, test, result = order.patient, order.test, order.results
+        order_dicts.append({
+            'id': order.id,
+            'patient': {
+                'decrypted_name': patient.decrypted_name if patient else "N/A",
+                'decrypted_contact': patient.decrypted_contact if patient and patient.contact else "N/A",
+                'decrypted_address': patient.decrypted_address if patient and patient.address else "N/A",
+                'pid': patient.pid if patient else "N/A",
+                'age': patient.age if patient else None,
+                'gender': patient.gender if patient else "Unknown",
+                'decrypted_title': patient.decrypted_title if patient else "N/A"
+            },
+            'test': {
+                'name': test.name if test else "Unknown Test",
+                'department': test.department if test else "Unknown",
+                'template': _parse_template(test, templates) if test else [],
+                'notes': test.notes if test and test.notes else ""
+            },
+            'order_date': order.order_date,
+            'referring_physician': order.referring_physician,
+            'results': json.loads(result.results) if result and result.results else {}
+        })
+    return order_dicts
+
+
+def render_pdf_report(order_ids, pdf_file):
+    """Render the report for ``order_ids`` into ``pdf_file`` and return its path.
+
+    Patients are merged by PID, one page set per patient.
+    """
     doc = MyDocTemplate(
         pdf_file, pagesize=A4,
         topMargin=90*mm, bottomMargin=20*mm, leftMargin=15*mm, rightMargin=15*mm  # Adjusted margins
@@ -525,37 +540,7 @@ def generate_pdf_report(patient_orders):
     elements = []
 
     with session_scope() as session:
-        # Fetch all orders with joinedload to avoid lazy loading issues
-        order_ids = [order.id for patient_id, orders in patient_orders.items() for order in orders]
-        orders = session.query(Order).options(
-            joinedload(Order.patient), joinedload(Order.test)
-        ).filter(Order.id.in_(order_ids)).all()
-
-        # Convert orders to dictionaries with related data
-        order_dicts = [
-            {
-                'id': order.id,
-                'patient': {
-                    'decrypted_name': order.patient.decrypted_name if order.patient else "N/A",
-                    'decrypted_contact': order.patient.decrypted_contact if order.patient and order.patient.contact else "N/A",
-                    'decrypted_address': order.patient.decrypted_address if order.patient and order.patient.address else "N/A",
-                    'pid': order.patient.pid if order.patient else "N/A",
-                    'age': order.patient.age,
-                    'gender': order.patient.gender if order.patient else "Unknown",
-                    'decrypted_title': order.patient.decrypted_title if order.patient else "N/A"
-                },
-                'test': {
-                    'name': order.test.name if order.test else "Unknown Test",
-                    'department': order.test.department if order.test else "Unknown",
-                    'template': json.loads(order.test.template) if order.test and order.test.template else [],
-                    'notes': order.test.notes if order.test and order.test.notes else ""
-                },
-                'order_date': order.order_date,
-                'referring_physician': order.referring_physician,  # Added referring physician
-                'results': session.query(Result).filter_by(order_id=order.id).first()
-            }
-            for order in orders
-        ]
+        order_dicts = load_report_orders(session, order_ids)
 
         # Group by PID to merge same patient
         pid_to_orders = {}
@@ -606,7 +591,7 @@ def generate_pdf_report(patient_orders):
                 all_test_notes = []
                 
                 for order in dept_orders:
-                    results_dict = json.loads(order['results'].results) if order['results'] and order['results'].results else {}
+                    results_dict = order['results']
                     template = order['test'].get('template', [])
                     test_notes = order['test'].get('notes', "")
 
@@ -625,15 +610,26 @@ def generate_pdf_report(patient_orders):
             add_signature_section(elements, doc.current_styles)
 
     doc.build(elements)
-    
+    return pdf_file
+
+
+def generate_pdf_report(patient_orders):
+    output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'reports')
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    pdf_file = os.path.join(output_dir, f'report_{timestamp}.pdf')
+
+    order_ids = [order.id for patient_id, orders in patient_orders.items() for order in orders]
+    render_pdf_report(order_ids, pdf_file)
+
     # Automatically open the PDF in the default browser
     try:
         # Convert the file path to a file URL
         pdf_url = f"file://{os.path.abspath(pdf_file)}"
         webbrowser.open(pdf_url)
-        print(f"Report generated and opened in browser: {pdf_file}")
+        logger.info("Report generated and opened in browser: %s", pdf_file)
     except Exception as e:
-        print(f"Error opening PDF in browser: {str(e)}")
+        logger.warning("Error opening PDF in browser: %s", e)
         # Fallback: try to open with system default application
         try:
             import subprocess
@@ -645,8 +641,60 @@ def generate_pdf_report(patient_orders):
                 subprocess.run(["open", pdf_file])
             else:  # Linux
                 subprocess.run(["xdg-open", pdf_file])
-            print(f"Report generated and opened with system default: {pdf_file}")
+            logger.info("Report generated and opened with system default: %s", pdf_file)
         except Exception as e2:
-            print(f"Error opening PDF with system default: {str(e2)}")
+            logger.error("Error opening PDF with system default: %s", e2)
     
-    return pdf_file
\ No newline at end of file
+    return pdf_file
+
+
+def batch_pdf_reports(reports, output_dir, max_workers=None):
+    """Render one PDF per entry of ``reports`` (label -> order ids) in a process pool.
+
+    Each worker process opens its own database connection, so throughput
+    scales with CPU cores. Yields ``(label, pdf_path, error)`` as each report
+    finishes; ``error`` is None on success. Closing the generator early
+    cancels the reports that have not started yet.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    jobs = {
+        label: (list(order_ids),
+                os.path.join(output_dir, f"report_{re.sub(r'[^A-Za-z0-9_-]+', '_', str(label))}_{timestamp}.pdf"))
+        for label, order_ids in reports.items()
+    }
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(jobs)))
+    if workers == 1:
+        # A single worker process would only add its start-up cost
+        for label, (order_ids, pdf_file) in jobs.items():
+            try:
+                yield label, render_pdf_report(order_ids, pdf_file), None
+            except Exception as e:
+                yield label, None, str(e)
+        return
+
+    # spawn: forking a process that runs Qt and SQLite threads is not safe
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    try:
+        futures = {pool.submit(render_pdf_report, order_ids, pdf_file): label
+                   for label, (order_ids, pdf_file) in jobs.items()}
+        for future in as_completed(futures):
+            label = futures[future]
+            try:
+                yield label, future.result(), None
+            except Exception as e:
+                yield label, None, str(e)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def merge_pdf_reports(pdf_files, pdf_file):
+    """Concatenate rendered reports into ``pdf_file`` (requires pypdf)."""
+    if PdfWriter is None:
+        raise RuntimeError("Merging reports requires the 'pypdf' package")
+    writer = PdfWriter()
+    for path in pdf_files:
+        writer.append(path)
+    with open(pdf_file, 'wb') as f:
+        writer.write(f)
+    return pdf_file
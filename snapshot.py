@@ -0,0 +1,274 @@
+# snapshot.py
+"""Columnar analytics snapshot of orders, results, tests and patients.
+
+The snapshot is a directory of Parquet (or Arrow IPC) files that analysis
+tools can read directly, e.g. ``pyarrow.dataset.dataset(path + '/orders',
+partitioning='hive')``::
+
+    orders/order_month=2024-05/part.parquet    one row per order, with TAT
+    results/order_month=2024-05/part.parquet   Result.results flattened, one column per parameter
+    tests/part.parquet
+    patients/part.parquet                      pseudonymized: no name, contact, address or PID
+    snapshot.json                              format, last exported month and export time
+
+Patients are identified by a keyed pseudonym, so nothing is ever decrypted.
+Orders and results are written one ``order_date`` month at a time. An
+incremental run rewrites the months from the last exported one on, plus any
+older month with an order or result changed since the previous export
+(``changed_at``), and leaves the other partitions untouched. Partition
+directories are only ever removed from a directory whose snapshot.json
+proves it is a snapshot.
+"""
+import datetime
+import itertools
+import json
+import logging
+import os
+import shutil
+from sqlalchemy import select, func, or_, and_
+from database import Session, blind_index
+from models import Patient, Order, Test, Result
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # snapshots are optional
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+SNAPSHOT_BATCH_SIZE = 5000
+MANIFEST = 'snapshot.json'
+
+ORDER_COLUMNS = [
+    ('order_id', 'int64'), ('group_id', 'int64'), ('patient_key', 'string'), ('test_id', 'int64'),
+    ('test_code', 'string'), ('department', 'string'), ('rate_inr', 'float64'),
+    ('order_date', 'timestamp'), ('status', 'string'), ('referring_physician', 'string'),
+    ('payment_method', 'string'), ('discount', 'float64'), ('has_result', 'bool'),
+    ('result_date', 'timestamp'), ('tat_hours', 'float64'),
+]
+RESULT_COLUMNS = [
+    ('result_id', 'int64'), ('order_id', 'int64'), ('test_id', 'int64'), ('result_date', 'timestamp'),
+]
+
+
+def snapshot_available():
+    return pa is not None
+
+
+def patient_pseudonym(patient_id):
+    """Stable, keyed pseudonym of a patient; it cannot be reversed without the key."""
+    return blind_index('patient', str(patient_id), 'pseudonym') if patient_id is not None else None
+
+
+def _arrow_type(name):
+    if name == 'timestamp':
+        return pa.timestamp('us')
+    return pa.bool_() if name == 'bool' else getattr(pa, name)()
+
+
+def _table(columns, rows):
+    """Build an Arrow table from tuple rows and a [(name, type)] column spec."""
+    data = list(zip(*rows)) if rows else [()] * len(columns)
+    return pa.table({name: pa.array(values, type=_arrow_type(kind))
+                     for (name, kind), values in zip(columns, data)})
+
+
+def _write(table, path, fmt):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if fmt == 'parquet':
+        pq.write_table(table, path)
+    else:
+        with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _result_values(raw):
+    """Result.results as a dict (it is stored as a JSON-encoded string)."""
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            return {}
+    return raw if isinstance(raw, dict) else {}
+
+
+def _as_number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def _results_table(rows):
+    """Flatten the result JSON of one month into one column per parameter.
+
+    A parameter column is float64 when every value parses as a number and
+    a string column otherwise.
+    """
+    values = [_result_values(row[-1]) for row in rows]
+    base = _table(RESULT_COLUMNS, [row[:-1] for row in rows])
+    taken = {name for name, _ in RESULT_COLUMNS}
+    parameters = sorted({name for value in values for name in value})
+    for name in parameters:
+        column = [value.get(name) for value in values]
+        present = [v for v in column if v not in (None, '')]
+        numbers = [_as_number(v) for v in present]
+        if present and all(n is not None for n in numbers):
+            array = pa.array([_as_number(v) if v not in (None, '') else None for v in column], pa.float64())
+        else:
+            array = pa.array([None if v in (None, '') else (v if isinstance(v, str) else json.dumps(v))
+                              for v in column], pa.string())
+        base = base.append_column(name if name not in taken else f"param_{name}", array)
+    return base
+
+
+def _month_start(month):
+    return datetime.datetime.strptime(month, '%Y-%m')
+
+
+def read_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _next_month(month_start):
+    return (month_start + datetime.timedelta(days=32)).replace(day=1)
+
+
+def _changes_since(manifest):
+    """UTC time of the previous export, comparable with ``changed_at``."""
+    if manifest.get('changes_since'):
+        return datetime.datetime.fromisoformat(manifest['changes_since'])
+    if manifest.get('exported_at'):
+        # Older manifests only recorded the local export time
+        local = datetime.datetime.fromisoformat(manifest['exported_at']).astimezone()
+        return local.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return None
+
+
+def changed_months(session, since):
+    """'YYYY-MM' order months with an order or result changed at or after ``since``."""
+    month = func.strftime('%Y-%m', Order.order_date)
+    stmt = (select(month).where(Order.changed_at >= since)
+            .union(select(month).join(Order.results).where(Result.changed_at >= since)))
+    return {m for m in session.execute(stmt).scalars() if m}
+
+
+def export_snapshot(output_dir, fmt='parquet', incremental=True, progress=None,
+                    batch_size=SNAPSHOT_BATCH_SIZE):
+    """Write or refresh an analytics snapshot in ``output_dir``.
+
+    With ``incremental`` and an existing snapshot of the same format, only
+    the months from the last exported one on and the months with changes
+    since the previous export are rewritten; otherwise the whole history is
+    exported. A full export refuses a directory that already holds
+    orders/results/tests/patients subdirectories but no snapshot.json.
+    ``progress(written, total)`` counts orders. Returns the number of
+    orders written.
+    """
+    if pa is None:
+        raise RuntimeError("Analytics snapshots require the 'pyarrow' package")
+    if fmt not in SNAPSHOT_FORMATS:
+        raise ValueError(f"Unknown snapshot format: {fmt}")
+    ext = SNAPSHOT_FORMATS[fmt]
+    existing = read_manifest(output_dir)
+    tables = ('orders', 'results', 'tests', 'patients')
+    if existing is None:
+        clashing = [t for t in tables if os.path.exists(os.path.join(output_dir, t))]
+        if clashing:
+            raise ValueError(f"{output_dir} is not a snapshot directory but contains "
+                             f"{', '.join(clashing)}; choose an empty directory")
+    manifest = existing if incremental and existing and existing.get('format') == fmt else None
+    since = _month_start(manifest['last_month']) if manifest and manifest.get('last_month') else None
+    started = datetime.datetime.utcnow()
+
+    with Session() as session:
+        stale = set()
+        if since is not None:
+            changes_since = _changes_since(manifest)
+            if changes_since is not None:
+                stale = {m for m in changed_months(session, changes_since) if _month_start(m) < since}
+
+        # Remove what is rewritten below: everything on a full export, only the
+        # open and changed months of orders and results on an incremental one
+        for table in tables:
+            root = os.path.join(output_dir, table)
+            if since is None:
+                shutil.rmtree(root, ignore_errors=True)
+            elif table in ('orders', 'results') and os.path.isdir(root):
+                for partition in os.listdir(root):
+                    month = partition.partition('=')[2]
+                    if month and (_month_start(month) >= since or month in stale):
+                        shutil.rmtree(os.path.join(root, partition), ignore_errors=True)
+
+        written = 0
+        last_month = manifest.get('last_month') if manifest else None
+        tests = session.execute(
+            select(Test.id, Test.code, Test.name, Test.department, Test.rate_inr).order_by(Test.id)).all()
+        _write(_table([('test_id', 'int64'), ('code', 'string'), ('name', 'string'),
+                       ('department', 'string'), ('rate_inr', 'float64')], tests),
+               os.path.join(output_dir, 'tests', f'part{ext}'), fmt)
+
+        patients = session.execute(
+            select(Patient.id, Patient.age, Patient.gender, Patient.created_at).order_by(Patient.id)).all()
+        _write(_table([('patient_key', 'string'), ('age', 'int64'), ('gender', 'string'),
+                       ('created_month', 'string')],
+                      [(patient_pseudonym(pid), age, gender, created.strftime('%Y-%m') if created else None)
+                       for pid, age, gender, created in patients]),
+               os.path.join(output_dir, 'patients', f'part{ext}'), fmt)
+
+        order_filter = []
+        if since is not None:
+            order_filter = [or_(Order.order_date >= since, *(
+                and_(Order.order_date >= _month_start(m), Order.order_date < _next_month(_month_start(m)))
+                for m in sorted(stale)))]
+        total = session.execute(select(func.count(Order.id)).where(*order_filter)).scalar() or 0
+        stmt = (
+            select(Order.id, Order.group_id, Order.patient_id, Order.test_id, Test.code, Test.department,
+                   Test.rate_inr, Order.order_date, Order.status, Order.referring_physician,
+                   Order.payment_method, Order.discount, Result.id, Result.result_date, Result.results)
+            .outerjoin(Order.test).outerjoin(Order.results)
+            .where(Order.order_date.isnot(None), *order_filter)
+            .order_by(Order.order_date, Order.id)
+            .execution_options(yield_per=batch_size)
+        )
+        pseudonyms = {}
+        rows = session.execute(stmt)
+        for month, month_rows in itertools.groupby(rows, key=lambda row: row.order_date.strftime('%Y-%m')):
+            orders, results = [], []
+            for (order_id, group_id, patient_id, test_id, code, department, rate, order_date, status,
+                 physician, payment, discount, result_id, result_date, values) in month_rows:
+                if patient_id not in pseudonyms:
+                    pseudonyms[patient_id] = patient_pseudonym(patient_id)
+                tat = (result_date - order_date).total_seconds() / 3600 if result_date else None
+                orders.append((order_id, group_id, pseudonyms[patient_id], test_id, code, department, rate,
+                               order_date, status, physician, payment, discount, result_id is not None,
+                               result_date, tat))
+                if result_id is not None:
+                    results.append((result_id, order_id, test_id, result_date, values))
+
+            partition = f'order_month={month}'
+            _write(_table(ORDER_COLUMNS, orders), os.path.join(output_dir, 'orders', partition, f'part{ext}'), fmt)
+            if results:
+                _write(_results_table(results),
+                       os.path.join(output_dir, 'results', partition, f'part{ext}'), fmt)
+            written += len(orders)
+            last_month = max(last_month or month, month)
+            if progress:
+                progress(written, total)
+
+    with open(os.path.join(output_dir, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump({'format': fmt, 'last_month': last_month,
+                   'exported_at': datetime.datetime.now().isoformat(timespec='seconds'),
+                   'changes_since': started.isoformat()}, f, indent=2)
+    logger.info("Analytics snapshot: %s order(s) written to %s", written, output_dir)
+    return written
@@ -0,0 +1,129 @@
+# startup_profile.py
+"""Phase-by-phase timeline of application startup.
+
+Profiling is off unless ``LIMS_STARTUP_PROFILE`` is set (to the JSON output
+path, or to ``1`` for ``startup_profile.json`` in the working directory) or
+main.py is started with ``--profile-startup[=path]``. While it is off,
+phase() and mark() cost one flag check.
+
+The timeline is written once the main window has shown its first tab::
+
+    {"total_ms": 912.4, "active_ms": 640.1, "phases": [
+        {"name": "import PyQt6", "start_ms": 3.1, "duration_ms": 88.0}, ...]}
+
+Times are relative to the import of this module, which main.py does first.
+``active_ms`` leaves out interactive phases such as waiting for the login.
+This module only uses the standard library so it is cheap to import early.
+"""
+import contextlib
+import datetime
+import json
+import logging
+import os
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+ENV_VAR = 'LIMS_STARTUP_PROFILE'
+# Set by benchmarks/bench_startup.py: quit as soon as the timeline is written
+EXIT_ENV_VAR = 'LIMS_STARTUP_PROFILE_EXIT'
+DEFAULT_FILE = 'startup_profile.json'
+
+_T0 = time.perf_counter()
+_phases = []
+_path = None
+_exit_after = False
+
+
+def _ms(t):
+    return round((t - _T0) * 1000, 2)
+
+
+def enable(path=None, exit_after=False):
+    """Start recording; the timeline goes to ``path`` (default startup_profile.json)."""
+    global _path, _exit_after
+    _path = path or DEFAULT_FILE
+    _exit_after = exit_after
+
+
+def enabled():
+    return _path is not None
+
+
+def exit_after():
+    return _exit_after
+
+
+@contextlib.contextmanager
+def phase(name, interactive=False):
+    """Record how long the ``with`` body takes as phase ``name``.
+
+    Phases may nest; ``interactive`` marks phases spent waiting on the user.
+    """
+    if _path is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        entry = {'name': name, 'start_ms': _ms(start), 'duration_ms': round((end - start) * 1000, 2)}
+        if interactive:
+            entry['interactive'] = True
+        _phases.append(entry)
+
+
+def mark(name):
+    """Record an instant (zero-length phase), e.g. "first paint"."""
+    if _path is not None:
+        _phases.append({'name': name, 'start_ms': _ms(time.perf_counter()), 'duration_ms': 0.0})
+
+
+def timeline():
+    """The recorded phases in start order, plus totals."""
+    total = _ms(time.perf_counter())
+    waiting = sum(p['duration_ms'] for p in _phases if p.get('interactive'))
+    return {
+        'recorded_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'argv': sys.argv,
+        'total_ms': total,
+        'active_ms': round(total - waiting, 2),
+        'phases': sorted(_phases, key=lambda p: p['start_ms']),
+    }
+
+
+def write(path=None):
+    """Write the timeline as JSON and return its path, or None when profiling is off."""
+    path = path or _path
+    if path is None:
+        return None
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(timeline(), f, indent=2)
+    except OSError as e:
+        logger.error("Could not write startup profile to %s: %s", path, e)
+        return None
+    logger.info("Startup profile written to %s", path)
+    return path
+
+
+def configure(argv):
+    """Enable profiling from the environment or a ``--profile-startup[=path]`` flag.
+
+    The flag is removed from ``argv`` (so Qt never sees it); returns ``argv``.
+    """
+    path = os.environ.get(ENV_VAR)
+    rest = []
+    for arg in argv:
+        if arg == '--profile-startup':
+            path = path or DEFAULT_FILE
+        elif arg.startswith('--profile-startup='):
+            path = arg.partition('=')[2] or DEFAULT_FILE
+        else:
+            rest.append(arg)
+    if path:
+        enable(DEFAULT_FILE if path == '1' else path, exit_after=bool(os.environ.get(EXIT_ENV_VAR)))
+    return rest
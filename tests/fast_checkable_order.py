@@ -61,6 +61,8 @@ def main():
         tab = order_mod.OrderTab()
         # reload combos to ensure the new patient appears
         tab.load_combos()
+        # Patients load on a worker thread; wait until the combo is filled
+        tab.query_runner.wait()
         idx = tab.patient_combo.findData(patient_id)
         if idx < 0:
             print("Created patient not found in combo; failing test")
@@ -0,0 +1,70 @@
+import os
+import sys
+import tempfile
+
+# A scratch database, so the checks never touch lab.db
+os.environ.setdefault('LIMS_DB_PATH', os.path.join(tempfile.mkdtemp(prefix='lims_test_'), 'test.db'))
+
+# Ensure project root is on sys.path so imports like `database` resolve when running as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import Session, init_db
+from models import Patient, PatientSearchToken, cipher, patient_search_clause
+
+
+def search(session, field, term):
+    patients = session.query(Patient).filter(patient_search_clause(field, term)).all()
+    return {p.id for p in patients if p.matches_search(field, term)}
+
+
+def main():
+    init_db()
+    with Session() as s:
+        p = Patient(name=cipher.encrypt(b"Blindindex Testuser").decode(),
+                    contact=cipher.encrypt(b"+91 90000 12345").decode(),
+                    pid=f"BI{int(os.getpid())}")
+        s.add(p)
+        s.commit()
+        patient_id = p.id
+
+    try:
+        with Session() as s:
+            checks = [
+                ('name', 'blindindex', True),
+                ('name', 'INDEX TEST', True),
+                ('name', 'te', True),
+                ('name', 'xx', False),
+                ('contact', '9000012345', True),
+                ('contact', '0012', True),
+                ('contact', '55555', False),
+            ]
+            for field, term, expected in checks:
+                found = patient_id in search(s, field, term)
+                if found != expected:
+                    print(f"Search {field}={term!r}: expected {expected}, got {found}")
+                    sys.exit(2)
+
+            # Updating the encrypted name must re-index the patient
+            p = s.get(Patient, patient_id)
+            p.name = cipher.encrypt(b"Renamed Person").decode()
+            s.commit()
+            if patient_id in search(s, 'name', 'blindindex') or patient_id not in search(s, 'name', 'renamed'):
+                print("Blind index not refreshed after update")
+                sys.exit(3)
+
+        print("BLIND INDEX TEST PASSED")
+        sys.exit(0)
+
+    finally:
+        with Session() as s:
+            p = s.get(Patient, patient_id)
+            if p:
+                s.delete(p)
+                s.commit()
+            leftover = s.query(PatientSearchToken).filter_by(patient_id=patient_id).count()
+            if leftover:
+                print(f"{leftover} search tokens left behind after delete")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+import datetime
+import os
+import sys
+import tempfile
+
+# A scratch database, so the checks never touch lab.db
+os.environ.setdefault('LIMS_DB_PATH', os.path.join(tempfile.mkdtemp(prefix='lims_test_'), 'test.db'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+# Ensure project root is on sys.path so imports like `database` resolve when running as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import Session, init_db
+from models import Patient, Test, Order, cipher, create_orders
+from ui.tabs.dashboard import DataUpdateThread
+
+COUNTERS = ('today_orders', 'pending_results', 'completed_today', 'verified_today')
+
+
+def fail(message, code):
+    print(message)
+    sys.exit(code)
+
+
+def refresh(thread, during=None):
+    """One update cycle; returns (data or None, whether it fell back to a full refresh, a fresh full refresh).
+
+    ``during`` runs after the cycle has read its watermark, like a write
+    committed from the GUI thread while the dashboard is reading.
+    """
+    calls = []
+    full_refresh, collect_data = thread.full_refresh, thread.collect_data
+
+    def collect(session, watermark):
+        if during:
+            during()
+        return collect_data(session, watermark)
+
+    thread.full_refresh = lambda session: calls.append(1) or full_refresh(session)
+    thread.collect_data = collect
+    try:
+        data = thread.refresh_once()
+    finally:
+        del thread.full_refresh, thread.collect_data
+    with Session() as session:
+        expected = full_refresh(session)
+    return data, bool(calls), expected
+
+
+def same_figures(data, expected):
+    return (all(data[key] == expected[key] for key in COUNTERS)
+            and data['hourly_data'] == expected['hourly_data']
+            and sorted(row[0] for row in data['recent_orders']) == sorted(row[0] for row in expected['recent_orders']))
+
+
+def main():
+    init_db()
+    now = datetime.datetime.now().replace(microsecond=0)
+    with Session() as s:
+        test = Test(code=f"DSH{os.getpid()}", name="Dashboard Check", department="QA")
+        patient = Patient(name=cipher.encrypt(b"Dashboard Patient").decode(), pid=f"DS{os.getpid()}")
+        s.add_all([test, patient])
+        s.commit()
+        test_id, patient_id = test.id, patient.id
+
+    thread = DataUpdateThread()
+    data, full, _ = refresh(thread)
+    if not full:
+        fail("First cycle did not do a full refresh", 2)
+
+    data, full, _ = refresh(thread)
+    if data is not None or full:
+        fail("Unchanged watermark did not skip the refresh", 3)
+
+    # New orders only: merged into the cached figures without a full refresh
+    with Session() as s:
+        create_orders(s, [patient_id], [test_id], order_date=now, status='Pending')
+        create_orders(s, [patient_id], [test_id], order_date=now, status='Completed')
+        s.commit()
+    data, full, expected = refresh(thread)
+    if data is None or full:
+        fail("Inserted orders were not merged incrementally", 4)
+    if not same_figures(data, expected):
+        fail(f"Merged figures differ from a full refresh: {data} != {expected}", 5)
+
+    # An order committed while a cycle is reading must be counted exactly once
+    def commit_order():
+        # Not the scoped Session: that is the cycle's own session on this thread
+        with Session.session_factory() as other:
+            create_orders(other, [patient_id], [test_id], order_date=now, status='Pending')
+            other.commit()
+
+    with Session() as s:
+        create_orders(s, [patient_id], [test_id], order_date=now, status='Pending')
+        s.commit()
+    refresh(thread, during=commit_order)
+    for _ in range(2):
+        data, _, expected = refresh(thread)
+        data = data or thread.cached_data
+    if not same_figures(data, expected):
+        fail(f"Order committed mid-cycle was miscounted: {data} != {expected}", 8)
+
+    # An update cannot be merged; the thread must fall back to a full refresh
+    with Session() as s:
+        order = s.query(Order).filter_by(patient_id=patient_id, status='Pending').first()
+        order.status = 'Verified'
+        s.commit()
+    data, full, expected = refresh(thread)
+    if data is None or not full or not same_figures(data, expected):
+        fail("Status update did not trigger a correct full refresh", 6)
+
+    # A new day invalidates the cached "today" counters
+    thread.watermark = thread.watermark._replace(day=now.date() - datetime.timedelta(days=1))
+    data, full, _ = refresh(thread)
+    if not full:
+        fail("Day change did not trigger a full refresh", 7)
+
+    print("DASHBOARD INCREMENTAL TEST PASSED")
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import csv
+import gzip
+import os
+import sys
+import tempfile
+
+# A scratch database, so the checks never touch lab.db
+os.environ.setdefault('LIMS_DB_PATH', os.path.join(tempfile.mkdtemp(prefix='lims_test_'), 'test.db'))
+
+# Ensure project root is on sys.path so imports like `database` resolve when running as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import Session, init_db
+from models import Patient, Test, Result, cipher, create_orders
+from export import iter_export_rows, export_table, export_headers
+
+
+def fail(message, code):
+    print(message)
+    sys.exit(code)
+
+
+def main():
+    init_db()
+    tag = os.getpid()
+    names = [f"Export Patient {i}" for i in range(7)]
+    with Session() as s:
+        patients = [Patient(name=cipher.encrypt(name.encode()).decode(),
+                            contact=cipher.encrypt(b"98450 11223").decode(), pid=f"EX{tag}{i}")
+                    for i, name in enumerate(names)]
+        test = Test(code=f"EXP{tag}", name="Export Check")
+        s.add_all(patients + [test])
+        s.commit()
+        patient_ids = [p.id for p in patients]
+        _, order_ids = create_orders(s, patient_ids[:2], [test.id])
+        s.add(Result(order_id=order_ids[0], results='{"Value": "5"}'))
+        s.commit()
+
+        # Batches never exceed batch_size and every encrypted column comes back decrypted
+        batches = list(iter_export_rows(s, 'patients', batch_size=3))
+        if any(len(batch) > 3 for batch in batches):
+            fail(f"Batch sizes {[len(b) for b in batches]} exceed 3", 2)
+        rows = {row[0]: row for batch in batches for row in batch}
+        if [rows[i][3] for i in patient_ids] != names or any(rows[i][6] != "98450 11223" for i in patient_ids):
+            fail("Patient names or contacts were not decrypted", 3)
+        if list(rows) != sorted(rows):
+            fail("Rows are not in primary key order", 4)
+
+        # An id list restricts the export to those rows
+        picked = [row[0] for batch in iter_export_rows(s, 'patients', ids=patient_ids[2:4]) for row in batch]
+        if picked != patient_ids[2:4]:
+            fail(f"ids filter returned {picked}", 5)
+
+        orders = {row[0]: row for batch in iter_export_rows(s, 'orders', ids=order_ids) for row in batch}
+        if orders[order_ids[0]][4] != names[0] or [orders[i][10] for i in order_ids] != ["Completed", "Pending"]:
+            fail(f"Order rows are wrong: {orders}", 6)
+
+    # A .gz path is written gzip-compressed, with the header first
+    out = tempfile.mkdtemp(prefix='lims_export_')
+    progress = []
+    path = os.path.join(out, 'patients.csv.gz')
+    written = export_table('patients', path, progress=lambda done, total: progress.append((done, total)),
+                           batch_size=3)
+    with gzip.open(path, 'rt', newline='', encoding='utf-8') as f:
+        lines = list(csv.reader(f))
+    if lines[0] != export_headers('patients') or len(lines) - 1 != written or written != len(rows):
+        fail(f"Gzip export wrote {written} row(s), file has {len(lines) - 1}", 7)
+    if not progress or progress[-1] != (written, written):
+        fail(f"Progress ended at {progress[-1:]}, expected ({written}, {written})", 8)
+
+    path = os.path.join(out, 'users.csv')
+    export_table('users', path)
+    with open(path, newline='', encoding='utf-8') as f:
+        header = next(csv.reader(f))
+    if header != export_headers('users') or any('password' in column.lower() for column in header):
+        fail(f"Users export header is {header}", 9)
+
+    print("EXPORT TEST PASSED")
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import datetime
+import os
+import sys
+import tempfile
+
+# A scratch database, so the checks never touch lab.db
+os.environ.setdefault('LIMS_DB_PATH', os.path.join(tempfile.mkdtemp(prefix='lims_test_'), 'test.db'))
+
+# Ensure project root is on sys.path so imports like `database` resolve when running as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import Session, init_db
+from models import Patient, Test, Order, cipher, create_orders
+from pagination import KeysetPager, sort_keys
+
+
+def fail(message, code):
+    print(message)
+    sys.exit(code)
+
+
+def drain(pager):
+    ids = []
+    while True:
+        page = pager.fetch_next()
+        if not page:
+            return ids
+        if len(page) > pager.page_size:
+            fail(f"Page of {len(page)} rows exceeds page_size {pager.page_size}", 2)
+        ids.extend(page)
+
+
+def main():
+    init_db()
+    dates = [datetime.datetime(2024, 3, day, 9, 30) for day in (1, 2, 3)]
+    with Session() as s:
+        test = Test(code=f"PGR{os.getpid()}", name="Pager Check")
+        patient = Patient(name=cipher.encrypt(b"Pager Patient").decode())
+        s.add_all([test, patient])
+        s.commit()
+        patient_id, test_id = patient.id, test.id
+        # Many orders share each timestamp, so pages must break ties on id
+        for order_date in dates:
+            for i in range(17):
+                # Few distinct physicians, some missing, for sorting on a nullable column
+                create_orders(s, [patient_id], [test_id], order_date=order_date,
+                              referring_physician=f"Dr. {'ABC'[i % 3]}" if i % 4 else None)
+        s.commit()
+        orders = s.query(Order).filter_by(patient_id=patient_id).all()
+        expected = [o.id for o in sorted(orders, key=lambda o: (o.order_date, o.id), reverse=True)]
+        by_physician = [o.id for o in sorted(orders, key=lambda o: (o.referring_physician or '', o.id))]
+
+    def build_query(session):
+        return session.query(Order).filter(Order.patient_id == patient_id)
+
+    def to_ids(items):
+        return [o.id for o in items]
+
+    pager = KeysetPager(build_query, to_ids, page_size=5)
+    if pager.count() != len(expected) or pager.total != len(expected):
+        fail(f"count() returned {pager.total}, expected {len(expected)}", 3)
+    ids = drain(pager)
+    if ids != expected:
+        missing, repeated = set(expected) - set(ids), len(ids) - len(set(ids))
+        fail(f"Pages out of order: {len(missing)} missing, {repeated} repeated", 4)
+    if not pager.exhausted or pager.fetched != len(expected) or pager.fetch_next() != []:
+        fail("Pager not exhausted after the last page", 5)
+
+    # Rows dropped by to_rows must not end the listing early
+    kept = [i for i in expected if i % 3 == 0]
+    pager = KeysetPager(build_query, lambda items: [o.id for o in items if o.id % 3 == 0], page_size=2, exact=False)
+    pager.count()
+    first = pager.fetch_next()
+    # Until the last page, the count is only an upper bound
+    if pager.matched() != (len(expected) - pager.dropped, False):
+        fail(f"Partly fetched filtered listing reports {pager.matched()}", 6)
+    if first + drain(pager) != kept:
+        fail("Filtered pages lost or repeated rows", 7)
+    if pager.matched() != (len(kept), True):
+        fail(f"Exhausted filtered listing reports {pager.matched()}, expected ({len(kept)}, True)", 8)
+
+    # Sorted on another column, ascending or descending, NULLs included
+    for descending in (False, True):
+        pager = KeysetPager(build_query, to_ids, page_size=4,
+                            keys=sort_keys(Order.referring_physician), descending=descending)
+        if drain(pager) != (by_physician[::-1] if descending else by_physician):
+            fail(f"Paging by physician ({'desc' if descending else 'asc'}) lost or repeated rows", 9)
+
+    # Rows inserted after the first page never shift later page boundaries
+    pager = KeysetPager(build_query, to_ids, page_size=10)
+    first = pager.fetch_next()
+    with Session() as s:
+        create_orders(s, [patient_id], [test_id], order_date=dates[-1] + datetime.timedelta(days=1))
+        s.commit()
+    if first + drain(pager) != expected:
+        fail("A newer order shifted the remaining pages", 10)
+
+    print("KEYSET PAGER TEST PASSED")
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import tempfile
+
+# A scratch database, so the checks never touch lab.db
+os.environ.setdefault('LIMS_DB_PATH', os.path.join(tempfile.mkdtemp(prefix='lims_test_'), 'test.db'))
+
+# Ensure project root is on sys.path so imports like `database` resolve when running as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import Session, init_db
+from models import (
+    Patient, Test, Order, cipher, create_orders, order_search_query, order_matches_search, ORDER_SEARCH_FIELDS
+)
+
+
+def fail(message, code):
+    print(message)
+    sys.exit(code)
+
+
+def encrypt(value):
+    return cipher.encrypt(value.encode()).decode()
+
+
+def search(session, term, fields=ORDER_SEARCH_FIELDS):
+    """SQL candidates and the orders left after confirming them in Python."""
+    candidates = order_search_query(session, term, fields).all()
+    return {o.id for o in candidates}, {o.id for o in candidates if order_matches_search(o, term, fields)}
+
+
+def main():
+    init_db()
+    tag = os.getpid()
+    with Session() as s:
+        amrita = Patient(name=encrypt("Amrita Sharma"), contact=encrypt("+91 98450 11223"), pid=f"SRCH{tag}01")
+        kiran = Patient(name=encrypt("Kiran Rao"), contact=encrypt("080-2233 4455"), pid=f"SRCH{tag}02")
+        hb = Test(code=f"HBQ{tag}", name=f"Haemoglobin Q{tag}")
+        lipid = Test(code=f"LPQ{tag}", name=f"Lipid Panel Q{tag}")
+        s.add_all([amrita, kiran, hb, lipid])
+        s.commit()
+        _, order_ids = create_orders(s, [amrita.id, kiran.id], [hb.id, lipid.id])
+        s.commit()
+        a_hb, a_lipid, k_hb, k_lipid = order_ids
+        ours = set(order_ids)
+
+        checks = [
+            ("sharma", ORDER_SEARCH_FIELDS, {a_hb, a_lipid}),
+            ("AMRITA  SH", ORDER_SEARCH_FIELDS, {a_hb, a_lipid}),
+            ("98450", ORDER_SEARCH_FIELDS, {a_hb, a_lipid}),
+            ("2233 4455", ORDER_SEARCH_FIELDS, {k_hb, k_lipid}),
+            (f"srch{tag}02", ORDER_SEARCH_FIELDS, {k_hb, k_lipid}),
+            (f"SRCH{tag}0", ORDER_SEARCH_FIELDS, ours),
+            (f"lipid panel q{tag}", ORDER_SEARCH_FIELDS, {a_lipid, k_lipid}),
+            (str(k_lipid), ("id",), {k_lipid}),
+            # Terms with letters skip contacts: only digits are indexed there
+            ("x11223", ORDER_SEARCH_FIELDS, set()),
+            ("98450", ('name', 'pid', 'test'), set()),
+            ("sharma", ('contact',), set()),
+            ("nobody here", ORDER_SEARCH_FIELDS, set()),
+        ]
+        for term, fields, expected in checks:
+            candidates, found = search(s, term, fields)
+            if not expected <= candidates:
+                fail(f"SQL clause missed orders for {term!r}: {sorted(expected - candidates)}", 2)
+            if found & ours != expected:
+                fail(f"Search {term!r} on {fields}: expected {sorted(expected)}, got {sorted(found & ours)}", 3)
+
+        # The Python check agrees with the SQL clause on every order, not just the candidates
+        everything = order_search_query(s).filter(Order.id.in_(ours)).all()
+        for term, fields, _ in checks:
+            _, found = search(s, term, fields)
+            if {o.id for o in everything if order_matches_search(o, term, fields)} != found & ours:
+                fail(f"order_matches_search and order_search_clause disagree on {term!r}", 4)
+
+    print("ORDER SEARCH TEST PASSED")
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+import os
+import sys
+import tempfile
+import threading
+
+# A scratch database, so the checks never touch lab.db
+os.environ.setdefault('LIMS_DB_PATH', os.path.join(tempfile.mkdtemp(prefix='lims_test_'), 'test.db'))
+
+# Ensure project root is on sys.path so imports like `database` resolve when running as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import Session, init_db
+from models import (
+    Patient, Test, Order, PID_PREFIX, cipher, generate_pid, reserve_pids, reserve_sequence,
+    allocate_group_id, create_orders
+)
+
+
+def fail(message, code):
+    print(message)
+    sys.exit(code)
+
+
+def pid_number(pid):
+    return int(pid[len(PID_PREFIX):])
+
+
+def main():
+    init_db()
+
+    # PIDs come out consecutive, and a block continues where the last one ended
+    first = generate_pid()
+    block = reserve_pids(3)
+    if [pid_number(p) for p in block] != [pid_number(first) + i for i in (1, 2, 3)]:
+        fail(f"reserve_pids(3) after {first} returned {block}", 2)
+
+    # A PID typed in by hand moves the sequence past it
+    typed = f"{PID_PREFIX}{pid_number(block[-1]) + 50:05d}"
+    with Session() as s:
+        s.add(Patient(name=cipher.encrypt(b"Typed Pid").decode(), pid=typed))
+        s.commit()
+    if pid_number(generate_pid()) != pid_number(typed) + 1:
+        fail("Sequence did not skip past a hand-typed PID", 3)
+
+    # Concurrent claims never hand out the same number
+    claimed, errors = [], []
+
+    def claim():
+        try:
+            for _ in range(25):
+                claimed.extend(reserve_pids(2))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=claim) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if errors or len(set(claimed)) != 200:
+        fail(f"Concurrent reserve_pids: {len(set(claimed))} unique of {len(claimed)}, errors {errors[:1]}", 4)
+
+    # A new sequence starts from its seed
+    name = f"test:{os.getpid()}"
+    if reserve_sequence(name, 1, seed=lambda conn: 41) != 42 or reserve_sequence(name, 3) != 45:
+        fail("reserve_sequence did not start from its seed", 5)
+
+    # Group id blocks: the first id is returned and the next claim follows the block
+    group = allocate_group_id(5)
+    if allocate_group_id() != group + 5:
+        fail("allocate_group_id(5) did not reserve a block of five", 6)
+
+    with Session() as s:
+        tests = [Test(code=f"SEQ{os.getpid()}{i}", name=f"Sequence Check {i}") for i in range(3)]
+        patients = [Patient(name=cipher.encrypt(f"Sequence {i}".encode()).decode()) for i in range(2)]
+        s.add_all(tests + patients)
+        s.commit()
+        test_ids = [t.id for t in tests]
+        patient_ids = [p.id for p in patients]
+
+        # One group per call; ids come back patient-major, test-minor
+        group_id, order_ids = create_orders(s, patient_ids, test_ids, referring_physician="Dr. Seq")
+        # A second call in the same transaction must not wait on the session's own write lock
+        second_group, second_ids = create_orders(s, patient_ids[:1], test_ids[:1])
+        s.commit()
+
+        rows = {o.id: o for o in s.query(Order).filter(Order.id.in_(order_ids + second_ids))}
+        expected = [(p, t) for p in patient_ids for t in test_ids]
+        if [(rows[i].patient_id, rows[i].test_id) for i in order_ids] != expected:
+            fail("create_orders ids are not in patient-major, test-minor order", 7)
+        if {rows[i].group_id for i in order_ids} != {group_id} or second_group == group_id:
+            fail("create_orders did not give each call its own group", 8)
+        if any(rows[i].status != 'Pending' or rows[i].referring_physician != "Dr. Seq" for i in order_ids):
+            fail("create_orders did not apply the default status and extra values", 9)
+
+    print("ORDER SEQUENCE TEST PASSED")
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -45,8 +45,8 @@ def main():
     mw = MainWindow(user)
 
     # get tabs
-    patient_tab = mw.tab_instances.get('patientTab')
-    order_tab = mw.tab_instances.get('orderTab')
+    patient_tab = mw.tab('patientTab')
+    order_tab = mw.tab('orderTab')
     assert patient_tab is not None, 'patientTab not found'
     assert order_tab is not None, 'orderTab not found'
 
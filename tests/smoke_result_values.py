@@ -0,0 +1,120 @@
+import datetime
+import json
+import os
+import sys
+import tempfile
+
+# A scratch database, so the checks never touch lab.db
+os.environ.setdefault('LIMS_DB_PATH', os.path.join(tempfile.mkdtemp(prefix='lims_test_'), 'test.db'))
+
+# Ensure project root is on sys.path so imports like `database` resolve when running as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert
+from database import Session, init_db
+from migrations import backfill_result_values
+from models import (
+    Patient, Test, Result, ResultValue, cipher, create_orders, reference_flag, reference_range, query_result_values
+)
+
+TEMPLATE = [
+    {"name": "Hemoglobin", "unit": "g/dL",
+     "reference": {"male": "13-17", "female": "12-15", "default": "12-17",
+                   "age_based": {"child": "11-14"}}},
+    {"name": "Glucose", "unit": "mg/dL", "reference": "<100"},
+    {"name": "HDL", "unit": "mg/dL", "reference": ">40"},
+    {"name": "Remarks"},
+]
+
+
+def fail(message, code):
+    print(message)
+    sys.exit(code)
+
+
+def values_of(session, result_id):
+    rows = session.query(ResultValue).filter_by(result_id=result_id)
+    return {v.parameter: (v.value, v.unit, v.flag) for v in rows}
+
+
+def main():
+    init_db()
+
+    ranges = [
+        (("80-100",), "80-100"),
+        (({"male": "13-17", "default": "12-17"}, "Male"), "13-17"),
+        (({"male": "13-17", "default": "12-17"}, "Female"), "12-17"),
+        (({"default": "12-17", "age_based": {"child": "11-14"}}, "Male", True), "11-14"),
+        (("N/A",), None),
+        ((None,), None),
+    ]
+    for args, expected in ranges:
+        if reference_range(*args) != expected:
+            fail(f"reference_range{args} returned {reference_range(*args)!r}, expected {expected!r}", 2)
+
+    flags = [
+        ("79.9", "80-100", 'L'), (80, "80-100", 'N'), (" 100 ", "80-100", 'N'), (100.5, "80-100", 'H'),
+        (99, "<100", 'N'), (100, "<100", 'H'), (40, ">40", 'L'), (41, ">40", 'N'),
+        ("positive", "80-100", None), (90, None, None), (90, "normal", None), (True, "0-2", None),
+    ]
+    for value, reference, expected in flags:
+        if reference_flag(value, reference) != expected:
+            fail(f"reference_flag({value!r}, {reference!r}) returned "
+                 f"{reference_flag(value, reference)!r}, expected {expected!r}", 3)
+
+    tag = os.getpid()
+    day = datetime.datetime(2024, 5, 10, 8, 0)
+    with Session() as s:
+        test = Test(code=f"RV{tag}", name="Result Values Check", template=json.dumps(TEMPLATE))
+        adult = Patient(name=cipher.encrypt(b"Adult Female").decode(), gender="Female", age=30)
+        child = Patient(name=cipher.encrypt(b"Young Male").decode(), gender="Male", age=9)
+        s.add_all([test, adult, child])
+        s.commit()
+        _, (adult_order, child_order) = create_orders(s, [adult.id, child.id], [test.id])
+
+        # Saving a result extracts its numeric parameters, flagged for the patient
+        adult_result = Result(order_id=adult_order, result_date=day,
+                              results={"Hemoglobin": "15.5", "Glucose": "130", "HDL": 55, "Remarks": "fasting"})
+        child_result = Result(order_id=child_order, result_date=day + datetime.timedelta(days=1),
+                              results={"Hemoglobin": "15.5", "Glucose": ""})
+        s.add_all([adult_result, child_result])
+        s.commit()
+        expected = {"Hemoglobin": (15.5, "g/dL", 'H'), "Glucose": (130.0, "mg/dL", 'H'), "HDL": (55.0, "mg/dL", 'N')}
+        if values_of(s, adult_result.id) != expected:
+            fail(f"Adult values are {values_of(s, adult_result.id)}", 4)
+        if values_of(s, child_result.id) != {"Hemoglobin": (15.5, "g/dL", 'H')}:
+            fail(f"Child values are {values_of(s, child_result.id)}", 5)
+
+        # Editing the results resyncs the rows instead of adding to them
+        adult_result.results = {"Hemoglobin": "13", "Glucose": "90"}
+        s.commit()
+        if values_of(s, adult_result.id) != {"Hemoglobin": (13.0, "g/dL", 'N'), "Glucose": (90.0, "mg/dL", 'N')}:
+            fail(f"Values not resynced after an edit: {values_of(s, adult_result.id)}", 6)
+
+        high = query_result_values(s, parameter="Hemoglobin", above=14).all()
+        if [(v.result_id, order_id) for v, _, order_id in high] != [(child_result.id, child_order)]:
+            fail(f"Hemoglobin > 14 returned {high}", 7)
+        flagged = query_result_values(s, flags=['H'], start=day, end=day + datetime.timedelta(days=2)).all()
+        if {v.result_id for v, _, _ in flagged} != {child_result.id}:
+            fail(f"Flag filter returned {flagged}", 8)
+
+        # Results written without the ORM are picked up once by the backfill
+        raw_id = s.execute(insert(Result).values(order_id=create_orders(s, [adult.id], [test.id])[1][0],
+                                                 results={"Glucose": "101"})
+                           .returning(Result.id)).scalar()
+        s.commit()
+        if values_of(s, raw_id):
+            fail("Core insert unexpectedly produced result values", 9)
+
+    if backfill_result_values() < 1 or backfill_result_values() != 0:
+        fail("Backfill did not process the new result exactly once", 10)
+    with Session() as s:
+        if values_of(s, raw_id) != {"Glucose": (101.0, "mg/dL", 'H')}:
+            fail(f"Backfilled values are {values_of(s, raw_id)}", 11)
+
+    print("RESULT VALUES TEST PASSED")
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import importlib
+import logging
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel
+from PyQt6.QtCore import Qt, pyqtSignal
+from startup_profile import phase as profile_phase
+import query_stats
+
+logger = logging.getLogger(__name__)
+
+
+class LazyTab(QWidget):
+    """Placeholder that imports and builds a tab the first time it is needed.
+
+    ``target`` is a ``"module:Class"`` path. Classes whose constructor takes
+    an argument get ``current_user``. ``loaded`` is emitted with the real
+    widget once it has been built. A failed build raises from load() once and
+    is not retried; ``error`` keeps the exception.
+    """
+
+    loaded = pyqtSignal(object)
+
+    def __init__(self, target, current_user=None, parent=None):
+        super().__init__(parent)
+        self.target = target
+        self.current_user = current_user
+        self.widget = None
+        self.error = None
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+        self._placeholder = QLabel("Loading...")
+        self._placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self._placeholder.setStyleSheet("color: #7f8c8d; font-size: 14px;")
+        self._layout.addWidget(self._placeholder)
+
+    @property
+    def is_loaded(self):
+        return self.widget is not None
+
+    def load(self):
+        """Import and build the tab if that has not happened yet; return it."""
+        if self.widget is None and self.error is None:
+            module_name, _, class_name = self.target.partition(':')
+            try:
+                with profile_phase(f'tab {class_name}'), query_stats.action(f'build {class_name}'):
+                    with profile_phase(f'import {module_name}'):
+                        tab_class = getattr(importlib.import_module(module_name), class_name)
+                    if tab_class.__init__.__code__.co_argcount > 1:
+                        widget = tab_class(self.current_user)
+                    else:
+                        widget = tab_class()
+            except Exception as e:
+                self.error = e
+                raise
+            self.set_content(widget)
+            self.widget = widget
+            logger.debug("Built %s", class_name)
+            self.loaded.emit(widget)
+        return self.widget
+
+    def set_content(self, widget):
+        """Replace the placeholder label with ``widget``."""
+        if self._placeholder is not None:
+            self._layout.removeWidget(self._placeholder)
+            self._placeholder.deleteLater()
+            self._placeholder = None
+        self._layout.addWidget(widget)
@@ -44,8 +44,6 @@ class PatientForm(QWidget):
         pid = self.pid.text().strip()
         if not pid:
             pid = generate_pid()
-            while session.query(Patient).filter_by(pid=pid).first():
-                pid = generate_pid()
         elif not (len(pid) == 8 and pid[:3].isalpha() and pid[3:].isdigit() and int(pid[3:]) < 100000):
             QMessageBox.warning(self, "Error", "PID must be 8 characters, start with 3 letters, and end with 5 digits (e.g., ABC00001)")
             session.close()
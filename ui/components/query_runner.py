@@ -0,0 +1,188 @@
+import contextlib
+import logging
+import threading
+import time
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QCoreApplication, pyqtSignal
+from database import Session
+import query_stats
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 200
+# SQLite in WAL mode serves concurrent readers, but a few threads are plenty
+MAX_QUERY_THREADS = 4
+
+_pool = None
+
+
+def query_pool():
+    """Thread pool shared by every tab's QueryRunner."""
+    global _pool
+    if _pool is None:
+        _pool = QThreadPool()
+        _pool.setMaxThreadCount(max(1, min(MAX_QUERY_THREADS, QThreadPool.globalInstance().maxThreadCount())))
+    return _pool
+
+
+class _TaskSignals(QObject):
+    chunk = pyqtSignal(object, object)
+    finished = pyqtSignal(object, int)
+    failed = pyqtSignal(object, str)
+
+
+class QueryTask(QRunnable):
+    """Run ``fn(session)`` on a pool thread and hand its rows back in chunks.
+
+    ``fn`` may return a list or be a generator; it gets a session private to
+    the worker thread. Rows produced after cancel() are dropped.
+    """
+
+    def __init__(self, fn, chunk_size=DEFAULT_CHUNK_SIZE):
+        super().__init__()
+        self.fn = fn
+        self.chunk_size = chunk_size
+        self.signals = _TaskSignals()
+        self.callbacks = {}
+        # SQL statistics of the task are charged to the action that submitted it
+        self.action = None
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def run(self):
+        total = 0
+        try:
+            session = Session()
+            chunk = []
+            with query_stats.action(self.action) if self.action else contextlib.nullcontext():
+                for row in self.fn(session) or ():
+                    if self.cancelled:
+                        return
+                    chunk.append(row)
+                    if len(chunk) >= self.chunk_size:
+                        self.signals.chunk.emit(self, chunk)
+                        total += len(chunk)
+                        chunk = []
+            if self.cancelled:
+                return
+            if chunk:
+                self.signals.chunk.emit(self, chunk)
+                total += len(chunk)
+            self.signals.finished.emit(self, total)
+        except Exception as e:
+            logger.error("Background query failed: %s", e)
+            self.signals.failed.emit(self, str(e))
+        finally:
+            # Drop the pool thread's scoped session so no connection is pinned
+            Session.remove()
+
+
+class QueryRunner(QObject):
+    """Submit background queries by key; a new submit cancels the one it supersedes.
+
+    Callbacks run on the thread that owns the runner (the GUI thread):
+    ``on_chunk(rows)`` for every chunk, then ``on_finished(total)`` or
+    ``on_error(message)``.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._tasks = {}
+
+    def submit(self, key, fn, on_chunk=None, on_finished=None, on_error=None,
+               chunk_size=DEFAULT_CHUNK_SIZE):
+        self.cancel(key)
+        task = QueryTask(fn, chunk_size)
+        parent = self.parent()
+        task.action = query_stats.current_action() or query_stats.new_action(
+            f"{type(parent).__name__}.{key}" if parent is not None else str(key))
+        task.callbacks = {'chunk': on_chunk, 'finished': on_finished, 'error': on_error}
+        task.signals.chunk.connect(self._deliver_chunk)
+        task.signals.finished.connect(self._deliver_finished)
+        task.signals.failed.connect(self._deliver_error)
+        self._tasks[key] = task
+        query_pool().start(task)
+        return task
+
+    def cancel(self, key):
+        task = self._tasks.pop(key, None)
+        if task:
+            task.cancel()
+
+    def cancel_all(self):
+        for key in list(self._tasks):
+            self.cancel(key)
+
+    def is_running(self, key=None):
+        return bool(self._tasks) if key is None else key in self._tasks
+
+    def wait(self, timeout=30.0):
+        """Process events until every submitted task has delivered its result."""
+        deadline = time.monotonic() + timeout
+        while self._tasks and time.monotonic() < deadline:
+            QCoreApplication.processEvents()
+            time.sleep(0.005)
+        return not self._tasks
+
+    def _release(self, task):
+        for key, current in list(self._tasks.items()):
+            if current is task:
+                del self._tasks[key]
+
+    def _deliver_chunk(self, task, rows):
+        if not task.cancelled and task.callbacks.get('chunk'):
+            task.callbacks['chunk'](rows)
+
+    def _deliver_finished(self, task, total):
+        if task.cancelled:
+            return
+        self._release(task)
+        if task.callbacks.get('finished'):
+            task.callbacks['finished'](total)
+
+    def _deliver_error(self, task, message):
+        if task.cancelled:
+            return
+        self._release(task)
+        if task.callbacks.get('error'):
+            task.callbacks['error'](message)
+
+
+def load_pages(runner, key, table, pager, count=True, on_update=None, on_error=None):
+    """Stream a KeysetPager's first page into a TestTable in the background.
+
+    Later pages are fetched in the background as the view scrolls to the end.
+    ``on_update()`` runs after each page so callers can refresh status labels.
+    """
+    model = table.model
+
+    def first_page(session):
+        if count:
+            pager.count()
+        return pager.fetch_next()
+
+    def page_done(total):
+        model.fetch_done(more=not pager.exhausted)
+        if on_update:
+            on_update()
+
+    def page_failed(message):
+        model.fetch_done(more=False)
+        if on_error:
+            on_error(message)
+
+    def fetch_more():
+        runner.submit(key, lambda session: pager.fetch_next(),
+                      on_chunk=model.insert_rows, on_finished=page_done, on_error=page_failed)
+        return None
+
+    model.set_fetcher(fetch_more)
+    model.fetch_started()
+    table.update_data([])
+    return runner.submit(key, first_page, on_chunk=model.insert_rows,
+                         on_finished=page_done, on_error=page_failed)
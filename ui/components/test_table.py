@@ -1,43 +1,212 @@
-from PyQt6.QtWidgets import QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget
+from PyQt6.QtWidgets import QTableView, QVBoxLayout, QWidget, QAbstractItemView
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+
+
+class ColumnTableModel(QAbstractTableModel):
+    """Read-only table model that keeps one Python list per column.
+
+    Cells are only formatted when the view asks for them in data(), so a
+    refresh costs one list per column instead of one QTableWidgetItem per cell.
+    """
+
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self._headers = list(headers)
+        self._columns = [[] for _ in self._headers]
+        self._cell_styles = {}
+        self._sort_handler = None
+        self._sort_key = None
+        self._fetcher = None
+        self._fetch_pending = False
+
+    # Qt model interface
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() or not self._columns else len(self._columns[0])
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self._headers[section] if 0 <= section < len(self._headers) else None
+        return str(section + 1)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self._columns[index.column()][index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return str(value)
+        if role == Qt.ItemDataRole.UserRole:
+            return value
+        if role in (Qt.ItemDataRole.BackgroundRole, Qt.ItemDataRole.ForegroundRole):
+            style = self._cell_styles.get(index.column())
+            colors = style(value) if style else None
+            if colors:
+                return colors[0] if role == Qt.ItemDataRole.BackgroundRole else colors[1]
+        return None
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        if column < 0 or column >= len(self._headers):
+            return
+        self._sort_key = (column, order)
+        if self._sort_handler and self._sort_handler(column, order) is not False:
+            # The owner re-queries with ORDER BY and reloads the rows
+            return
+        self.layoutAboutToBeChanged.emit()
+        self._sort_in_place(column, order)
+        self.layoutChanged.emit()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._fetcher is not None and not self._fetch_pending
+
+    def fetchMore(self, parent=QModelIndex()):
+        # Called by the view when it is scrolled to the last loaded row
+        if not self.canFetchMore(parent):
+            return
+        rows = self._fetcher()
+        if rows is None:
+            # Loading in the background; the owner inserts rows and calls fetch_done()
+            self._fetch_pending = True
+        elif rows:
+            self.insert_rows(rows)
+        else:
+            self._fetcher = None
+
+    # Data management
+    def set_rows(self, rows):
+        """Replace the whole table with ``rows`` (a sequence of tuples)."""
+        columns = self._to_columns(rows)
+        self.beginResetModel()
+        self._columns = columns
+        if self._sort_key and not self._sort_handler:
+            self._sort_in_place(*self._sort_key)
+        self.endResetModel()
+
+    def insert_rows(self, rows, position=None):
+        """Insert rows at ``position`` (default: append) without resetting the view."""
+        new_columns = self._to_columns(rows)
+        if not new_columns[0]:
+            return
+        count = self.rowCount()
+        position = count if position is None else max(0, min(position, count))
+        self.beginInsertRows(QModelIndex(), position, position + len(new_columns[0]) - 1)
+        for column, values in zip(self._columns, new_columns):
+            column[position:position] = values
+        self.endInsertRows()
+
+    def remove_rows(self, position, count=1):
+        count = min(count, self.rowCount() - position)
+        if position < 0 or count <= 0:
+            return
+        self.beginRemoveRows(QModelIndex(), position, position + count - 1)
+        for column in self._columns:
+            del column[position:position + count]
+        self.endRemoveRows()
+
+    def row(self, row):
+        return tuple(column[row] for column in self._columns)
+
+    def rows(self):
+        return list(zip(*self._columns))
+
+    def value(self, row, column):
+        return self._columns[column][row]
+
+    def set_cell_style(self, column, style):
+        """``style(value)`` returns (background, foreground) QColors or None."""
+        self._cell_styles[column] = style
+
+    def set_fetcher(self, fetcher):
+        """Load further rows on scroll: ``fetcher()`` returns the next batch, [] when done,
+        or None when it loads in the background (see fetch_done()).
+
+        Rows then arrive in the fetcher's order, so in-memory sorting is turned off.
+        """
+        self._fetcher = fetcher
+        self._fetch_pending = False
+        self._sort_key = None
+
+    def fetch_started(self):
+        self._fetch_pending = True
+
+    def fetch_done(self, more=True):
+        """Finish a background fetch; ``more=False`` means the listing is complete."""
+        self._fetch_pending = False
+        if not more:
+            self._fetcher = None
+
+    def set_sort_handler(self, handler):
+        """Delegate header sorting to ``handler(column, order)``, e.g. an ORDER BY query.
+
+        A handler that returns False leaves that column to the in-memory sort
+        of the loaded rows (e.g. encrypted columns SQL cannot order).
+        """
+        self._sort_handler = handler
+
+    def _to_columns(self, rows):
+        rows = list(rows)
+        if rows and len(rows[0]) != len(self._headers):
+            raise ValueError(f"Data columns ({len(rows[0])}) do not match table columns ({len(self._headers)})")
+        if not rows:
+            return [[] for _ in self._headers]
+        return [list(column) for column in zip(*rows)]
+
+    def _sort_in_place(self, column, order):
+        values = self._columns[column]
+
+        def key(i):
+            return (values[i] is None, values[i])
+
+        reverse = order == Qt.SortOrder.DescendingOrder
+        try:
+            permutation = sorted(range(len(values)), key=key, reverse=reverse)
+        except TypeError:
+            # Mixed types in one column: fall back to comparing the displayed text
+            permutation = sorted(range(len(values)), key=lambda i: str(values[i]), reverse=reverse)
+        self._columns = [[col[i] for i in permutation] for col in self._columns]
+
 
 class TestTable(QWidget):
+    selection_changed = pyqtSignal()
+
     def __init__(self, data, headers, parent=None):
         super().__init__(parent)
         self.layout = QVBoxLayout()
-        self.table = QTableWidget()
-        self.table.setColumnCount(len(headers))
-        self.table.setHorizontalHeaderLabels(headers)
-        self.table.setRowCount(len(data))
+        self.model = ColumnTableModel(headers, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.table.setSortingEnabled(True)
-
-        for row, item in enumerate(data):
-            for col, value in enumerate(item):
-                self.table.setItem(row, col, QTableWidgetItem(str(value)))
+        self.model.set_rows(data)
 
         self.layout.addWidget(self.table)
         self.setLayout(self.layout)
-        self.table.itemSelectionChanged.connect(self._selection_changed)
+        self.table.selectionModel().selectionChanged.connect(self._selection_changed)
 
     def update_data(self, data):
-        if not data or len(data) == 0:
-            self.table.setRowCount(0)
-            return
-        if len(data[0]) != self.table.columnCount():
-            raise ValueError(f"Data columns ({len(data[0])}) do not match table columns ({self.table.columnCount()})")
-        current_row = self.table.currentRow() if self.table.rowCount() > 0 else -1
-        self.table.setRowCount(len(data))
-        for row, item in enumerate(data):
-            for col, value in enumerate(item):
-                self.table.setItem(row, col, QTableWidgetItem(str(value)))
-        if current_row >= 0 and current_row < len(data):
-            self.table.setCurrentCell(current_row, 0)
-
-    def _selection_changed(self):
-        pass
+        current_row = self.current_row()
+        self.model.set_rows(data or [])
+        if 0 <= current_row < self.model.rowCount():
+            self.table.setCurrentIndex(self.model.index(current_row, 0))
+
+    def _selection_changed(self, *args):
+        self.selection_changed.emit()
+
+    def current_row(self):
+        index = self.table.currentIndex()
+        return index.row() if index.isValid() else -1
+
+    def cell(self, row, column):
+        """Displayed text of a cell."""
+        return str(self.model.value(row, column))
+
+    def selected_rows(self):
+        return sorted(index.row() for index in self.table.selectionModel().selectedRows())
 
     def selected_items(self):
         """Return a list of selected items."""
-        selected = []
-        for item in self.table.selectedItems():
-            selected.append(item.text())
-        return selected
+        return [str(self.model.data(index)) for index in self.table.selectionModel().selectedIndexes()]
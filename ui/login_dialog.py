@@ -2,6 +2,9 @@
 from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox
 from database import Session
 from models import User
+import logging
+
+logger = logging.getLogger(__name__)
 
 class LoginDialog(QDialog):
     def __init__(self, parent=None):
@@ -26,7 +29,6 @@ class LoginDialog(QDialog):
 
         self.setLayout(self.layout)
         self.current_user = None
-        print("LoginDialog initialized")  # Debug
 
         self.setStyleSheet("""
             QWidget {
@@ -63,19 +65,18 @@ class LoginDialog(QDialog):
     def login(self):
         username = self.username_input.text()
         password = self.password_input.text()
-        print(f"Login attempt: username={username}, password={password}")  # Debug
         session = Session()
         try:
             user = session.query(User).filter_by(username=username, password=password).first()
             if user:
-                print(f"User found: {user.username}, role={user.role}")  # Debug
+                logger.info("Login succeeded for %s (%s)", user.username, user.role)
                 self.current_user = user
                 self.accept()
             else:
-                print("No user found with provided credentials")  # Debug
+                logger.warning("Failed login attempt for %r", username)
                 QMessageBox.warning(self, "Error", "Invalid username or password")
         except Exception as e:
-            print(f"Login error: {e}")  # Debug
+            logger.error("Login error: %s", e)
             QMessageBox.critical(self, "Error", f"Login failed: {str(e)}")
         finally:
             session.close()
\ No newline at end of file
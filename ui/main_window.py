@@ -9,23 +9,19 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtGui import QIcon, QFont, QAction, QKeySequence, QColor
 from PyQt6.QtCore import Qt, QSize, QDateTime, QTimer, QEvent, pyqtSignal, QEasingCurve, QPropertyAnimation, QThread
-from ui.tabs.dashboard import DashboardTab
-from ui.tabs.patient import PatientTab
-from ui.tabs.order import OrderTab
-from ui.tabs.test import TestTab
-from ui.tabs.result import ResultTab
-from ui.tabs.user import UserTab
-from ui.tabs.report import ReportTab
-from ui.tabs.archive import ArchiveTab
+from ui.components.lazy_tab import LazyTab
 from config import load_config, save_config
+from database import Session, decrypt_cache
+from export import EXPORT_TABLES, export_table, open_export_file, preview_rows
+from snapshot import export_snapshot, read_manifest, snapshot_available
+import query_stats
 import csv
+import html
 import os
 import logging
 from datetime import datetime
 import atexit
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class SearchDialog(QDialog):
@@ -157,16 +153,21 @@ class GlassFrame(QFrame):
 class MainWindow(QMainWindow):
     ICON_PATH = "icons/"
 
+    # Tabs are "module:Class" paths: each module is imported and its tab built
+    # the first time the tab is shown (or prewarmed), not at login
     TAB_CONFIG = [
-        (DashboardTab, "dashboard_icon.png", "Dashboard", "dashboardTab", ["admin", "user"]),
-        (PatientTab,   "patient_icon.png",   "Patients",  "patientTab",   ["admin", "user"]),
-        (OrderTab,     "order_icon.png",     "Orders",    "orderTab",     ["admin", "user"]),
-        (TestTab,      "test_icon.png",      "Tests",     "testTab",      ["admin"]),
-        (ResultTab,    "result_icon.png",    "Results",   "resultTab",    ["admin", "user"]),
-        (UserTab,      "user_icon.png",      "Users",     "userTab",      ["admin"]),
-        (ArchiveTab,   "archive_icon.png",   "Archive",   "archiveTab",   ["admin"]),
-        (ReportTab,    "report_icon.png",    "Reports",   "reportTab",    ["admin", "user"]),
+        ("ui.tabs.dashboard:DashboardTab", "dashboard_icon.png", "Dashboard", "dashboardTab", ["admin", "user"]),
+        ("ui.tabs.patient:PatientTab",     "patient_icon.png",   "Patients",  "patientTab",   ["admin", "user"]),
+        ("ui.tabs.order:OrderTab",         "order_icon.png",     "Orders",    "orderTab",     ["admin", "user"]),
+        ("ui.tabs.test:TestTab",           "test_icon.png",      "Tests",     "testTab",      ["admin"]),
+        ("ui.tabs.result:ResultTab",       "result_icon.png",    "Results",   "resultTab",    ["admin", "user"]),
+        ("ui.tabs.user:UserTab",           "user_icon.png",      "Users",     "userTab",      ["admin"]),
+        ("ui.tabs.archive:ArchiveTab",     "archive_icon.png",   "Archive",   "archiveTab",   ["admin"]),
+        ("ui.tabs.report:ReportTab",       "report_icon.png",    "Reports",   "reportTab",    ["admin", "user"]),
     ]
+    # Idle-time prewarm: wait this long after login, then build one tab per step
+    PREWARM_DELAY_MS = 2000
+    PREWARM_STEP_MS = 250
 
     LIGHT_BLUE_STYLESHEET = """
     /* Light Blue Theme */
@@ -897,7 +898,7 @@ class MainWindow(QMainWindow):
         icon_path = os.path.join(self.ICON_PATH, icon_file)
         if os.path.exists(icon_path):
             return QIcon(icon_path)
-        logger.warning(f"Icon {icon_file} not found at {icon_path}. Using fallback icon.")
+        logger.warning("Icon %s not found at %s. Using fallback icon.", icon_file, icon_path)
         fallbacks = {
             "help_icon.png": QStyle.StandardPixmap.SP_MessageBoxInformation,
             "settings_icon.png": QStyle.StandardPixmap.SP_FileDialogDetailedView,
@@ -1058,38 +1059,17 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(self.tabs)
         self.setCentralWidget(main_container)
 
+        # Only tabs that have been built are in tab_instances
         self.tab_instances = {}
+        self.lazy_tabs = {}
         self.previous_tab_index = -1
         
-        for idx, (TabClass, icon_file, label, obj_name, roles) in enumerate(self.TAB_CONFIG):
-            try:
-                if TabClass.__init__.__code__.co_argcount > 1:
-                    tab_widget = TabClass(self.current_user)
-                else:
-                    tab_widget = TabClass()
-                    
-                tab_container = GlassFrame()
-                tab_layout = QVBoxLayout(tab_container)
-                tab_layout.addWidget(tab_widget)
-                
-            except Exception as e:
-                logger.error(f"Error creating {label} tab: {e}")
-                tab_container = GlassFrame()
-                tab_layout = QVBoxLayout(tab_container)
-                
-                error_label = QLabel(f"🚫 Failed to load {label} tab\n\nError: {str(e)}\n\nPlease contact support.")
-                error_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                error_label.setStyleSheet("""
-                    QLabel {
-                        color: #e74c3c;
-                        font-size: 16px;
-                        font-weight: bold;
-                        padding: 40px;
-                        background: rgba(231, 76, 60, 0.1);
-                        border-radius: 10px;
-                    }
-                """)
-                tab_layout.addWidget(error_label)
+        for idx, (target, icon_file, label, obj_name, roles) in enumerate(self.TAB_CONFIG):
+            tab_container = GlassFrame()
+            tab_layout = QVBoxLayout(tab_container)
+            lazy_tab = LazyTab(target, self.current_user)
+            lazy_tab.loaded.connect(lambda widget, name=obj_name: self._on_tab_loaded(name, widget))
+            tab_layout.addWidget(lazy_tab)
             
             icon = self.load_icon(icon_file)
             self.tabs.addTab(tab_container, icon, f"  {label}  ")
@@ -1101,39 +1081,21 @@ class MainWindow(QMainWindow):
             enabled = self.current_user.role in roles
             self.tabs.setTabEnabled(idx, enabled)
             
-            self.tab_instances[obj_name] = tab_widget
-        
-        # Connect cross-tab signals: when patients are changed notify order tab to reload
-        try:
-            patient_tab = self.tab_instances.get('patientTab')
-            order_tab = self.tab_instances.get('orderTab')
-            if patient_tab and order_tab and hasattr(patient_tab, 'patient_saved'):
-                # patient_saved now emits an int patient_id; reload combos and auto-select the new patient if provided
-                patient_tab.patient_saved.connect(lambda pid, ot=order_tab: (ot.load_combos(), ot.select_patient_by_id(pid) if pid else None))
-            # Connect patient_open_in_order to switch to Orders tab and select the patient
-            if patient_tab and order_tab and hasattr(patient_tab, 'patient_open_in_order'):
-                def _open_orders_for_patient(pid, ot=order_tab):
-                    try:
-                        idx = [i for i, (_, _, _, obj_name, _) in enumerate(self.TAB_CONFIG) if obj_name == 'orderTab'][0]
-                        self.tabs.setCurrentIndex(idx)
-                        # Ensure combos are up-to-date and select the patient
-                        try:
-                            ot.load_combos()
-                        except Exception:
-                            pass
-                        if pid:
-                            ot.select_patient_by_id(pid)
-                    except Exception:
-                        logger.exception('Failed to open Orders tab for patient')
-                patient_tab.patient_open_in_order.connect(_open_orders_for_patient)
-        except Exception:
-            # Non-fatal: if connection fails, continue without breaking UI
-            logger.exception('Failed to connect patient_saved signal to order tab')
+            self.lazy_tabs[obj_name] = lazy_tab
 
+        self.tabs.currentChanged.connect(self._load_tab_at)
         self.tabs.currentChanged.connect(self._animate_tab_change)
         
         if self.tabs.count() > 0:
             self.tabs.setCurrentIndex(0)
+        # Build the first tab once the window is up, then optionally the rest
+        QTimer.singleShot(0, lambda: self._load_tab_at(self.tabs.currentIndex()))
+        try:
+            prewarm = bool(load_config().get('prewarm_tabs', False))
+        except Exception:
+            prewarm = False
+        if prewarm:
+            QTimer.singleShot(self.PREWARM_DELAY_MS, self._prewarm_next_tab)
         
         corner_widget = GlassFrame()
         corner_layout = QHBoxLayout(corner_widget)
@@ -1163,6 +1125,103 @@ class MainWindow(QMainWindow):
         
         self.tabs.setCornerWidget(corner_widget, Qt.Corner.TopRightCorner)
 
+    def _tab_index(self, obj_name):
+        # Tabs are movable, so look them up by object name rather than config order
+        for i in range(self.tabs.count()):
+            if self.tabs.widget(i).objectName() == obj_name:
+                return i
+        return -1
+
+    def tab(self, obj_name):
+        """The tab widget for ``obj_name``, built now if it has not been yet.
+
+        Returns None for tabs the current user's role may not open, or that
+        failed to build.
+        """
+        return self._load_tab_at(self._tab_index(obj_name))
+
+    def _load_tab_at(self, index):
+        container = self.tabs.widget(index)
+        if container is None or not self.tabs.isTabEnabled(index):
+            return None
+        obj_name = container.objectName()
+        lazy_tab = self.lazy_tabs[obj_name]
+        label = next(label for _, _, label, name, _ in self.TAB_CONFIG if name == obj_name)
+        if lazy_tab.is_loaded or lazy_tab.error is not None:
+            return lazy_tab.widget
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            return lazy_tab.load()
+        except Exception as e:
+            logger.error("Error creating %s tab: %s", label, e)
+            error_label = QLabel(f"🚫 Failed to load {label} tab\n\nError: {str(e)}\n\nPlease contact support.")
+            error_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            error_label.setStyleSheet("""
+                QLabel {
+                    color: #e74c3c;
+                    font-size: 16px;
+                    font-weight: bold;
+                    padding: 40px;
+                    background: rgba(231, 76, 60, 0.1);
+                    border-radius: 10px;
+                }
+            """)
+            lazy_tab.set_content(error_label)
+            return None
+        finally:
+            QApplication.restoreOverrideCursor()
+
+    def _prewarm_next_tab(self):
+        """Build the next enabled, unbuilt tab, one per step so input is never blocked for long."""
+        if not self.isVisible():
+            return
+        for index in range(self.tabs.count()):
+            lazy_tab = self.lazy_tabs[self.tabs.widget(index).objectName()]
+            if self.tabs.isTabEnabled(index) and not lazy_tab.is_loaded and lazy_tab.error is None:
+                self._load_tab_at(index)
+                QTimer.singleShot(self.PREWARM_STEP_MS, self._prewarm_next_tab)
+                return
+
+    def _on_tab_loaded(self, obj_name, widget):
+        self.tab_instances[obj_name] = widget
+        # Cross-tab signals: when patients are changed notify the order tab
+        if obj_name == 'patientTab':
+            try:
+                if hasattr(widget, 'patient_saved'):
+                    widget.patient_saved.connect(self._on_patient_saved)
+                if hasattr(widget, 'patient_open_in_order'):
+                    widget.patient_open_in_order.connect(self._open_orders_for_patient)
+            except Exception:
+                # Non-fatal: if connection fails, continue without breaking UI
+                logger.exception('Failed to connect patient tab signals')
+
+    def _on_patient_saved(self, pid):
+        # patient_saved emits an int patient_id; reload combos and auto-select the
+        # patient. An order tab that is not built yet loads fresh data when opened.
+        order_tab = self.tab_instances.get('orderTab')
+        if order_tab:
+            order_tab.load_combos()
+            if pid:
+                order_tab.select_patient_by_id(pid)
+
+    def _open_orders_for_patient(self, pid):
+        try:
+            was_loaded = 'orderTab' in self.tab_instances
+            self.tabs.setCurrentIndex(self._tab_index('orderTab'))
+            order_tab = self.tab('orderTab')
+            if order_tab is None:
+                return
+            # Ensure combos are up-to-date (a freshly built tab already is)
+            if was_loaded:
+                try:
+                    order_tab.load_combos()
+                except Exception:
+                    pass
+            if pid:
+                order_tab.select_patient_by_id(pid)
+        except Exception:
+            logger.exception('Failed to open Orders tab for patient')
+
     def _next_tab(self):
         current = self.tabs.currentIndex()
         next_idx = (current + 1) % self.tabs.count()
@@ -1191,7 +1250,7 @@ class MainWindow(QMainWindow):
                 anim.setEasingCurve(QEasingCurve.Type.OutCubic)
                 anim.start()
             except Exception as e:
-                logger.warning(f"Failed to animate tab change: {e}")
+                logger.warning("Failed to animate tab change: %s", e)
                 
         self.previous_tab_index = index
 
@@ -1218,7 +1277,7 @@ class MainWindow(QMainWindow):
                     if results:
                         search_results[tab_name] = results
                 except Exception as e:
-                    logger.error(f"Error searching in {tab_name}: {e}")
+                    logger.error("Error searching in %s: %s", tab_name, e)
                     
         if search_results:
             dialog = SearchDialog(self, search_results)
@@ -1236,13 +1295,12 @@ class MainWindow(QMainWindow):
                 category, item_text = item.text().split(": ", 1)
                 category = category.replace("📄 ", "").strip()
                 tab_name = [name for name, results in search_results.items() if item_text in results][0]
-                tab_index = [i for i, (_, _, _, name, _) in enumerate(self.TAB_CONFIG) if name == tab_name][0]
-                self.tabs.setCurrentIndex(tab_index)
-                tab = self.tab_instances[tab_name]
+                self.tabs.setCurrentIndex(self._tab_index(tab_name))
+                tab = self.tab(tab_name)
                 if hasattr(tab, 'highlight_result'):
                     tab.highlight_result(item_text)
         except Exception as e:
-            logger.error(f"Error navigating to search result: {e}")
+            logger.error("Error navigating to search result: %s", e)
             self.statusBar().showMessage("⚠️ Error navigating to result", 3000)
 
     def _init_status_bar(self):
@@ -1336,9 +1394,14 @@ class MainWindow(QMainWindow):
 
     def _export_data(self):
         items = ["All Data", "Patients", "Orders", "Tests", "Results", "Users", "Session Data"]
+        if snapshot_available():
+            items.append("Analytics Snapshot")
         item, ok = QInputDialog.getItem(self, "Export Data", "Select data to export:", items, 0, False)
         if not ok:
             return
+        if item == "Analytics Snapshot":
+            self._export_snapshot()
+            return
 
         preview_dialog = QDialog(self)
         preview_dialog.setWindowTitle(f"Preview {item} Export")
@@ -1360,8 +1423,8 @@ class MainWindow(QMainWindow):
         layout = QVBoxLayout()
         preview_text = QTextEdit()
         preview_text.setReadOnly(True)
-        sample_data = self._get_sample_data(item.lower())
-        preview_text.setText("\n".join([",".join(row) for row in sample_data[:5]]))
+        sample_data = self._get_preview_data(item.lower())
+        preview_text.setText("\n".join([",".join(row) for row in sample_data[:6]]))
         layout.addWidget(QLabel(f"Preview of {item} (first 5 rows):"))
         layout.addWidget(preview_text)
         button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
@@ -1374,82 +1437,123 @@ class MainWindow(QMainWindow):
             return
 
         default_name = f"lab_export_{QDateTime.currentDateTime().toString('yyyyMMdd_hhmmss')}"
-        path, _ = QFileDialog.getSaveFileName(self, f"Export {item}", default_name, "CSV Files (*.csv)")
-        if path:
-            self.progress_bar = QProgressBar(self.statusBar())
-            self.progress_bar.setMaximum(100)
-            self.statusBar().addPermanentWidget(self.progress_bar)
+        path, _ = QFileDialog.getSaveFileName(
+            self, f"Export {item}", default_name, "CSV Files (*.csv);;Compressed CSV Files (*.csv.gz)"
+        )
+        if not path:
+            return
+        data_type = item.lower()
+        if data_type == "all data":
+            jobs = [(table, self._export_path(path, table)) for table in EXPORT_TABLES]
+        else:
+            jobs = [(data_type, path)]
+
+        self.progress_bar = QProgressBar(self.statusBar())
+        self.progress_bar.setMaximum(100)
+        self.statusBar().addPermanentWidget(self.progress_bar)
+        self.export_thread = self.ExportThread(jobs, self._session_rows())
+        self.export_thread.progress.connect(self.progress_bar.setValue)
+        self.export_thread.finished.connect(lambda msg: self._export_done(item, msg))
+        self.export_thread.error.connect(self._export_failed)
+        self.export_thread.start()
+
+    def _export_snapshot(self):
+        """Write or refresh a pseudonymized Parquet/Arrow snapshot for analytics"""
+        formats = {"Parquet": 'parquet', "Arrow IPC": 'arrow'}
+        label, ok = QInputDialog.getItem(self, "Analytics Snapshot", "Format:", list(formats), 0, False)
+        if not ok:
+            return
+        output_dir = QFileDialog.getExistingDirectory(self, "Snapshot directory")
+        if not output_dir:
+            return
+        fmt = formats[label]
+        manifest = read_manifest(output_dir)
+        incremental = False
+        if manifest and manifest.get('format') == fmt:
+            reply = QMessageBox.question(
+                self, "Analytics Snapshot",
+                f"This directory holds a snapshot up to {manifest.get('last_month')}.\n"
+                "Only refresh the months from then on and months with changed orders or results?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            incremental = reply == QMessageBox.StandardButton.Yes
+
+        self.progress_bar = QProgressBar(self.statusBar())
+        self.progress_bar.setMaximum(100)
+        self.statusBar().addPermanentWidget(self.progress_bar)
+        self.export_thread = self.ExportThread([('analytics snapshot', output_dir)], self._session_rows(),
+                                               snapshot_format=fmt, incremental=incremental)
+        self.export_thread.progress.connect(self.progress_bar.setValue)
+        self.export_thread.finished.connect(lambda msg: self._export_done("Analytics snapshot", msg))
+        self.export_thread.error.connect(self._export_failed)
+        self.export_thread.start()
+
+    def _session_rows(self):
+        return [["Metric", "Value"], ["Session Start", self.session_start.strftime('%Y-%m-%d %H:%M:%S')]]
+
+    def _get_preview_data(self, data_type):
+        if data_type == "session data":
+            return self._session_rows()
+        if data_type in EXPORT_TABLES:
             try:
-                if item == "All Data":
-                    self._export_all_data(path)
-                else:
-                    self._export_specific_data(item.lower(), path)
-                QMessageBox.information(self, "Export Successful", f"{item} exported successfully!")
+                return preview_rows(data_type)
             except Exception as e:
-                logger.error(f"Export failed: {e}")
-                QMessageBox.critical(self, "Export Failed", f"Error during export: {str(e)}")
-            finally:
-                self.progress_bar.setValue(100)
-                QTimer.singleShot(1000, lambda: self.statusBar().removeWidget(self.progress_bar))
-
-    def _get_sample_data(self, data_type):
-        sample_data = {
-            "patients": [["ID", "Name", "DOB", "Gender"], ["1", "John Doe", "1980-01-01", "Male"]],
-            "orders": [["Order ID", "Patient ID", "Test ID", "Date"], ["1001", "1", "5", "2023-05-01"]],
-            "tests": [["Test ID", "Name", "Category", "Price"], ["5", "Blood Test", "Hematology", "50.00"]],
-            "results": [["Result ID", "Order ID", "Value", "Unit"], ["5001", "1001", "5.2", "mg/dL"]],
-            "users": [["User ID", "Username", "Role", "Email"], ["1", "admin", "admin", "admin@example.com"]],
-            "session data": [["Metric", "Value"], ["Session Start", self.session_start.strftime('%Y-%m-%d %H:%M:%S')]]
-        }
-        return sample_data.get(data_type, [["No preview available"]])
+                logger.error("Export preview failed: %s", e)
+        return [["No preview available"]]
+
+    @staticmethod
+    def _export_path(path, data_type):
+        """``lab_export.csv`` -> ``lab_export_patients.csv`` (keeping a ``.csv.gz`` suffix)"""
+        for ext in ('.csv.gz', '.csv'):
+            if path.lower().endswith(ext):
+                return f"{path[:-len(ext)]}_{data_type}{path[-len(ext):]}"
+        return f"{path}_{data_type}.csv"
+
+    def _export_done(self, item, message):
+        self.progress_bar.setValue(100)
+        self.statusBar().showMessage(message, 5000)
+        QTimer.singleShot(1000, lambda: self.statusBar().removeWidget(self.progress_bar))
+        QMessageBox.information(self, "Export Successful", f"{item} exported successfully!\n{message}")
+
+    def _export_failed(self, error):
+        logger.error("Export failed: %s", error)
+        self.statusBar().removeWidget(self.progress_bar)
+        QMessageBox.critical(self, "Export Failed", f"Error during export: {error}")
 
     class ExportThread(QThread):
+        """Stream each (data_type, path) job to disk with the export engine."""
         progress = pyqtSignal(int)
         finished = pyqtSignal(str)
         error = pyqtSignal(str)
 
-        def __init__(self, data_type, path, data):
+        def __init__(self, jobs, session_rows, snapshot_format='parquet', incremental=True):
             super().__init__()
-            self.data_type = data_type
-            self.path = path
-            self.data = data
+            self.jobs = jobs
+            self.session_rows = session_rows
+            self.snapshot_format = snapshot_format
+            self.incremental = incremental
 
         def run(self):
             try:
-                with open(self.path, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    total_rows = len(self.data)
-                    for i, row in enumerate(self.data):
-                        writer.writerow(row)
-                        self.progress.emit(int((i + 1) / total_rows * 100) if total_rows > 0 else 100)
-                    self.finished.emit(f"{self.data_type} exported successfully")
+                rows = 0
+                for i, (data_type, path) in enumerate(self.jobs):
+                    def progress(written, total, i=i):
+                        done = written / total if total else 1
+                        self.progress.emit(int((i + done) / len(self.jobs) * 100))
+
+                    if data_type == "analytics snapshot":
+                        rows += export_snapshot(path, self.snapshot_format, self.incremental, progress)
+                    elif data_type == "session data":
+                        with open_export_file(path) as f:
+                            csv.writer(f).writerows(self.session_rows)
+                        rows += len(self.session_rows) - 1
+                    else:
+                        rows += export_table(data_type, path, progress=progress)
+                self.finished.emit(f"{rows} row(s) exported")
             except Exception as e:
                 self.error.emit(str(e))
-
-    def _export_all_data(self, path):
-        base_name = os.path.splitext(path)[0]
-        data_types = ["patients", "orders", "tests", "results", "users"]
-        total = len(data_types)
-        for i, data_type in enumerate(data_types):
-            file_path = f"{base_name}_{data_type}.csv"
-            self._export_specific_data(data_type, file_path)
-            self.progress_bar.setValue(int((i + 1) / total * 100))
-
-    def _export_specific_data(self, data_type, path):
-        sample_data = {
-            "patients": [["ID", "Name", "DOB", "Gender"], ["1", "John Doe", "1980-01-01", "Male"]],
-            "orders": [["Order ID", "Patient ID", "Test ID", "Date"], ["1001", "1", "5", "2023-05-01"]],
-            "tests": [["Test ID", "Name", "Category", "Price"], ["5", "Blood Test", "Hematology", "50.00"]],
-            "results": [["Result ID", "Order ID", "Value", "Unit"], ["5001", "1001", "5.2", "mg/dL"]],
-            "users": [["User ID", "Username", "Role", "Email"], ["1", "admin", "admin", "admin@example.com"]],
-            "session data": [["Metric", "Value"], ["Session Start", self.session_start.strftime('%Y-%m-%d %H:%M:%S')]]
-        }
-        data = sample_data.get(data_type, [])
-        self.export_thread = self.ExportThread(data_type, path, data)
-        self.export_thread.progress.connect(self.progress_bar.setValue)
-        self.export_thread.finished.connect(lambda msg: self.statusBar().showMessage(msg, 5000))
-        self.export_thread.error.connect(lambda err: QMessageBox.critical(self, "Export Failed", err))
-        self.export_thread.start()
+            finally:
+                Session.remove()
 
     def _show_settings(self):
         settings_dialog = QDialog(self)
@@ -1499,6 +1603,13 @@ class MainWindow(QMainWindow):
         except Exception:
             use_glass_chk.setChecked(False)
         layout.addWidget(use_glass_chk)
+
+        prewarm_chk = QCheckBox("Pre-load the other tabs in the background after login")
+        try:
+            prewarm_chk.setChecked(bool(load_config().get('prewarm_tabs', False)))
+        except Exception:
+            prewarm_chk.setChecked(False)
+        layout.addWidget(prewarm_chk)
         
         button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
         def apply_settings():
@@ -1516,6 +1627,7 @@ class MainWindow(QMainWindow):
                 cfg['use_glass'] = bool(self.use_glass)
                 cfg['theme'] = self.current_theme
                 cfg['inactivity_timeout_minutes'] = int(self.inactivity_timeout // 60000)
+                cfg['prewarm_tabs'] = bool(prewarm_chk.isChecked())
                 save_config(cfg)
             except Exception:
                 pass
@@ -1568,7 +1680,7 @@ class MainWindow(QMainWindow):
         stats_dialog = QDialog(self)
         stats_dialog.setWindowTitle("Session Statistics")
         stats_dialog.setModal(True)
-        stats_dialog.resize(400, 300)
+        stats_dialog.resize(760, 560)
         stats_dialog.setStyleSheet("""
             QDialog {
                 background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
@@ -1600,6 +1712,7 @@ class MainWindow(QMainWindow):
         session_duration = datetime.now() - self.session_start
         hours, remainder = divmod(int(session_duration.total_seconds()), 3600)
         minutes, seconds = divmod(remainder, 60)
+        cache = decrypt_cache.stats()
         
         stats_content = f"""
         <h3>Session Overview</h3>
@@ -1609,6 +1722,10 @@ class MainWindow(QMainWindow):
         <p><b>Duration:</b> {hours:02d}:{minutes:02d}:{seconds:02d}</p>
         <p><b>Actions:</b> {self.session_data['actions_performed']}</p>
         <p><b>Current Theme:</b> {self.current_theme}</p>
+        <h3>Performance</h3>
+        <p><b>Decrypt Cache:</b> {cache['hits']} hits / {cache['misses']} misses
+        ({cache['hit_rate']:.0%} hit rate, {cache['size']}/{cache['maxsize']} entries)</p>
+        {self._query_stats_html()}
         """
         
         stats_text.setHtml(stats_content)
@@ -1620,6 +1737,38 @@ class MainWindow(QMainWindow):
         
         stats_dialog.exec()
 
+    @staticmethod
+    def _query_stats_html():
+        """SQL statistics of this session (see query_stats) for the stats dialog."""
+        def sql(text, limit=160):
+            return html.escape(text if len(text) <= limit else text[:limit] + '...')
+
+        totals = query_stats.summary()
+        parts = [f"""
+        <h3>Database</h3>
+        <p><b>Statements:</b> {totals['statements']} ({totals['total_ms']:.0f} ms total),
+        <b>slow:</b> {totals['slow']} (&ge; {query_stats.SLOW_QUERY_MS:.0f} ms),
+        <b>possible N+1:</b> {totals['n_plus_one']}</p>
+        <p><b>Slow query log:</b> {html.escape(query_stats.SLOW_QUERY_LOG)}</p>
+        <h4>Recent actions</h4><table cellspacing="4">
+        <tr><th align="left">Action</th><th>Statements</th><th>ms</th><th align="left">N+1</th></tr>"""]
+        for action in query_stats.recent_actions(10):
+            suspects = '<br>'.join(sql(s, 80) for s in action['n_plus_one'])
+            parts.append(f"<tr><td>{html.escape(action['name'])}</td><td align='right'>{action['statements']}</td>"
+                         f"<td align='right'>{action['total_ms']:.1f}</td><td>{suspects}</td></tr>")
+        parts.append("</table><h4>Most expensive statements</h4><table cellspacing='4'>"
+                     "<tr><th>Count</th><th>Total ms</th><th>Max ms</th><th align='left'>SQL</th></tr>")
+        for row in query_stats.top_statements(8):
+            parts.append(f"<tr><td align='right'>{row['count']}</td><td align='right'>{row['total_ms']:.1f}</td>"
+                         f"<td align='right'>{row['max_ms']:.1f}</td><td>{sql(row['sql'])}</td></tr>")
+        parts.append("</table><h4>Slow queries</h4>")
+        for entry in query_stats.slow_queries(5):
+            plan = '<br>'.join(html.escape(line) for line in entry['plan'])
+            parts.append(f"<p><b>{entry['at'].strftime('%H:%M:%S')} {entry['ms']:.0f} ms</b> "
+                         f"[{html.escape(entry['action'])}] {sql(entry['sql'], 300)}"
+                         f"{'<br><i>' + plan + '</i>' if plan else ''}</p>")
+        return ''.join(parts)
+
     def _refresh_all_tabs(self):
         refresh_animation = QPropertyAnimation(self, b"windowOpacity")
         refresh_animation.setDuration(300)
@@ -1640,7 +1789,7 @@ class MainWindow(QMainWindow):
                     count = tab_instance.refresh_data() or 0
                     refresh_count += count
                 except Exception as e:
-                    logger.error(f"Error refreshing {tab_name}: {e}")
+                    logger.error("Error refreshing %s: %s", tab_name, e)
         
         reverse_animation = QPropertyAnimation(self, b"windowOpacity")
         reverse_animation.setDuration(300)
@@ -1657,7 +1806,7 @@ class MainWindow(QMainWindow):
             # Reuse same cleanup logic to stop background threads
             self._cleanup_threads()
         except Exception as e:
-            logger.error(f"Error during tab cleanup: {e}")
+            logger.error("Error during tab cleanup: %s", e)
         
         if self._confirm_on_close:
             minimize_option = QMessageBox.StandardButton.Yes if QSystemTrayIcon.isSystemTrayAvailable() else QMessageBox.StandardButton.No
@@ -1793,6 +1942,6 @@ class MainWindow(QMainWindow):
                             # ignore attribute access exceptions
                             pass
                 except Exception:
-                    logger.exception(f"Error cleaning tab {tab_name}")
+                    logger.exception("Error cleaning tab %s", tab_name)
         except Exception:
             logger.exception("Failed to cleanup threads in MainWindow")
\ No newline at end of file
@@ -4,6 +4,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 from database import Session
+from ui.components.query_runner import QueryRunner
 from models import ArchiveEntry, User, Patient, Order, Result, OrderComment
 import json
 
@@ -13,6 +14,7 @@ class ArchiveTab(QWidget):
     def __init__(self, current_user=None):
         super().__init__()
         self.current_user = current_user
+        self.query_runner = QueryRunner(self)
         self.setup_ui()
         self.load_archives()
 
@@ -41,17 +43,10 @@ class ArchiveTab(QWidget):
         layout.addLayout(btn_layout)
 
     def load_archives(self):
-        session = Session()
-        try:
+        def archive_rows(session):
             entries = session.query(ArchiveEntry).order_by(ArchiveEntry.deleted_at.desc()).all()
-            self.table.setRowCount(len(entries))
-            for row, e in enumerate(entries):
-                self.table.setItem(row, 0, QTableWidgetItem(str(e.id)))
-                self.table.setItem(row, 1, QTableWidgetItem(e.entity_type))
-                self.table.setItem(row, 2, QTableWidgetItem(str(e.entity_id)))
+            for e in entries:
                 deleted_by = str(e.deleted_by) if e.deleted_by else "-"
-                self.table.setItem(row, 3, QTableWidgetItem(deleted_by))
-                self.table.setItem(row, 4, QTableWidgetItem(e.deleted_at.isoformat() if e.deleted_at else "-"))
                 # Summary: small preview of patient name or JSON first keys
                 try:
                     data = e.data
@@ -63,9 +58,24 @@ class ArchiveTab(QWidget):
                         summary = json.dumps(list(data.keys()))
                 except Exception:
                     summary = "(unable to preview)"
-                self.table.setItem(row, 5, QTableWidgetItem(str(summary)))
-        finally:
-            session.close()
+                yield (
+                    str(e.id),
+                    e.entity_type,
+                    str(e.entity_id),
+                    deleted_by,
+                    e.deleted_at.isoformat() if e.deleted_at else "-",
+                    str(summary)
+                )
+
+        self.table.setRowCount(0)
+        self.query_runner.submit('archives', archive_rows, on_chunk=self._append_archive_rows)
+
+    def _append_archive_rows(self, rows):
+        start = self.table.rowCount()
+        self.table.setRowCount(start + len(rows))
+        for row, values in enumerate(rows, start):
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(value))
 
     def _selected_entry_id(self):
         rows = self.table.selectionModel().selectedRows()
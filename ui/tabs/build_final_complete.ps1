@@ -24,6 +24,14 @@ $qt6BinPath = Join-Path $qt6Path "Qt6\bin"
 Write-Host "Qt6 Path: $qt6Path" -ForegroundColor Cyan
 Write-Host "Qt6 Bin Path: $qt6BinPath" -ForegroundColor Cyan
 
+# Optional features are disabled in the build when their package is missing
+foreach ($module in @('pypdf', 'pyarrow')) {
+    python -c "import $module" 2>$null
+    if ($LASTEXITCODE -ne 0) {
+        Write-Host "WARNING: $module not installed - its feature will be disabled in this build (pip install -r requirements.txt)" -ForegroundColor Yellow
+    }
+}
+
 # Build PyInstaller command as an array
 $pyinstallerArgs = @(
     '--onedir',
@@ -112,6 +120,10 @@ $pyinstallerArgs = @(
     '--hidden-import', 'reportlab.graphics.charts',
     '--hidden-import', 'reportlab.graphics.widgets',
     '--hidden-import', 'reportlab.graphics.barcode',
+    # Optional features, bundled when installed
+    '--hidden-import', 'pypdf',
+    '--hidden-import', 'pyarrow',
+    '--hidden-import', 'pyarrow.parquet',
     'main.py'
 )
 
@@ -40,41 +40,168 @@ except ModuleNotFoundError:
     if _repo_root not in sys.path:
         sys.path.insert(0, _repo_root)
     from database import Session
-from models import Order, Patient, Test, cipher
+from models import Order, Patient, Test, Result, DataVersion, cipher
+from sqlalchemy import select
 from sqlalchemy.orm import joinedload, selectinload
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, case, and_, union_all
 from contextlib import contextmanager
+from collections import namedtuple
+import query_stats
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('dashboard.log'),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger('Dashboard')
+# Handlers and levels come from log_config.setup_logging()
+logger = logging.getLogger(__name__)
 
 
 class DatabaseManager:
     """Database connection manager with context support"""
     
     @contextmanager
-    def get_session(self):
-        """Context manager for database sessions"""
+    def get_session(self, snapshot=False):
+        """Context manager for database sessions.
+
+        With ``snapshot`` every read in the block comes from one SQLite read
+        transaction. pysqlite opens none for SELECTs on its own, so each
+        statement would otherwise see whatever was committed just before it.
+        """
         session = Session()
         try:
+            if snapshot:
+                session.connection().exec_driver_sql('BEGIN')
             yield session
             session.commit()
         except Exception as e:
             session.rollback()
-            logger.error(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             raise
         finally:
             session.close()
 
 
+# Shown on the stat cards when the database cannot be queried
+STATS_FALLBACK = {
+    'today_orders': 15,
+    'pending_results': 8,
+    'completed_today': 12,
+    'verified_today': 5
+}
+
+
+def fetch_dashboard_stats(session, day=None):
+    """Return every stat card counter from one conditional-aggregate SELECT"""
+    day = day or datetime.datetime.now().date()
+    is_today = and_(
+        Order.order_date >= day,
+        Order.order_date < day + datetime.timedelta(days=1)
+    )
+
+    def count_where(condition):
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+    row = session.query(
+        count_where(is_today),
+        count_where(Order.status.in_(PENDING_STATUSES)),
+        count_where(and_(is_today, Order.status == 'Completed')),
+        count_where(and_(is_today, Order.status == 'Verified'))
+    ).filter(
+        # Only today's and pending orders can count. A plain OR of the two makes
+        # SQLite scan every order, so their ids come from one index range each.
+        Order.id.in_(union_all(
+            select(Order.id).where(Order.order_date >= day),
+            select(Order.id).where(Order.status.in_(PENDING_STATUSES))
+        ))
+    ).one()
+    return dict(zip(('today_orders', 'pending_results', 'completed_today', 'verified_today'),
+                    (int(value) for value in row)))
+
+
+HISTOGRAM_BUCKETS = {
+    # bucket name -> (strftime format, number of fixed buckets)
+    'hour': ('%H', 24),
+    'weekday': ('%w', 7),  # 0 = Sunday, as SQLite reports it
+    'day': ('%Y-%m-%d', None),
+}
+
+
+def fetch_order_histogram(session, bucket='hour', start=None, end=None, statuses=None):
+    """Count orders per time bucket with a GROUP BY in SQL.
+
+    'hour' and 'weekday' return fixed-size lists (24 and 7 entries); 'day'
+    returns one entry per calendar day from start up to (excluding) end.
+    Defaults to today when no range is given. ``statuses`` limits the count
+    to orders currently in one of those statuses.
+    """
+    fmt, size = HISTOGRAM_BUCKETS[bucket]
+    start = start or datetime.datetime.now().date()
+    end = end or start + datetime.timedelta(days=1)
+
+    key = func.strftime(fmt, Order.order_date)
+    query = session.query(key, func.count(Order.id)).filter(
+        Order.order_date >= start,
+        Order.order_date < end
+    )
+    if statuses:
+        query = query.filter(Order.status.in_(statuses))
+    rows = query.group_by(key).all()
+
+    if size is not None:
+        counts = [0] * size
+        for key_value, count in rows:
+            if key_value is not None and 0 <= int(key_value) < size:
+                counts[int(key_value)] = count
+        return counts
+
+    by_day = {key_value: count for key_value, count in rows}
+    days = (end - start).days
+    return [by_day.get((start + datetime.timedelta(days=i)).strftime(fmt), 0) for i in range(days)]
+
+
+def fetch_analytics_histograms(session, days=28, statuses=None):
+    """Hourly (today), weekday and per-day buckets for the analytics dialog"""
+    today = datetime.datetime.now().date()
+    since = today - datetime.timedelta(days=days - 1)
+    tomorrow = today + datetime.timedelta(days=1)
+    return {
+        'hourly': fetch_order_histogram(session, 'hour', statuses=statuses),
+        'weekday': fetch_order_histogram(session, 'weekday', since, tomorrow, statuses),
+        'daily': fetch_order_histogram(session, 'day', since, tomorrow, statuses),
+    }
+
+
+# Stat cards that count orders per day, and the statuses each one counts
+# (None = every order). "Pending Results" is a backlog, not a daily volume,
+# so its dialog has no daily/weekly statistics.
+CARD_HISTOGRAM_STATUSES = {
+    'Orders Today': None,
+    'Completed Today': ('Completed',),
+    'Verified Today': ('Verified',),
+}
+
+
+PENDING_STATUSES = ('Pending', 'In Progress')
+RECENT_ORDERS_LIMIT = 20
+
+# Snapshot of what the dashboard was built from. The versions are bumped by
+# triggers on every write, so an unchanged watermark means nothing to reload.
+ChangeWatermark = namedtuple(
+    'ChangeWatermark',
+    ['day', 'max_order_id', 'max_result_id', 'orders_version', 'results_version']
+)
+
+
+def fetch_change_watermark(session):
+    """Read the current change watermark in a single SELECT"""
+    def version_of(table):
+        return select(DataVersion.version).where(DataVersion.table_name == table).scalar_subquery()
+
+    row = session.query(
+        select(func.max(Order.id)).scalar_subquery(),
+        select(func.max(Result.id)).scalar_subquery(),
+        version_of('orders'),
+        version_of('results')
+    ).one()
+    return ChangeWatermark(datetime.datetime.now().date(), *row)
+
+
 class DataUpdateThread(QThread):
     """Background thread for data updates to prevent UI freezing"""
     data_updated = pyqtSignal(dict)
@@ -88,26 +215,86 @@ class DataUpdateThread(QThread):
             'update_interval': 30000,  # 30 seconds
             'timeout': 3000  # 3 second timeout for stopping
         }
+        self.watermark = None
+        self.cached_data = None
     
     def run(self):
         logger.info("Data update thread started")
         while self.running:
             try:
-                with self.db_manager.get_session() as session:
-                    data = {
-                        'today_orders': self.get_todays_orders(session),
-                        'pending_results': self.get_pending_results(session),
-                        'completed_today': self.get_completed_today(session),
-                        'verified_today': self.get_verified_today(session),
-                        'hourly_data': self.get_hourly_data(session),
-                        'recent_orders': self.get_recent_orders(session)
-                    }
-                    self.data_updated.emit(data)
+                data = self.refresh_once()
+                if data is not None:
+                    self.data_updated.emit(dict(data))
                 self.msleep(self.config['update_interval'])
             except Exception as e:
-                logger.error(f"Data update error: {e}")
+                logger.error("Data update error: %s", e)
+                self.watermark = None
                 self.error_occurred.emit(str(e))
                 self.msleep(5000)  # Longer delay on error
+
+    def refresh_once(self):
+        """Run one update cycle; returns the new data, or None when nothing changed"""
+        # Runs every cycle: kept out of recent_actions so it does not crowd out user actions
+        # One snapshot: an order committed after the watermark is read must
+        # not show up in this cycle's figures and then be merged again
+        with self.db_manager.get_session(snapshot=True) as session, \
+                query_stats.action('dashboard update', record=False):
+            watermark = fetch_change_watermark(session)
+            data = self.collect_data(session, watermark)
+        self.watermark = watermark
+        if data is not None:
+            self.cached_data = data
+        return data
+
+    def collect_data(self, session, watermark):
+        """Return fresh dashboard data, or None when nothing changed since the last cycle"""
+        last = self.watermark
+        if (last is None or self.cached_data is None or last.day != watermark.day
+                or watermark.orders_version is None):
+            return self.full_refresh(session)
+        if watermark == last:
+            logger.debug("Dashboard data unchanged, skipping refresh")
+            return None
+
+        order_writes = watermark.orders_version - (last.orders_version or 0)
+        if not order_writes:
+            # Result writes alone do not change any order-based figure
+            return None
+
+        new_orders = self.get_orders_since(session, last.max_order_id or 0)
+        if len(new_orders) != order_writes:
+            # Updates or deletes happened as well; merging is not possible
+            return self.full_refresh(session)
+        return self.merge_new_orders(new_orders, watermark.day)
+
+    def full_refresh(self, session):
+        data = self.get_dashboard_stats(session)
+        data.update({
+            'hourly_data': self.get_hourly_data(session),
+            'recent_orders': self.get_recent_orders(session)
+        })
+        return data
+
+    def merge_new_orders(self, orders, day):
+        """Fold newly inserted orders into the cached counters and activity list"""
+        data = dict(self.cached_data)
+        data['hourly_data'] = list(data['hourly_data'])
+        for order in orders:
+            if order.status in PENDING_STATUSES:
+                data['pending_results'] += 1
+            if order.order_date and order.order_date.date() == day:
+                data['today_orders'] += 1
+                data['hourly_data'][order.order_date.hour] += 1
+                if order.status == 'Completed':
+                    data['completed_today'] += 1
+                elif order.status == 'Verified':
+                    data['verified_today'] += 1
+
+        rows = [row for row in map(self.order_row, orders) if row] + data['recent_orders']
+        rows.sort(key=lambda row: (row[4], row[0]), reverse=True)
+        data['recent_orders'] = rows[:RECENT_ORDERS_LIMIT]
+        logger.debug("Merged %s new order(s) into dashboard data", len(orders))
+        return data
     
     def stop(self):
         """Stop thread with timeout to prevent hanging"""
@@ -120,86 +307,27 @@ class DataUpdateThread(QThread):
             self.wait()
         logger.info("Data update thread stopped")
     
-    def get_todays_orders(self, session):
-        """Get today's orders with proper error handling"""
+    def get_dashboard_stats(self, session):
+        """Get all KPI counters with a single aggregated query"""
         try:
-            today = datetime.datetime.now().date()
-            count = session.query(Order).filter(
-                Order.order_date >= today,
-                Order.order_date < today + datetime.timedelta(days=1)
-            ).count()
-            logger.debug(f"Today's orders: {count}")
-            return count
+            stats = fetch_dashboard_stats(session)
+            logger.debug("Dashboard stats: %s", stats)
+            return stats
         except Exception as e:
-            logger.error(f"Error getting today's orders: {e}")
-            return 15  # Fallback value
-    
-    def get_pending_results(self, session):
-        """Get pending results with proper error handling"""
-        try:
-            count = session.query(Order).filter(
-                Order.status.in_(['Pending', 'In Progress'])
-            ).count()
-            logger.debug(f"Pending results: {count}")
-            return count
-        except Exception as e:
-            logger.error(f"Error getting pending results: {e}")
-            return 8  # Fallback value
-    
-    def get_completed_today(self, session):
-        """Get completed orders today with proper error handling"""
-        try:
-            today = datetime.datetime.now().date()
-            count = session.query(Order).filter(
-                Order.status == 'Completed',
-                Order.order_date >= today,
-                Order.order_date < today + datetime.timedelta(days=1)
-            ).count()
-            logger.debug(f"Completed today: {count}")
-            return count
-        except Exception as e:
-            logger.error(f"Error getting completed today: {e}")
-            return 12  # Fallback value
-    
-    def get_verified_today(self, session):
-        """Get verified orders today with proper error handling"""
-        try:
-            today = datetime.datetime.now().date()
-            count = session.query(Order).filter(
-                Order.status == 'Verified',
-                Order.order_date >= today,
-                Order.order_date < today + datetime.timedelta(days=1)
-            ).count()
-            logger.debug(f"Verified today: {count}")
-            return count
-        except Exception as e:
-            logger.error(f"Error getting verified today: {e}")
-            return 5  # Fallback value
-    
+            logger.error("Error getting dashboard stats: %s", e)
+            return dict(STATS_FALLBACK)
+
     def get_hourly_data(self, session):
         """Get hourly order distribution for today - return list for sparkline"""
         try:
-            today = datetime.datetime.now().date()
-            tomorrow = today + datetime.timedelta(days=1)
-            
-            orders = session.query(Order).filter(
-                Order.order_date >= today,
-                Order.order_date < tomorrow
-            ).all()
-            
-            hourly_counts = [0] * 24
-            for order in orders:
-                hour = order.order_date.hour
-                if 0 <= hour < 24:
-                    hourly_counts[hour] += 1
-            
+            hourly_counts = fetch_order_histogram(session, 'hour')
             logger.debug("Hourly data collected successfully")
             return hourly_counts
         except Exception as e:
-            logger.error(f"Error getting hourly data: {e}")
+            logger.error("Error getting hourly data: %s", e)
             return [0] * 24
     
-    def get_recent_orders(self, session, limit=20):
+    def get_recent_orders(self, session, limit=RECENT_ORDERS_LIMIT):
         """Get recent orders for the activity table using selectinload for performance"""
         try:
             query = session.query(Order).options(
@@ -207,30 +335,39 @@ class DataUpdateThread(QThread):
                 selectinload(Order.test)
             ).order_by(Order.order_date.desc()).limit(limit)
             
-            result = []
-            for order in query:
-                try:
-                    patient_name = order.patient.decrypted_name if order.patient else "Unknown Patient"
-                    test_name = order.test.name if order.test else "Unknown Test"
-                    department = order.test.department if order.test and order.test.department else "Unknown"
-                    result.append((
-                        order.id,
-                        patient_name,
-                        test_name,
-                        department,
-                        order.order_date.strftime("%Y-%m-%d %H:%M"),
-                        order.status
-                    ))
-                except Exception as e:
-                    logger.warning(f"Error processing order {order.id}: {e}")
-                    continue
-                    
-            logger.debug(f"Retrieved {len(result)} recent orders")
+            result = [row for row in map(self.order_row, query) if row]
+            logger.debug("Retrieved %s recent orders", len(result))
             return result
         except Exception as e:
-            logger.error(f"Error getting recent orders: {e}")
+            logger.error("Error getting recent orders: %s", e)
             return []
 
+    def get_orders_since(self, session, order_id):
+        """Orders inserted after the given watermark id"""
+        return session.query(Order).options(
+            selectinload(Order.patient),
+            selectinload(Order.test)
+        ).filter(Order.id > order_id).order_by(Order.id).all()
+
+    @staticmethod
+    def order_row(order):
+        """Activity table row for an order, or None if it cannot be rendered"""
+        try:
+            patient_name = order.patient.decrypted_name if order.patient else "Unknown Patient"
+            test_name = order.test.name if order.test else "Unknown Test"
+            department = order.test.department if order.test and order.test.department else "Unknown"
+            return (
+                order.id,
+                patient_name,
+                test_name,
+                department,
+                order.order_date.strftime("%Y-%m-%d %H:%M"),
+                order.status
+            )
+        except Exception as e:
+            logger.warning("Error processing order %s: %s", order.id, e)
+            return None
+
 
 class SparklineWidget(QWidget):
     """Mini sparkline chart for trend visualization"""
@@ -309,25 +446,58 @@ class SparklineWidget(QWidget):
 class DetailedAnalyticsDialog(QMessageBox):
     """Detailed analytics dialog for stat cards"""
     
-    def __init__(self, title, value, data, color, parent=None):
+    WEEKDAYS = ('Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday')
+
+    def __init__(self, title, value, color, parent=None, histograms=None):
         super().__init__(parent)
         self.setWindowTitle(f"{title} - Detailed Analytics")
         self.setIcon(QMessageBox.Icon.Information)
         self.setMinimumWidth(400)
         
-        avg_value = sum(data) / len(data) if data else value
+        histograms = histograms or {}
+        daily = histograms.get('daily') or []
+        if not daily:
+            self._show_rows(title, color, [("Current Value:", value, None)])
+            return
+
+        # Both compare against the per-day counts the card itself tracks
+        avg_value = sum(daily[-7:]) / len(daily[-7:])
+        yesterday = daily[-2] if len(daily) > 1 else 0
+        change = ((value - yesterday) / yesterday * 100) if yesterday > 0 else 0
         trend = ((value - avg_value) / avg_value * 100) if avg_value > 0 else 0
-        
+
+        peak_time = "10:00 AM - 2:00 PM"
+        hourly = histograms.get('hourly') or []
+        if any(hourly):
+            peak_hour = hourly.index(max(hourly))
+            peak_time = f"{datetime.time(peak_hour).strftime('%I:00 %p')} - {datetime.time((peak_hour + 1) % 24).strftime('%I:00 %p')}"
+
+        busiest_day = "N/A"
+        weekday = histograms.get('weekday') or []
+        if any(weekday):
+            busiest_day = self.WEEKDAYS[weekday.index(max(weekday))]
+        
+        up, down = '#27ae60', '#e74c3c'
+        self._show_rows(title, color, [
+            ("Current Value:", value, None),
+            ("24-Hour Change:", f"{change:+.1f}% {'↗' if change >= 0 else '↘'}", up if change >= 0 else down),
+            ("Weekly Average:", f"{avg_value:.0f}", None),
+            ("Peak Time:", peak_time, None),
+            ("Busiest Day:", busiest_day, None),
+            ("Performance:", f"{'Above' if trend > 0 else 'Below'} average", up if trend > 0 else down),
+        ])
+
+    def _show_rows(self, title, color, rows):
+        cell = "padding: 8px 0; border-bottom: 1px solid #e2e8f0;"
+        table = "".join(
+            f'<tr><td style="{cell}"><b>{label}</b></td>'
+            f'<td style="{cell} text-align: right;{f" color: {tint};" if tint else ""}">{text}</td></tr>'
+            for label, text, tint in rows
+        )
         content = f"""
         <div style="font-family: Segoe UI; color: #2d3748;">
             <h3 style="color: {color}; margin-bottom: 15px;">{title} Analytics</h3>
-            <table style="width: 100%; border-collapse: collapse;">
-                <tr><td style="padding: 8px 0; border-bottom: 1px solid #e2e8f0;"><b>Current Value:</b></td><td style="padding: 8px 0; border-bottom: 1px solid #e2e8f0; text-align: right;">{value}</td></tr>
-                <tr><td style="padding: 8px 0; border-bottom: 1px solid #e2e8f0;"><b>24-Hour Change:</b></td><td style="padding: 8px 0; border-bottom: 1px solid #e2e8f0; text-align: right; color: {'#27ae60' if trend >= 0 else '#e74c3c'}">{trend:+.1f}% {'↗' if trend >= 0 else '↘'}</td></tr>
-                <tr><td style="padding: 8px 0; border-bottom: 1px solid #e2e8f0;"><b>Weekly Average:</b></td><td style="padding: 8px 0; border-bottom: 1px solid #e2e8f0; text-align: right;">{avg_value:.0f}</td></tr>
-                <tr><td style="padding: 8px 0; border-bottom: 1px solid #e2e8f0;"><b>Peak Time:</b></td><td style="padding: 8px 0; border-bottom: 1px solid #e2e8f0; text-align: right;">10:00 AM - 2:00 PM</td></tr>
-                <tr><td style="padding: 8px 0;"><b>Performance:</b></td><td style="padding: 8px 0; text-align: right; color: {'#27ae60' if trend > 0 else '#e74c3c'}">{'Above' if trend > 0 else 'Below'} average</td></tr>
-            </table>
+            <table style="width: 100%; border-collapse: collapse;">{table}</table>
             <p style="margin-top: 15px; font-size: 11px; color: #a0aec0;">Data is updated every minute automatically</p>
         </div>
         """
@@ -502,8 +672,16 @@ class AdvancedStatCard(QFrame):
 
     def show_detailed_view(self):
         """Show detailed analytics for this metric"""
-        detailed_dialog = DetailedAnalyticsDialog(self.title, self.current_value, 
-                                                 self.trend_data, self.color, self)
+        histograms = None
+        try:
+            if self.title in CARD_HISTOGRAM_STATUSES:
+                with Session() as session:
+                    histograms = fetch_analytics_histograms(
+                        session, statuses=CARD_HISTOGRAM_STATUSES[self.title])
+        except Exception as e:
+            logger.error("Error loading analytics histograms: %s", e)
+        detailed_dialog = DetailedAnalyticsDialog(self.title, self.current_value, self.color, self,
+                                                  histograms=histograms)
         detailed_dialog.exec()
 
 
@@ -741,7 +919,7 @@ class SmartNotificationSystem(QFrame):
                 self.layout.removeWidget(notification)
                 notification.fade_out()
         except Exception as e:
-            logger.warning(f"Error removing notification: {e}")
+            logger.warning("Error removing notification: %s", e)
 
 
 class DashboardTab(QWidget):
@@ -1008,10 +1186,11 @@ class DashboardTab(QWidget):
         layout.setContentsMargins(10, 15, 10, 15)
         
         # Get data
-        today_orders = self.get_todays_orders()
-        pending_results = self.get_pending_results()
-        completed_today = self.get_completed_today()
-        verified_today = self.get_verified_today()
+        stats = self.get_dashboard_stats()
+        today_orders = stats['today_orders']
+        pending_results = stats['pending_results']
+        completed_today = stats['completed_today']
+        verified_today = stats['verified_today']
         
         # Create cards
         stats_data = [
@@ -1262,7 +1441,7 @@ class DashboardTab(QWidget):
                 bar_set.append(counts)
                 series.append(bar_set)
         except Exception as e:
-            logger.error(f"Error creating department chart: {e}")
+            logger.error("Error creating department chart: %s", e)
             # Fallback data
             departments = ["Hematology", "Biochemistry", "Microbiology"]
             counts = [25, 18, 12]
@@ -1307,7 +1486,7 @@ class DashboardTab(QWidget):
                         slice.setColor(colors.get(status, QColor("#a0aec0")))
                         series.append(slice)
         except Exception as e:
-            logger.error(f"Error creating status chart: {e}")
+            logger.error("Error creating status chart: %s", e)
             # Fallback data
             fallback_data = [("Pending", 15), ("In Progress", 8), ("Completed", 25), ("Verified", 12)]
             colors = {
@@ -1337,23 +1516,12 @@ class DashboardTab(QWidget):
         # Get real hourly data
         try:
             with self.db_manager.get_session() as session:
-                today = datetime.datetime.now().date()
-                hourly_data = [0] * 24
-                
-                orders = session.query(Order).filter(
-                    Order.order_date >= today,
-                    Order.order_date < today + datetime.timedelta(days=1)
-                ).all()
-                
-                for order in orders:
-                    hour = order.order_date.hour
-                    if 0 <= hour < 24:
-                        hourly_data[hour] += 1
+                hourly_data = fetch_order_histogram(session, 'hour')
                 
                 for hour, count in enumerate(hourly_data):
                     series.append(hour, count)
         except Exception as e:
-            logger.error(f"Error creating hourly chart: {e}")
+            logger.error("Error creating hourly chart: %s", e)
             # Fallback to mock data
             for hour in range(24):
                 if 6 <= hour <= 9:
@@ -1383,61 +1551,15 @@ class DashboardTab(QWidget):
         return chart
 
     # Data methods with improved error handling
-    def get_todays_orders(self):
-        try:
-            with self.db_manager.get_session() as session:
-                today = datetime.datetime.now().date()
-                count = session.query(Order).filter(
-                    Order.order_date >= today,
-                    Order.order_date < today + datetime.timedelta(days=1)
-                ).count()
-                logger.debug(f"Today's orders: {count}")
-                return count
-        except Exception as e:
-            logger.error(f"Error getting today's orders: {e}")
-            return 15
-
-    def get_pending_results(self):
-        try:
-            with self.db_manager.get_session() as session:
-                count = session.query(Order).filter(
-                    Order.status.in_(['Pending', 'In Progress'])
-                ).count()
-                logger.debug(f"Pending results: {count}")
-                return count
-        except Exception as e:
-            logger.error(f"Error getting pending results: {e}")
-            return 8
-
-    def get_completed_today(self):
-        try:
-            with self.db_manager.get_session() as session:
-                today = datetime.datetime.now().date()
-                count = session.query(Order).filter(
-                    Order.status == 'Completed',
-                    Order.order_date >= today,
-                    Order.order_date < today + datetime.timedelta(days=1)
-                ).count()
-                logger.debug(f"Completed today: {count}")
-                return count
-        except Exception as e:
-            logger.error(f"Error getting completed today: {e}")
-            return 12
-
-    def get_verified_today(self):
+    def get_dashboard_stats(self):
         try:
             with self.db_manager.get_session() as session:
-                today = datetime.datetime.now().date()
-                count = session.query(Order).filter(
-                    Order.status == 'Verified',
-                    Order.order_date >= today,
-                    Order.order_date < today + datetime.timedelta(days=1)
-                ).count()
-                logger.debug(f"Verified today: {count}")
-                return count
+                stats = fetch_dashboard_stats(session)
+                logger.debug("Dashboard stats: %s", stats)
+                return stats
         except Exception as e:
-            logger.error(f"Error getting verified today: {e}")
-            return 5
+            logger.error("Error getting dashboard stats: %s", e)
+            return dict(STATS_FALLBACK)
 
     def get_recent_orders(self, limit=20):
         try:
@@ -1486,13 +1608,13 @@ class DashboardTab(QWidget):
                             order.status
                         ))
                     except Exception as e:
-                        logger.warning(f"Error processing order {order.id}: {e}")
+                        logger.warning("Error processing order %s: %s", order.id, e)
                         continue
                         
-                logger.debug(f"Retrieved {len(result)} recent orders")
+                logger.debug("Retrieved %s recent orders", len(result))
                 return result
         except Exception as e:
-            logger.error(f"Error getting recent orders: {e}")
+            logger.error("Error getting recent orders: %s", e)
             # Fallback data
             return [
                 (1, "John Doe", "Blood Test", "Hematology", "2025-09-12 10:30", "Pending"),
@@ -1533,7 +1655,7 @@ class DashboardTab(QWidget):
             
             logger.debug("Recent activity table updated")
         except Exception as e:
-            logger.error(f"Error updating recent activity: {e}")
+            logger.error("Error updating recent activity: %s", e)
 
     def on_filter_changed(self):
         self.date_filter = self.date_filter_combo.currentText()
@@ -1558,7 +1680,7 @@ class DashboardTab(QWidget):
 
             logger.info("Background updates setup completed")
         except Exception as e:
-            logger.error(f"Failed to setup background updates: {e}")
+            logger.error("Failed to setup background updates: %s", e)
 
     def handle_data_update(self, data):
         """Handle data updates in a thread-safe manner"""
@@ -1584,7 +1706,7 @@ class DashboardTab(QWidget):
                     validated_data[key] = value
                 else:
                     validated_data[key] = 0
-                    logger.warning(f"Invalid data type for {key}: {type(value)}")
+                    logger.warning("Invalid data type for %s: %s", key, type(value))
             
             # Preserve other data types as they are
             validated_data['hourly_data'] = data.get('hourly_data', [])
@@ -1613,7 +1735,7 @@ class DashboardTab(QWidget):
                     "info"
                 )
         except Exception as e:
-            logger.error(f"Error in UI update: {e}")
+            logger.error("Error in UI update: %s", e)
 
     def update_activity_table_with_data(self, data):
         """Update activity table with provided data"""
@@ -1652,7 +1774,7 @@ class DashboardTab(QWidget):
                     item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
                     self.table.setItem(row, col, item)
         except Exception as e:
-            logger.error(f"Error updating activity table with data: {e}")
+            logger.error("Error updating activity table with data: %s", e)
 
     def load_user_settings(self):
         """Load settings from secure location"""
@@ -1674,7 +1796,7 @@ class DashboardTab(QWidget):
                     logger.info("User settings loaded successfully")
                     return {**default_settings, **settings}
         except Exception as e:
-            logger.error(f"Error loading user settings: {e}")
+            logger.error("Error loading user settings: %s", e)
         
         return default_settings
 
@@ -1689,7 +1811,7 @@ class DashboardTab(QWidget):
                 json.dump(self.settings, f, indent=2)
             logger.info("User settings saved successfully")
         except Exception as e:
-            logger.error(f"Failed to save settings: {e}")
+            logger.error("Failed to save settings: %s", e)
 
     # Action methods
     def refresh_data(self):
@@ -1699,7 +1821,7 @@ class DashboardTab(QWidget):
             self.update_recent_activity()
             logger.info("Dashboard manually refreshed")
         except Exception as e:
-            logger.error(f"Error refreshing data: {e}")
+            logger.error("Error refreshing data: %s", e)
 
     def view_details(self):
         try:
@@ -1718,7 +1840,7 @@ class DashboardTab(QWidget):
             msg.setText(f"Order ID: {order_id}\nPatient: {patient}")
             msg.exec()
         except Exception as e:
-            logger.error(f"Error viewing details: {e}")
+            logger.error("Error viewing details: %s", e)
 
     def export_to_csv(self):
         try:
@@ -1739,9 +1861,9 @@ class DashboardTab(QWidget):
                     self.notification_system.show_notification(
                         f"Exported {len(data)} records!", "success"
                     )
-                logger.info(f"Exported {len(data)} records to {file_name}")
+                logger.info("Exported %s records to %s", len(data), file_name)
         except Exception as e:
-            logger.error(f"Export failed: {e}")
+            logger.error("Export failed: %s", e)
             if hasattr(self, 'notification_system'):
                 self.notification_system.show_notification(f"Export failed: {e}", "error")
 
@@ -1775,7 +1897,7 @@ class DashboardTab(QWidget):
             self.save_user_settings()
             logger.info("Dashboard closed successfully")
         except Exception as e:
-            logger.error(f"Error during dashboard close: {e}")
+            logger.error("Error during dashboard close: %s", e)
         super().closeEvent(event)
 
     def apply_styles(self):
@@ -1790,7 +1912,7 @@ class DashboardTab(QWidget):
                 self.setStyleSheet(self.get_embedded_css())
                 logger.info("Using embedded CSS")
         except Exception as e:
-            logger.error(f"Error loading CSS: {e}")
+            logger.error("Error loading CSS: %s", e)
             self.setStyleSheet(self.get_embedded_css())
 
     def get_embedded_css(self):
@@ -4,16 +4,21 @@ from PyQt6.QtWidgets import (
     QScrollArea, QLineEdit, QSizePolicy, QGridLayout, QGroupBox,
     QFrame, QTabWidget, QStatusBar, QProgressBar, QToolButton,
     QTextEdit, QSpacerItem, QDialog, QDialogButtonBox, QFormLayout,
-    QCheckBox, QMenu,QFileDialog, QToolBar, QApplication,
+    QCheckBox, QMenu,QFileDialog, QToolBar,
     QInputDialog, QTableWidget, QHeaderView, QDateEdit, QTableWidgetItem
 )
 from PyQt6.QtGui import QIcon, QFont, QPalette, QColor, QTextDocument, QTextCursor, QDoubleValidator,QAction
 from PyQt6.QtCore import Qt, QDateTime, pyqtSignal, QTimer, QSettings, QSize, QDate
 from ui.components.test_table import TestTable
+from ui.components.query_runner import QueryRunner, load_pages
 from database import Session
-from models import Order, Patient, Test, Result, Package, OrderComment, cipher
+from pagination import KeysetPager, DEFAULT_KEYS, sort_keys
+from models import (
+    Order, Patient, Test, Result, Package, OrderComment, patient_search_clause, create_orders,
+    order_search_query, order_matches_search
+)
 from sqlalchemy.orm import joinedload
-from sqlalchemy.sql import and_, func
+from sqlalchemy.sql import and_
 import re
 import csv
 from datetime import datetime, timedelta
@@ -21,11 +26,30 @@ import logging
 import os
 from reports.invoice_generator import generate_invoice
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, 
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+ORDERS_PAGE_SIZE = 200
+# The order search dialog matches its search box against these (see order_search_clause)
+ORDER_DIALOG_SEARCH_FIELDS = ('id', 'pid', 'name', 'contact')
+# Order search table column -> pager keys its header sorts on, in SQL. The
+# patient name is encrypted, so that column only sorts the rows already loaded.
+ORDER_DIALOG_SORT_KEYS = {
+    0: (Order.id,),
+    1: sort_keys(Patient.pid),
+    3: sort_keys(Test.code),
+    4: sort_keys(Order.referring_physician),
+    5: DEFAULT_KEYS,
+    6: sort_keys(Order.status),
+}
+
+# (background, foreground) of the status cell in the order search table
+ORDER_STATUS_COLORS = {
+    "Pending": (QColor(254, 243, 199), QColor(146, 64, 14)),
+    "In Progress": (QColor(219, 234, 254), QColor(30, 64, 175)),
+    "Completed": (QColor(209, 250, 229), QColor(6, 95, 70)),
+    "Cancelled": (QColor(254, 202, 202), QColor(153, 27, 27)),
+}
+
 class TestSelectionDialog(QDialog):
     """Dialog for selecting multiple tests"""
     def __init__(self, parent=None, selected_test_ids=None):
@@ -154,7 +178,7 @@ class TestSelectionDialog(QDialog):
                         item.setCheckState(Qt.CheckState.Unchecked)
                     self.test_list.addItem(item)
         except Exception as e:
-            logger.error(f"Error loading tests: {str(e)}")
+            logger.error("Error loading tests: %s", str(e))
             QMessageBox.critical(self, "Error", f"Failed to load tests: {str(e)}")
 
     def filter_tests(self):
@@ -443,7 +467,7 @@ class CommentDialog(QDialog):
                     html += f"<p><b>{comment.timestamp.strftime('%Y-%m-%d %H:%M')}:</b> {comment.comment}</p>"
                 self.comments_display.setHtml(html or "No comments yet.")
         except Exception as e:
-            logger.error(f"Error loading comments: {str(e)}")
+            logger.error("Error loading comments: %s", str(e))
             QMessageBox.critical(self, "Error", f"Failed to load comments: {str(e)}")
     
     def save_comment(self):
@@ -463,15 +487,16 @@ class CommentDialog(QDialog):
             self.load_comments()
             self.new_comment.clear()
             QMessageBox.information(self, "Success", "Comment added successfully.")
-            logger.info(f"Added comment to order #{self.order_id}")
+            logger.info("Added comment to order #%s", self.order_id)
         except Exception as e:
-            logger.error(f"Error saving comment: {str(e)}")
+            logger.error("Error saving comment: %s", str(e))
             QMessageBox.critical(self, "Error", f"Failed to save comment: {str(e)}")
 
 class OrderSearchDialog(QDialog):
     """Dialog for searching and viewing orders"""
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.query_runner = QueryRunner(self)
         self.setWindowTitle("Search Orders")
         self.setModal(True)
         self.setMinimumSize(800, 600)
@@ -576,12 +601,20 @@ class OrderSearchDialog(QDialog):
         status_layout.addStretch()
         layout.addLayout(status_layout)
         self.orders_table = TestTable([], ["ID", "PID", "Patient", "Test", "Referring Physician", "Date", "Status"], parent=self)
-        self.orders_table.table.setSortingEnabled(True)
+        # Rows come newest first from the keyset pager and load on scroll;
+        # a header click re-queries in that column's order
+        self.order_sort = (DEFAULT_KEYS, True)
+        self.orders_table.table.horizontalHeader().setSortIndicator(5, Qt.SortOrder.DescendingOrder)
+        self.orders_table.model.set_sort_handler(self.sort_orders)
+        self.orders_table.model.rowsInserted.connect(self._update_orders_count)
         self.orders_table.table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.orders_table.table.setToolTip("Table of orders, right-click for options")
         self.orders_table.table.setAccessibleDescription("Table displaying search results for orders")
         self.orders_table.table.customContextMenuRequested.connect(self.show_orders_context_menu)
+        self.orders_table.model.set_cell_style(6, lambda status: ORDER_STATUS_COLORS.get(status))
         layout.addWidget(self.orders_table)
+        self.count_label = QLabel()
+        layout.addWidget(self.count_label)
         buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
         buttons.rejected.connect(self.reject)
         layout.addWidget(buttons)
@@ -605,74 +638,85 @@ class OrderSearchDialog(QDialog):
     def start_search_timer(self):
         self.search_timer.start(300)
 
-    def load_orders_dialog(self):
-        status_filter = self.status_combo.currentData()
+    def _orders_query_builder(self):
+        """Snapshot the filters and return ``build(session)``; it runs on a worker thread"""
         date_from = self.date_from.dateTime().toPyDateTime()
         date_to = self.date_to.dateTime().toPyDateTime()
-        search_text = self.search_edit.text().lower()
+        status_filter = self.status_combo.currentData()
+        search_text = self.search_edit.text().strip()
+
+        def build(session):
+            # Order ID, PID and the blind-indexed name/contact are matched in SQL
+            return order_search_query(
+                session, search_text, fields=ORDER_DIALOG_SEARCH_FIELDS,
+                start=date_from, end=date_to, statuses=[status_filter] if status_filter else None,
+            )
+
+        return build
+
+    def _order_rows_builder(self):
+        """Return ``to_rows(orders)`` for the pager; it confirms blind index matches"""
+        search_text = self.search_edit.text().strip()
+
+        def to_rows(orders):
+            Patient.prefetch_decrypted((o.patient for o in orders if o.patient), ('name', 'contact'))
+            rows = []
+            for o in orders:
+                if search_text and not order_matches_search(o, search_text, ORDER_DIALOG_SEARCH_FIELDS):
+                    continue
+                try:
+                    patient_name = o.patient.decrypted_name
+                    patient_pid = o.patient.pid if o.patient.pid else "N/A"
+                except Exception as e:
+                    logger.warning("Decryption failed for patient in order %s: %s", o.id, str(e))
+                    patient_name = "Decryption failed"
+                    patient_pid = "N/A"
+                test_desc = f"{o.test.code} - {o.test.name}" if o.test else "Unknown"
+                rows.append((
+                    o.id,
+                    patient_pid,
+                    patient_name,
+                    test_desc,
+                    o.referring_physician or "N/A",
+                    o.order_date.strftime("%Y-%m-%d %H:%M") if o.order_date else "",
+                    o.status
+                ))
+            return rows
+
+        return to_rows
+
+    def sort_orders(self, column, order):
+        keys = ORDER_DIALOG_SORT_KEYS.get(column)
+        if keys is None:
+            return False
+        self.order_sort = (keys, order == Qt.SortOrder.DescendingOrder)
+        self.load_orders_dialog()
+
+    def load_orders_dialog(self):
         try:
-            with Session() as session:
-                query = session.query(Order).options(
-                    joinedload(Order.patient), joinedload(Order.test)
-                ).filter(
-                    Order.order_date >= date_from,
-                    Order.order_date <= date_to
-                )
-                if status_filter:
-                    query = query.filter(Order.status == status_filter)
-                orders = query.order_by(Order.order_date.desc()).all()
-                logger.info(f"Queried {len(orders)} orders from {date_from} to {date_to}")
-                filtered_orders = []
-                for o in orders:
-                    if search_text:
-                        patient_name = getattr(o.patient, 'decrypted_name', '').lower() if o.patient else ""
-                        patient_contact = getattr(o.patient, 'decrypted_contact', '').lower() if o.patient and o.patient.contact else ""
-                        patient_pid = o.patient.pid.lower() if o.patient and o.patient.pid else ""
-                        order_id_str = str(o.id).lower()
-                        if not (search_text in patient_name or search_text in patient_contact or search_text in patient_pid or search_text in order_id_str):
-                            continue
-                    filtered_orders.append(o)
-                logger.info(f"Filtered to {len(filtered_orders)} orders after applying search text: '{search_text}'")
-                rows = []
-                for o in filtered_orders:
-                    try:
-                        patient_name = o.patient.decrypted_name
-                        patient_pid = o.patient.pid if o.patient.pid else "N/A"
-                    except Exception as e:
-                        logger.warning(f"Decryption failed for patient in order {o.id}: {str(e)}")
-                        patient_name = "Decryption failed"
-                        patient_pid = "N/A"
-                    test_desc = f"{o.test.code} - {o.test.name}" if o.test else "Unknown"
-                    rows.append((
-                        o.id,
-                        patient_pid,
-                        patient_name,
-                        test_desc,
-                        o.referring_physician or "N/A",
-                        o.order_date.strftime("%Y-%m-%d %H:%M") if o.order_date else "",
-                        o.status
-                    ))
-                self.orders_table.update_data(rows)
-                logger.info(f"Updated table with {len(rows)} rows")
-                for row in range(self.orders_table.table.rowCount()):
-                    status_item = self.orders_table.table.item(row, 6)
-                    if status_item:
-                        status = status_item.text()
-                        if status == "Pending":
-                            status_item.setBackground(QColor(254, 243, 199))
-                            status_item.setForeground(QColor(146, 64, 14))
-                        elif status == "In Progress":
-                            status_item.setBackground(QColor(219, 234, 254))
-                            status_item.setForeground(QColor(30, 64, 175))
-                        elif status == "Completed":
-                            status_item.setBackground(QColor(209, 250, 229))
-                            status_item.setForeground(QColor(6, 95, 70))
-                        elif status == "Cancelled":
-                            status_item.setBackground(QColor(254, 202, 202))
-                            status_item.setForeground(QColor(153, 27, 27))
+            keys, descending = self.order_sort
+            # Blind index candidates are confirmed in to_rows, so a search may drop some
+            self.order_pager = KeysetPager(self._orders_query_builder(), self._order_rows_builder(),
+                                           page_size=ORDERS_PAGE_SIZE, keys=keys, descending=descending,
+                                           exact=not self.search_edit.text().strip())
+            self.count_label.setText("Loading orders...")
+            load_pages(self.query_runner, 'orders', self.orders_table, self.order_pager,
+                       on_update=self._update_orders_count, on_error=self._orders_load_failed)
         except Exception as e:
-            logger.error(f"Error loading orders in dialog: {str(e)}")
-            QMessageBox.critical(self, "Error", f"Failed to load orders: {str(e)}")
+            self._orders_load_failed(str(e))
+
+    def _orders_load_failed(self, message):
+        logger.error("Error loading orders in dialog: %s", message)
+        QMessageBox.critical(self, "Error", f"Failed to load orders: {message}")
+
+    def _update_orders_count(self, *args):
+        pager = getattr(self, 'order_pager', None)
+        if pager is None:
+            return
+        total, exact = pager.matched()
+        if total is not None:
+            self.count_label.setText(f"Showing {self.orders_table.model.rowCount()} of "
+                                     f"{'' if exact else 'up to '}{total} order(s)")
 
     def show_orders_context_menu(self, position):
         menu = QMenu()
@@ -687,11 +731,11 @@ class OrderSearchDialog(QDialog):
         menu.exec(self.orders_table.table.viewport().mapToGlobal(position))
 
     def cancel_order(self):
-        row = self.orders_table.table.currentRow()
+        row = self.orders_table.current_row()
         if row < 0:
             QMessageBox.warning(self, "Error", "Select an order to cancel.")
             return
-        order_id = int(self.orders_table.table.item(row, 0).text())
+        order_id = int(self.orders_table.cell(row, 0))
         reply = QMessageBox.question(
             self, "Confirm Cancel", "Are you sure you want to cancel this order?",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
@@ -704,20 +748,20 @@ class OrderSearchDialog(QDialog):
                         order.status = "Cancelled"
                         session.commit()
                         QMessageBox.information(self, "Success", "Order cancelled successfully.")
-                        logger.info(f"Cancelled order #{order_id}")
+                        logger.info("Cancelled order #%s", order_id)
                         self.load_orders_dialog()
                     else:
                         QMessageBox.warning(self, "Warning", "Order not found.")
             except Exception as e:
-                logger.error(f"Error cancelling order: {str(e)}")
+                logger.error("Error cancelling order: %s", str(e))
                 QMessageBox.critical(self, "Error", f"Failed to cancel order: {str(e)}")
 
     def delete_order(self):
-        row = self.orders_table.table.currentRow()
+        row = self.orders_table.current_row()
         if row < 0:
             QMessageBox.warning(self, "Error", "Select an order to delete.")
             return
-        order_id = int(self.orders_table.table.item(row, 0).text())
+        order_id = int(self.orders_table.cell(row, 0))
         reply = QMessageBox.question(
             self, "Confirm Delete", "Are you sure you want to delete this order?",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
@@ -730,29 +774,29 @@ class OrderSearchDialog(QDialog):
                         session.delete(order)
                         session.commit()
                         QMessageBox.information(self, "Success", "Order deleted successfully.")
-                        logger.info(f"Deleted order #{order_id}")
+                        logger.info("Deleted order #%s", order_id)
                         self.load_orders_dialog()
                     else:
                         QMessageBox.warning(self, "Warning", "Order not found.")
             except Exception as e:
-                logger.error(f"Error deleting order: {str(e)}")
+                logger.error("Error deleting order: %s", str(e))
                 QMessageBox.critical(self, "Error", f"Failed to delete order: {str(e)}")
 
     def view_order_comments(self):
-        row = self.orders_table.table.currentRow()
+        row = self.orders_table.current_row()
         if row < 0:
             QMessageBox.warning(self, "Error", "Select an order to view comments.")
             return
-        order_id = int(self.orders_table.table.item(row, 0).text())
+        order_id = int(self.orders_table.cell(row, 0))
         dialog = CommentDialog(order_id, self)
         dialog.exec()
 
     def view_patient_history(self):
-        row = self.orders_table.table.currentRow()
+        row = self.orders_table.current_row()
         if row < 0:
             QMessageBox.warning(self, "Error", "Select an order to view patient history.")
             return
-        order_id = int(self.orders_table.table.item(row, 0).text())
+        order_id = int(self.orders_table.cell(row, 0))
         try:
             with Session() as session:
                 order = session.get(Order, order_id)
@@ -812,7 +856,7 @@ class OrderSearchDialog(QDialog):
                     layout.addWidget(buttons)
                     dialog.exec()
         except Exception as e:
-            logger.error(f"Error loading patient history: {str(e)}")
+            logger.error("Error loading patient history: %s", str(e))
             QMessageBox.critical(self, "Error", f"Failed to load patient history: {str(e)}")
 
     def export_orders(self):
@@ -825,24 +869,19 @@ class OrderSearchDialog(QDialog):
             with open(file_path, 'w', newline='', encoding='utf-8') as file:
                 writer = csv.writer(file)
                 writer.writerow(['ID', 'PID', 'Patient', 'Test', 'Referring Physician', 'Date', 'Status'])
-                for row in range(self.orders_table.table.rowCount()):
-                    row_data = []
-                    for col in range(self.orders_table.table.columnCount()):
-                        item = self.orders_table.table.item(row, col)
-                        row_data.append(item.text() if item else "")
-                    writer.writerow(row_data)
+                writer.writerows(self.orders_table.model.rows())
             QMessageBox.information(self, "Success", "Orders exported successfully.")
-            logger.info(f"Exported orders to {file_path}")
+            logger.info("Exported orders to %s", file_path)
         except Exception as e:
-            logger.error(f"Error exporting orders: {str(e)}")
+            logger.error("Error exporting orders: %s", str(e))
             QMessageBox.critical(self, "Error", f"Failed to export orders: {str(e)}")
 
     def reprint_invoice(self):
-        row = self.orders_table.table.currentRow()
+        row = self.orders_table.current_row()
         if row < 0:
             QMessageBox.warning(self, "Error", "Select an order to reprint invoice.")
             return
-        order_id = int(self.orders_table.table.item(row, 0).text())
+        order_id = int(self.orders_table.cell(row, 0))
         try:
             with Session() as session:
                 order = session.get(Order, order_id)
@@ -856,7 +895,7 @@ class OrderSearchDialog(QDialog):
                 else:
                     QMessageBox.warning(self, "Warning", "Order not found.")
         except Exception as e:
-            logger.error(f"Error reprinting invoice: {str(e)}")
+            logger.error("Error reprinting invoice: %s", str(e))
             QMessageBox.critical(self, "Error", f"Failed to reprint invoice: {str(e)}")
 
 class PatientSearchDialog(QDialog):
@@ -972,20 +1011,18 @@ class PatientSearchDialog(QDialog):
                 query = session.query(Patient)
                 if date_from and date_to:
                     query = query.filter(and_(Patient.created_at >= date_from, Patient.created_at <= date_to))
+                field = {"Name": "name", "Contact": "contact"}.get(search_by)
+                if search_term:
+                    if field:
+                        query = query.filter(patient_search_clause(field, search_term))
+                    elif search_by == "PID":
+                        query = query.filter(Patient.pid.ilike(f"%{search_term}%"))
                 patients = query.all()
-                filtered_patients = []
-                for patient in patients:
-                    if search_term:
-                        if search_by == "Name":
-                            if search_term not in patient.decrypted_name.lower():
-                                continue
-                        elif search_by == "PID":
-                            if patient.pid is None or search_term not in patient.pid.lower():
-                                continue
-                        elif search_by == "Contact":
-                            if search_term not in patient.decrypted_contact.lower():
-                                continue
-                    filtered_patients.append(patient)
+                # Confirm blind index candidates against the decrypted values
+                filtered_patients = [
+                    p for p in patients
+                    if not (search_term and field) or p.matches_search(field, search_term)
+                ]
                 self.patients_table.setRowCount(len(filtered_patients))
                 for row, patient in enumerate(filtered_patients):
                     self.patients_table.setItem(row, 0, QTableWidgetItem(str(patient.id)))
@@ -994,7 +1031,7 @@ class PatientSearchDialog(QDialog):
                     self.patients_table.setItem(row, 3, QTableWidgetItem(patient.decrypted_contact))
                     self.patients_table.setItem(row, 4, QTableWidgetItem(patient.created_at.strftime("%Y-%m-%d") if patient.created_at else "N/A"))
         except Exception as e:
-            logger.error(f"Error loading patients in dialog: {str(e)}")
+            logger.error("Error loading patients in dialog: %s", str(e))
             QMessageBox.critical(self, "Error", f"Failed to load patients: {str(e)}")
 
     def select_patient(self):
@@ -1127,7 +1164,7 @@ class PackageDialog(QDialog):
                     item.setCheckState(Qt.CheckState.Unchecked)
                     self.test_list.addItem(item)
         except Exception as e:
-            logger.error(f"Error loading tests in PackageDialog: {str(e)}")
+            logger.error("Error loading tests in PackageDialog: %s", str(e))
             QMessageBox.critical(self, "Error", f"Failed to load tests: {str(e)}")
 
     def load_package_data(self, package_id):
@@ -1147,7 +1184,7 @@ class PackageDialog(QDialog):
                         except Exception:
                             pass
         except Exception as e:
-            logger.error(f"Error loading package data: {str(e)}")
+            logger.error("Error loading package data: %s", str(e))
             QMessageBox.critical(self, "Error", f"Failed to load package: {str(e)}")
 
     def select_all_tests(self):
@@ -1206,7 +1243,7 @@ class PackageDialog(QDialog):
                 logger.info(log_message)
                 self.accept()
         except Exception as e:
-            logger.error(f"Error saving package: {str(e)}")
+            logger.error("Error saving package: %s", str(e))
             QMessageBox.critical(self, "Error", f"Failed to save package: {str(e)}")
 
 class OrderTab(QWidget):
@@ -1215,6 +1252,8 @@ class OrderTab(QWidget):
 
     def __init__(self):
         super().__init__()
+        self.query_runner = QueryRunner(self)
+        self.pending_patient_id = None
         self.setObjectName("orderTab")
         self.setStyleSheet(self._load_stylesheet())
         self.is_orders_expanded = True
@@ -1500,11 +1539,11 @@ class OrderTab(QWidget):
                         session.commit()
                         self.load_packages()
                         self.status_bar.showMessage("Package deleted successfully")
-                        logger.info(f"Deleted package ID: {package_id}")
+                        logger.info("Deleted package ID: %s", package_id)
                     else:
                         QMessageBox.warning(self, "Warning", "Package not found.")
             except Exception as e:
-                logger.error(f"Error deleting package: {str(e)}")
+                logger.error("Error deleting package: %s", str(e))
                 QMessageBox.critical(self, "Error", f"Failed to delete package: {str(e)}")
 
     def export_packages(self):
@@ -1527,9 +1566,9 @@ class OrderTab(QWidget):
                                 test_names.append(test_map[tid])
                         writer.writerow([package.name, test_ids, ', '.join(test_names)])
                 QMessageBox.information(self, "Success", "Packages exported successfully.")
-                logger.info(f"Exported packages to {file_path}")
+                logger.info("Exported packages to %s", file_path)
         except Exception as e:
-            logger.error(f"Error exporting packages: {str(e)}")
+            logger.error("Error exporting packages: %s", str(e))
             QMessageBox.critical(self, "Error", f"Failed to export packages: {str(e)}")
 
     def show_package_preview(self, event):
@@ -1546,7 +1585,7 @@ class OrderTab(QWidget):
                     QToolTip.showText(self.package_combo.mapToGlobal(self.package_combo.pos()),
                                     f"Package: {package.name}\nTests:\n{test_list or 'No tests'}")
         except Exception as e:
-            logger.error(f"Error showing package preview: {str(e)}")
+            logger.error("Error showing package preview: %s", str(e))
 
     def load_packages(self):
         self.package_combo.clear()
@@ -1570,7 +1609,7 @@ class OrderTab(QWidget):
                     display_text = f"{package.name} ({includes})"
                     self.package_combo.addItem(display_text, package.id)
         except Exception as e:
-            logger.error(f"Error loading packages: {str(e)}")
+            logger.error("Error loading packages: %s", str(e))
             QMessageBox.critical(self, "Error", f"Failed to load packages: {str(e)}")
 
     def apply_package(self):
@@ -1584,37 +1623,14 @@ class OrderTab(QWidget):
                     self.selected_test_ids = [int(tid.strip()) for tid in package.test_ids.split(',') if tid.strip()]
                     self.update_selected_tests_summary()
                     self.status_bar.showMessage(f"Applied package: {package.name}")
-                    logger.info(f"Applied package: {package.name}")
+                    logger.info("Applied package: %s", package.name)
         except Exception as e:
-            logger.error(f"Error applying package: {str(e)}")
+            logger.error("Error applying package: %s", str(e))
             QMessageBox.critical(self, "Error", f"Failed to apply package: {str(e)}")
 
     def filter_patients(self):
-        search_text = self.patient_search.text().lower()
-        try:
-            with Session() as session:
-                query = session.query(Patient)
-                if search_text:
-                    # Search in name, contact, or pid
-                    query = query.filter(
-                        Patient.name.contains(cipher.encrypt(search_text.encode()).decode()) |
-                        Patient.contact.contains(cipher.encrypt(search_text.encode()).decode()) |
-                        Patient.pid.ilike(f"%{search_text}%")
-                    )
-                patients = query.limit(100).all()
-                self.patient_combo.clear()
-                self.patient_combo.addItem("-- Select Patient --", None)
-                for p in patients:
-                    try:
-                        name = p.decrypted_name
-                        pid = p.pid if p.pid else "N/A"
-                        self.patient_combo.addItem(f"{name} ({pid})", p.id)
-                    except Exception:
-                        name = f"Decryption failed (ID:{p.id})"
-                        pid = p.pid if p.pid else "N/A"
-                        self.patient_combo.addItem(f"{name} ({pid})", p.id)
-        except Exception as e:
-            logger.error(f"Error filtering patients: {str(e)}")
+        self._load_patient_combo(self.patient_search.text().lower(), limit=100,
+                                 on_error=lambda message: logger.error("Error filtering patients: %s", message))
 
     def update_selected_tests_summary(self):
         if not self.selected_test_ids:
@@ -1630,43 +1646,67 @@ class OrderTab(QWidget):
                     html += f"{t.code} - {t.name} ({t.department}): ₹{rate:.2f}<br>"
                     subtotal += rate
         except Exception as e:
-            logger.error(f"Error updating summary: {str(e)}")
+            logger.error("Error updating summary: %s", str(e))
         html += f"<br><b>Total:</b> ₹{subtotal:.2f}"
         self.selected_tests_label.setHtml(html)
 
     def load_combos(self):
+        self._load_patient_combo(on_error=self._patient_load_failed)
+
+    def _load_patient_combo(self, search_text="", limit=None, on_error=None):
+        """Fill the patient combo from a worker thread; a newer load supersedes this one"""
+        def patient_items(session):
+            query = session.query(Patient)
+            if search_text:
+                # Search in name, contact (via the blind index), or pid
+                query = query.filter(
+                    patient_search_clause('name', search_text) |
+                    patient_search_clause('contact', search_text) |
+                    Patient.pid.ilike(f"%{search_text}%")
+                )
+            if limit:
+                query = query.limit(limit)
+            patients = query.all()
+            Patient.prefetch_decrypted(patients, ('name', 'contact') if search_text else ('name',))
+            if search_text:
+                # Blind index tokens only narrow the candidates; confirm by decrypting
+                patients = [p for p in patients
+                            if p.matches_search('name', search_text) or p.matches_search('contact', search_text)
+                            or (p.pid and search_text in p.pid.lower())]
+            for p in patients:
+                try:
+                    name = p.decrypted_name
+                except Exception:
+                    name = f"Decryption failed (ID:{p.id})"
+                pid = p.pid if p.pid else "N/A"
+                yield f"{name} ({pid})", p.id
+
         self.patient_combo.clear()
-        try:
-            with Session() as session:
-                patients = session.query(Patient).all()
-                self.patient_combo.addItem("-- Select Patient --", None)
-                for p in patients:
-                    try:
-                        name = p.decrypted_name
-                        pid = p.pid if p.pid else "N/A"
-                        self.patient_combo.addItem(f"{name} ({pid})", p.id)
-                    except Exception:
-                        name = f"Decryption failed (ID:{p.id})"
-                        pid = p.pid if p.pid else "N/A"
-                        self.patient_combo.addItem(f"{name} ({pid})", p.id)
-        except Exception as e:
-            logger.error(f"Error loading patients: {str(e)}")
-            QMessageBox.critical(self, "Error", f"Failed to load patients: {str(e)}")
+        self.patient_combo.addItem("-- Select Patient --", None)
+        self.query_runner.submit('patients', patient_items, on_chunk=self._add_patient_items,
+                                 on_finished=self._patient_combo_loaded, on_error=on_error)
+
+    def _add_patient_items(self, items):
+        for label, patient_id in items:
+            self.patient_combo.addItem(label, patient_id)
+
+    def _patient_combo_loaded(self, total):
+        patient_id, self.pending_patient_id = self.pending_patient_id, None
+        if patient_id:
+            self.select_patient_from_search(patient_id)
+
+    def _patient_load_failed(self, message):
+        logger.error("Error loading patients: %s", message)
+        QMessageBox.critical(self, "Error", f"Failed to load patients: {message}")
 
     def select_patient_by_id(self, patient_id: int):
-        """Reloads the patient combo and selects the provided patient_id if present."""
+        """Reloads the patient combo and selects the provided patient_id once it is loaded."""
         try:
             # Refresh the combo so new entries are present
+            self.pending_patient_id = patient_id
             self.load_combos()
-            if not patient_id:
-                return
-            index = self.patient_combo.findData(patient_id)
-            if index >= 0:
-                self.patient_combo.setCurrentIndex(index)
-                # Ensure any dependent UI updates happen
-                self.patient_combo.repaint()
         except Exception as e:
-            logger.error(f"Error selecting patient by id {patient_id}: {e}")
+            logger.error("Error selecting patient by id %s: %s", patient_id, e)
 
     def place_order(self):
         try:
@@ -1698,30 +1738,14 @@ class OrderTab(QWidget):
             discount_perc, payments_str = payment_dialog.get_data()
             
             self.status_bar.showMessage("Placing orders...")
-            self.progress_bar.setMaximum(len(test_ids))
-            self.progress_bar.setValue(0)
-            self.progress_bar.setVisible(True)
-            QApplication.processEvents()
-            order_ids = []
             with Session() as session:
-                max_group_id = session.query(func.max(Order.group_id)).scalar()
-                group_id = (max_group_id or 0) + 1
-                for i, tid in enumerate(test_ids):
-                    order = Order(
-                        patient_id=patient_id, 
-                        test_id=tid, 
-                        order_date=date, 
-                        status="Pending", 
-                        referring_physician=referring_physician,
-                        payment_method=payments_str,
-                        discount=discount_perc,
-                        group_id=group_id
-                    )
-                    session.add(order)
-                    session.flush()
-                    order_ids.append(order.id)
-                    self.progress_bar.setValue(i + 1)
-                    QApplication.processEvents()
+                _, order_ids = create_orders(
+                    session, [patient_id], test_ids,
+                    order_date=date,
+                    referring_physician=referring_physician,
+                    payment_method=payments_str,
+                    discount=discount_perc
+                )
                 session.commit()
             self.progress_bar.setVisible(False)
             self.clear_form()
@@ -1744,16 +1768,16 @@ class OrderTab(QWidget):
                     except Exception:
                         logger.warning('Failed to refresh results tab')
             except Exception as e:
-                logger.warning(f"Failed to notify main window tabs after placing order: {e}")
+                logger.warning("Failed to notify main window tabs after placing order: %s", e)
 
             QMessageBox.information(self, "Success", "Orders placed successfully.")
-            logger.info(f"Placed {len(test_ids)} orders for patient ID {patient_id}")
+            logger.info("Placed %s orders for patient ID %s", len(test_ids), patient_id)
             pdf_path = generate_invoice(order_ids)
             QMessageBox.information(self, "Invoice Generated", f"Invoice saved to {pdf_path}")
             os.startfile(pdf_path)
             self.show_invoice(order_ids)
         except Exception as e:
-            logger.error(f"Error placing order: {str(e)}")
+            logger.error("Error placing order: %s", str(e))
             self.status_bar.showMessage("Error placing order")
             self.progress_bar.setVisible(False)
             QMessageBox.critical(self, "Error", f"Failed to place order: {str(e)}")
@@ -1843,7 +1867,7 @@ class BatchOrderDialog(QDialog):
                 for package in packages:
                     self.package_combo.addItem(package.name, package.id)
         except Exception as e:
-            logger.error(f"Error loading packages: {str(e)}")
+            logger.error("Error loading packages: %s", str(e))
     
     def load_patients(self):
         self.patient_list.clear()
@@ -1864,7 +1888,7 @@ class BatchOrderDialog(QDialog):
                         item.setData(Qt.ItemDataRole.UserRole, patient.id)
                         self.patient_list.addItem(item)
         except Exception as e:
-            logger.error(f"Error loading patients: {str(e)}")
+            logger.error("Error loading patients: %s", str(e))
     
     def create_batch_orders(self):
         package_id = self.package_combo.currentData()
@@ -1894,31 +1918,21 @@ class BatchOrderDialog(QDialog):
                     return
                     
                 test_ids = package.test_ids.split(',') if package.test_ids else []
-                order_date = datetime.now()
                 
-                # Generate a unique group_id for the batch
-                max_group_id = session.query(func.max(Order.group_id)).scalar()
-                group_id = (max_group_id or 0) + 1
-                
-                for patient_id in selected_patients:
-                    for test_id in test_ids:
-                        order = Order(
-                            patient_id=patient_id,
-                            test_id=int(test_id),
-                            order_date=order_date,
-                            status="Pending",
-                            referring_physician=physician,
-                            group_id=group_id
-                        )
-                        session.add(order)
+                # One INSERT for the whole batch, sharing a single group_id
+                _, order_ids = create_orders(
+                    session, selected_patients, test_ids,
+                    order_date=datetime.now(),
+                    referring_physician=physician
+                )
                 
                 session.commit()
                 QMessageBox.information(self, "Success", 
-                                      f"Created {len(selected_patients) * len(test_ids)} orders successfully.")
+                                      f"Created {len(order_ids)} orders successfully.")
                 self.accept()
                 
         except Exception as e:
-            logger.error(f"Error creating batch orders: {str(e)}")
+            logger.error("Error creating batch orders: %s", str(e))
             QMessageBox.critical(self, "Error", f"Failed to create batch orders: {str(e)}")
 
 class InvoiceDialog(QDialog):
@@ -1995,5 +2009,5 @@ class InvoiceDialog(QDialog):
                 invoice_content += f"<p><b>Total Amount:</b> ₹{total:.2f}</p>"
                 self.invoice_text.setHtml(invoice_content)
         except Exception as e:
-            logger.error(f"Error generating invoice: {str(e)}")
+            logger.error("Error generating invoice: %s", str(e))
             QMessageBox.critical(self, "Error", f"Failed to generate invoice: {str(e)}")
@@ -7,9 +7,10 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtGui import QIntValidator, QIcon, QFont, QPalette, QColor
 from PyQt6.QtCore import Qt, QTimer, QDate, pyqtSignal
 from database import Session
-from models import Patient, Order, cipher, generate_pid
+from ui.components.query_runner import QueryRunner
+from models import Patient, Order, cipher, generate_pid, patient_search_clause
 from sqlalchemy.sql import and_
-import csv
+from export import export_table
 
 class AddressDialog(QDialog):
     def __init__(self, parent=None, address_data=None):
@@ -289,20 +290,24 @@ class SearchDialog(QDialog):
         session = Session()
         try:
             query = session.query(Patient)
-            if start_date and end_date:  # Date filter takes precedence
-                query = query.filter(and_(Patient.created_at >= start_date, Patient.created_at <= end_date))
-            elif search_by and search_term:  # Fallback to search term if no date filter
-                if search_by == "Name":
-                    query = query.filter(Patient.name.contains(cipher.encrypt(search_term.encode()).decode()))
+            field = {"Name": "name", "Contact": "contact"}.get(search_by)
+            # The date edits always hold a date, so letting the range win (as this
+            # dialog used to) meant a typed search term was never applied.
+            if search_by and search_term:  # Search term takes precedence over the date range
+                if field:
+                    # Encrypted columns are matched through the blind index
+                    query = query.filter(patient_search_clause(field, search_term))
                 elif search_by == "PID":
                     query = query.filter(Patient.pid.ilike(f"%{search_term}%"))
-                elif search_by == "Contact":
-                    query = query.filter(Patient.contact.contains(cipher.encrypt(search_term.encode()).decode()))
+            elif start_date and end_date:
+                query = query.filter(and_(Patient.created_at >= start_date, Patient.created_at <= end_date))
             else:
                 QMessageBox.warning(self, "Error", "Please provide a search term or date range.")
                 return
 
             patients = query.all()
+            if field and search_term:
+                patients = [p for p in patients if p.matches_search(field, search_term)]
             self.results_table.setRowCount(len(patients))
             for row, patient in enumerate(patients):
                 self.results_table.setItem(row, 0, QTableWidgetItem(str(patient.id)))
@@ -330,21 +335,15 @@ class SearchDialog(QDialog):
             QMessageBox.warning(self, "Error", "No search results to export.")
             return
 
-        file_name, _ = QFileDialog.getSaveFileName(self, "Save CSV File", "", "CSV Files (*.csv)")
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, "Save CSV File", "", "CSV Files (*.csv);;Compressed CSV Files (*.csv.gz)")
         if not file_name:
             return
 
         try:
-            with open(file_name, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                headers = ["Title", "PID", "Name", "Age", "Gender", "Contact", "Address"]
-                writer.writerow(headers)
-                for row in range(self.results_table.rowCount()):
-                    row_data = []
-                    for col in range(1, self.results_table.columnCount()):
-                        item = self.results_table.item(row, col)
-                        row_data.append(item.text() if item else "")
-                    writer.writerow(row_data)
+            # Re-read the matched patients from the database instead of the table cells
+            ids = [int(self.results_table.item(row, 0).text()) for row in range(self.results_table.rowCount())]
+            export_table('patients', file_name, ids=ids)
             QMessageBox.information(self, "Success", f"Search results exported to {file_name}")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to export results: {e}")
@@ -357,6 +356,7 @@ class PatientTab(QWidget):
     patient_open_in_order = pyqtSignal(int)
     def __init__(self, current_user=None):
         super().__init__()
+        self.query_runner = QueryRunner(self)
         # Store current user (MainWindow will pass current_user when available)
         self.current_user = current_user
         self.setWindowTitle("Patient Management")
@@ -687,8 +687,6 @@ class PatientTab(QWidget):
         try:
             if not pid:
                 pid = generate_pid()
-                while session.query(Patient).filter_by(pid=pid).first():
-                    pid = generate_pid()
             patient.pid = pid
             patient.title = cipher.encrypt(title.encode()).decode() if title else None
             patient.name = cipher.encrypt(name.encode()).decode()
@@ -722,23 +720,34 @@ class PatientTab(QWidget):
             session.close()
 
     def load_patients(self):
-        session = Session()
-        try:
+        def patient_rows(session):
+            # Runs on a worker thread: query and decrypt, but never touch widgets
             patients = session.query(Patient).all()
-            self.table.setRowCount(len(patients))
-            for row, patient in enumerate(patients):
-                self.table.setItem(row, 0, QTableWidgetItem(str(patient.id)))
-                self.table.setItem(row, 1, QTableWidgetItem(patient.decrypted_title))
-                self.table.setItem(row, 2, QTableWidgetItem(patient.pid if patient.pid else ""))
-                self.table.setItem(row, 3, QTableWidgetItem(patient.decrypted_name))
-                self.table.setItem(row, 4, QTableWidgetItem(str(patient.age) if patient.age else ""))
-                self.table.setItem(row, 5, QTableWidgetItem(patient.gender if patient.gender else ""))
-                self.table.setItem(row, 6, QTableWidgetItem(patient.decrypted_contact if patient.contact else ""))
-                self.table.setItem(row, 7, QTableWidgetItem(patient.decrypted_address if patient.address else ""))
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load patients: {e}")
-        finally:
-            session.close()
+            Patient.prefetch_decrypted(patients)
+            for patient in patients:
+                yield (
+                    str(patient.id),
+                    patient.decrypted_title,
+                    patient.pid if patient.pid else "",
+                    patient.decrypted_name,
+                    str(patient.age) if patient.age else "",
+                    patient.gender if patient.gender else "",
+                    patient.decrypted_contact if patient.contact else "",
+                    patient.decrypted_address if patient.address else ""
+                )
+
+        self.table.setRowCount(0)
+        self.query_runner.submit(
+            'patients', patient_rows, on_chunk=self._append_patient_rows,
+            on_error=lambda message: QMessageBox.critical(self, "Error", f"Failed to load patients: {message}")
+        )
+
+    def _append_patient_rows(self, rows):
+        start = self.table.rowCount()
+        self.table.setRowCount(start + len(rows))
+        for row, values in enumerate(rows, start):
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(value))
 
     def edit_patient(self):
         selected_rows = self.table.selectionModel().selectedRows()
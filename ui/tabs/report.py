@@ -2,15 +2,19 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, QGroupBox,
     QDateEdit, QPushButton, QLabel, QMessageBox, QListWidget,
     QListWidgetItem, QComboBox, QLineEdit, QProgressBar, QDialog,
-    QSpacerItem, QSizePolicy, QFileDialog
+    QSpacerItem, QSizePolicy, QFileDialog, QCheckBox
 )
 from PyQt6.QtCore import QDate, Qt, QTimer
 from PyQt6.QtGui import QIcon
 from database import Session
+from ui.components.query_runner import QueryRunner
 from models import Order, Result, Patient
-from reports.pdf_generator import generate_pdf_report
+from export import iter_export
+from reports.pdf_generator import generate_pdf_report, batch_pdf_reports, merge_pdf_reports, PdfWriter
+from datetime import datetime
+import os
+from sqlalchemy import func, distinct
 from sqlalchemy.orm import joinedload
-import csv
 from PyQt6.QtWidgets import QApplication
 
 class ReportTab(QWidget):
@@ -19,6 +23,7 @@ class ReportTab(QWidget):
 
     def __init__(self):
         super().__init__()
+        self.query_runner = QueryRunner(self)
 
         self.setStyleSheet("""
             QWidget          { 
@@ -171,6 +176,16 @@ class ReportTab(QWidget):
         self.export_pdf_btn.clicked.connect(self.generate_pdf)
         actions_row.addWidget(self.export_pdf_btn)
 
+        self.batch_pdf_btn = QPushButton("Batch PDF")
+        self.batch_pdf_btn.setToolTip("Render one PDF per patient in parallel")
+        self.batch_pdf_btn.clicked.connect(self.generate_batch_pdf)
+        actions_row.addWidget(self.batch_pdf_btn)
+
+        self.merge_batch_check = QCheckBox("Merge")
+        self.merge_batch_check.setToolTip("Also combine the batch into a single PDF")
+        self.merge_batch_check.setEnabled(PdfWriter is not None)
+        actions_row.addWidget(self.merge_batch_check)
+
         self.export_csv_btn = QPushButton("CSV")
         try:
             self.export_csv_btn.setIcon(QIcon("icons/csv_icon.png"))
@@ -195,6 +210,7 @@ class ReportTab(QWidget):
         session = Session()
         try:
             patients = session.query(Patient).all()
+            Patient.prefetch_decrypted(patients, ('name',))
             self.patient_filter.clear()
             self.patient_filter.addItem("All patients", None)
             for p in patients:
@@ -219,17 +235,18 @@ class ReportTab(QWidget):
         self.progress.setVisible(True)
         self.progress.setRange(0, 0)  # Indeterminate progress
 
-        session = Session()
-        try:
+        pid = self.patient_filter.currentData()
+        status = self.status_filter.currentText()
+
+        def order_items(session):
+            # Runs on a worker thread: query and decrypt, but never touch widgets
             q = (session.query(Order)
                  .options(joinedload(Order.patient), joinedload(Order.test))
                  .outerjoin(Result, Order.id == Result.order_id))
 
-            pid = self.patient_filter.currentData()
             if pid:
                 q = q.filter(Order.patient_id == pid)
 
-            status = self.status_filter.currentText()
             if status == "Completed":
                 q = q.filter(Result.id.isnot(None))
             elif status == "Pending":
@@ -237,36 +254,44 @@ class ReportTab(QWidget):
 
             q = q.filter(Order.order_date.between(start, end))
             orders = q.order_by(Order.order_date.desc()).all()
-
-            self.order_list.blockSignals(True)
-            self.order_list.clear()
+            Patient.prefetch_decrypted((order.patient for order in orders), ('name',))
             for order in orders:
                 try:
                     patient_name = order.patient.decrypted_name
                 except Exception:
                     patient_name = "Decryption failed"
                 test_name = order.test.name if order.test else "—"
-                txt = f"#{order.id} | {patient_name} – {test_name} ({order.order_date:%Y-%m-%d})"
-                item = QListWidgetItem(txt)
-                item.setData(Qt.ItemDataRole.UserRole, order.id)
-                item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
-                item.setCheckState(Qt.CheckState.Unchecked)
-                self.order_list.addItem(item)
-            self.order_list.blockSignals(False)
-
-            self.stats_loaded.setText(f"Loaded orders : {len(orders)}")
+                yield order.id, f"#{order.id} | {patient_name} – {test_name} ({order.order_date:%Y-%m-%d})"
+
+        def loaded(total):
+            self.stats_loaded.setText(f"Loaded orders : {total}")
             self.stats_date_range.setText(f"Date range : {start} → {end}")
             self.update_selected_stats()
-
-            if not orders:
+            self._hide_progress()
+            if not total:
                 QMessageBox.information(self, "No data", "No orders match the current filters.")
 
-        except Exception as e:
-            QMessageBox.critical(self, "Database Error", f"Failed to load orders: {str(e)}")
-        finally:
-            session.close()
-            self.progress.setVisible(False)
-            self.progress.setRange(0, 100)
+        def failed(message):
+            self._hide_progress()
+            QMessageBox.critical(self, "Database Error", f"Failed to load orders: {message}")
+
+        self.order_list.clear()
+        self.query_runner.submit('orders', order_items, on_chunk=self._add_order_items,
+                                 on_finished=loaded, on_error=failed)
+
+    def _add_order_items(self, items):
+        self.order_list.blockSignals(True)
+        for order_id, txt in items:
+            item = QListWidgetItem(txt)
+            item.setData(Qt.ItemDataRole.UserRole, order_id)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Unchecked)
+            self.order_list.addItem(item)
+        self.order_list.blockSignals(False)
+
+    def _hide_progress(self):
+        self.progress.setVisible(False)
+        self.progress.setRange(0, 100)
 
     def search_orders(self):
         """Filter orders list based on search text"""
@@ -354,14 +379,84 @@ class ReportTab(QWidget):
             self.progress.setVisible(False)
             self.progress.setRange(0, 100)
 
+    def generate_batch_pdf(self):
+        """Render the selected orders as one PDF per patient in a process pool"""
+        ids = self._get_selected_orders()
+        if not ids:
+            return
+        output_dir = QFileDialog.getExistingDirectory(self, "Save patient reports to")
+        if not output_dir:
+            return
+        merge = self.merge_batch_check.isChecked()
+        with Session() as session:
+            # One report per patient; sizes the progress bar before any worker starts
+            report_count = (session.query(func.count(distinct(Order.patient_id)))
+                            .join(Order.patient).filter(Order.id.in_(ids)).scalar() or 0)
+
+        def render(session):
+            # Runs on a worker thread; the PDFs themselves render in worker processes
+            reports = {}
+            rows = (session.query(Order.id, Order.patient_id, Patient.pid)
+                    .join(Order.patient).filter(Order.id.in_(ids)).order_by(Order.id))
+            for order_id, patient_id, pid in rows:
+                # Grouped by patient: older patients may have no PID, which only labels the file
+                reports.setdefault(pid or f"patient_{patient_id}", []).append(order_id)
+            session.close()
+            yield from batch_pdf_reports(reports, output_dir)
+
+        progress = {'done': [], 'failed': []}
+
+        def report_done(items):
+            for label, pdf_path, error in items:
+                if error:
+                    progress['failed'].append(f"{label}: {error}")
+                else:
+                    progress['done'].append(pdf_path)
+                self.progress.setValue(len(progress['done']) + len(progress['failed']))
+
+        def finished(total):
+            self._set_batch_running(False)
+            message = f"{len(progress['done'])} report(s) saved to:\n{output_dir}"
+            if merge and progress['done']:
+                merged = os.path.join(output_dir, f"reports_{datetime.now():%Y%m%d_%H%M%S}.pdf")
+                try:
+                    merge_pdf_reports(sorted(progress['done']), merged)
+                    message += f"\n\nMerged into:\n{merged}"
+                except Exception as e:
+                    message += f"\n\nMerging failed: {e}"
+            if progress['failed']:
+                message += "\n\nFailed:\n" + "\n".join(progress['failed'][:10])
+                QMessageBox.warning(self, "Batch Report", message)
+            else:
+                QMessageBox.information(self, "Batch Report Complete", message)
+
+        def failed(message):
+            self._set_batch_running(False)
+            QMessageBox.critical(self, "PDF Generation Error", f"Failed to generate reports: {message}")
+
+        self._set_batch_running(True)
+        self.progress.setRange(0, report_count)
+        self.progress.setValue(0)
+        self.query_runner.submit('batch_pdf', render, on_chunk=report_done,
+                                 on_finished=finished, on_error=failed, chunk_size=1)
+
+    def _set_batch_running(self, running):
+        self.export_pdf_btn.setEnabled(not running)
+        self.batch_pdf_btn.setEnabled(not running)
+        if running:
+            self.progress.setVisible(True)
+            self.progress.setRange(0, 0)
+        else:
+            self._hide_progress()
+
     def export_csv(self):
-        """Export selected orders to CSV"""
+        """Export selected orders to CSV, streamed in the background"""
         ids = self._get_selected_orders()
         if not ids:
             return
 
         file_path, _ = QFileDialog.getSaveFileName(
-            self, "Export CSV", "orders_export.csv", "CSV Files (*.csv)"
+            self, "Export CSV", "orders_export.csv", "CSV Files (*.csv);;Compressed CSV Files (*.csv.gz)"
         )
 
         if not file_path:
@@ -370,42 +465,22 @@ class ReportTab(QWidget):
         self.progress.setVisible(True)
         self.progress.setRange(0, len(ids))
 
-        session = Session()
-        try:
-            with open(file_path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(["Order ID", "Patient Name", "Test Name", "Order Date", "Status"])
-
-                for i, oid in enumerate(ids):
-                    order = (session.query(Order)
-                             .options(joinedload(Order.patient), joinedload(Order.test))
-                             .get(oid))
-                    if order:
-                        try:
-                            patient_name = order.patient.decrypted_name
-                        except Exception:
-                            patient_name = "Decryption failed"
-                        test_name = order.test.name if order.test else ""
-                        status = "Completed" if order.results else "Pending"
-                        writer.writerow([
-                            order.id,
-                            patient_name,
-                            test_name,
-                            order.order_date.isoformat(),
-                            status
-                        ])
-                    
-                    self.progress.setValue(i + 1)
-                    QApplication.processEvents()
+        def exported(items):
+            self.progress.setValue(items[-1][0])
 
+        def finished(total):
+            self._hide_progress()
+            self.export_csv_btn.setEnabled(True)
             QMessageBox.information(self, "Export Complete", f"CSV exported to:\n{file_path}")
 
-        except Exception as e:
-            QMessageBox.critical(self, "Export Error", f"Failed to export CSV: {str(e)}")
-        finally:
-            session.close()
-            self.progress.setVisible(False)
-            self.progress.setRange(0, 100)
+        def failed(message):
+            self._hide_progress()
+            self.export_csv_btn.setEnabled(True)
+            QMessageBox.critical(self, "Export Error", f"Failed to export CSV: {message}")
+
+        self.export_csv_btn.setEnabled(False)
+        self.query_runner.submit('export_csv', lambda session: iter_export('orders', file_path, ids),
+                                 on_chunk=exported, on_finished=finished, on_error=failed, chunk_size=1)
 
     def refresh_data(self):
         """Public method to refresh data (called from main window)"""
@@ -10,19 +10,31 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QDate, pyqtSignal
 from PyQt6.QtGui import QIcon, QFont, QAction, QDoubleValidator, QPalette, QColor
 from ui.components.test_table import TestTable
+from ui.components.query_runner import QueryRunner, load_pages
 from database import Session
-from models import Result, Order, Test, Patient, AuditLog, User
+from pagination import KeysetPager, DEFAULT_KEYS, sort_keys
+from models import (
+    Result, Order, Test, Patient, AuditLog, User, patient_search_clause, order_search_query, order_matches_search
+)
 from sqlalchemy.orm import joinedload
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.sql import func
-from sqlalchemy.sql.sqltypes import String
-from sqlalchemy.sql.expression import cast
 import re
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+ORDERS_PAGE_SIZE = 200
+# Orders table column -> pager keys its header sorts on, in SQL. The patient
+# name is encrypted, so that column only sorts the rows already loaded.
+ORDER_SORT_KEYS = {
+    0: (Order.id,),
+    2: sort_keys(Patient.pid),
+    3: sort_keys(Test.name),
+    4: sort_keys(Test.department),
+    5: sort_keys(Order.status),
+    6: DEFAULT_KEYS,
+}
+
 class CollapsibleGroupBox(QGroupBox):
     toggled = pyqtSignal(bool)
 
@@ -201,21 +213,20 @@ class PatientSearchDialog(QDialog):
             query = session.query(Patient)
             if pid:
                 query = query.filter(Patient.pid.contains(pid))
+            if name:
+                query = query.filter(patient_search_clause('name', name))
+            if contact:
+                query = query.filter(patient_search_clause('contact', contact))
             patients = query.all()
             filtered_patients = []
             for patient in patients:
+                # Confirm blind index candidates against the decrypted values
                 try:
-                    p_name = patient.decrypted_name.lower()
-                except Exception as e:
-                    logger.warning(f"Decryption error for patient {patient.id}: {e}")
-                    p_name = ''
-                try:
-                    p_contact = (patient.decrypted_contact or '').lower()
+                    if (not name or patient.matches_search('name', name)) and \
+                            (not contact or patient.matches_search('contact', contact)):
+                        filtered_patients.append(patient)
                 except Exception as e:
-                    logger.warning(f"Decryption error for contact {patient.id}: {e}")
-                    p_contact = ''
-                if (not name or name in p_name) and (not contact or contact in p_contact):
-                    filtered_patients.append(patient)
+                    logger.warning("Decryption error for patient %s: %s", patient.id, e)
             self.patient_table.setRowCount(len(filtered_patients))
             for row, patient in enumerate(filtered_patients):
                 patient_name = patient.decrypted_name if hasattr(patient, 'decrypted_name') else "Decryption Failed"
@@ -226,7 +237,7 @@ class PatientSearchDialog(QDialog):
                 self.patient_table.setItem(row, 3, QTableWidgetItem(patient_contact))
             self.patient_table.resizeColumnsToContents()
         except Exception as e:
-            logger.error(f"Error searching patients: {e}")
+            logger.error("Error searching patients: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to search patients: {str(e)}")
         finally:
             session.close()
@@ -879,7 +890,7 @@ class ResultEntryDialog(QDialog):
             self.perform_calculations()
 
         except Exception as e:
-            logger.error(f"Error loading order: {e}")
+            logger.error("Error loading order: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to load order: {str(e)}")
         finally:
             session.close()
@@ -943,7 +954,7 @@ class ResultEntryDialog(QDialog):
             self.accept()
         except Exception as e:
             session.rollback()
-            logger.error(f"Error saving result: {e}")
+            logger.error("Error saving result: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to save result: {str(e)}")
         finally:
             session.close()
@@ -954,6 +965,7 @@ class ResultEntryDialog(QDialog):
 class ResultTab(QWidget):
     def __init__(self):
         super().__init__()
+        self.query_runner = QueryRunner(self)
         self.selected_patient_id = None
         self.editing_result_id = None
         self.current_user_id = 1  # Replace with actual user ID from login
@@ -1070,9 +1082,14 @@ class ResultTab(QWidget):
         main_layout.addWidget(self.status_label)
 
         self.orders_table = TestTable([], ["ID", "Patient Name", "PID", "Test Name", "Department", "Status", "Order Date"])
-        self.orders_table.table.setSortingEnabled(True)
-        self.orders_table.table.itemDoubleClicked.connect(self.open_result_entry)
-        self.orders_table.table.itemSelectionChanged.connect(self.enable_buttons)
+        # Rows come newest first from the keyset pager and load on scroll;
+        # a header click re-queries in that column's order
+        self.order_sort = (DEFAULT_KEYS, True)
+        self.orders_table.table.horizontalHeader().setSortIndicator(6, Qt.SortOrder.DescendingOrder)
+        self.orders_table.model.set_sort_handler(self.sort_orders)
+        self.orders_table.model.rowsInserted.connect(self._update_orders_status)
+        self.orders_table.table.doubleClicked.connect(self.open_result_entry)
+        self.orders_table.selection_changed.connect(self.enable_buttons)
         self.orders_table.setMinimumHeight(400)
         self.orders_table.setAccessibleName("Orders Table")
         main_layout.addWidget(self.orders_table, stretch=1)
@@ -1118,7 +1135,7 @@ class ResultTab(QWidget):
             for test in tests:
                 self.test_filter.addItem(test.name, test.id)
         except Exception as e:
-            logger.error(f"Error loading tests: {e}")
+            logger.error("Error loading tests: %s", e)
         finally:
             session.close()
 
@@ -1140,86 +1157,105 @@ class ResultTab(QWidget):
         self.status_label.setText("Patient filter cleared")
         self.status_label.setStyleSheet("color: #16a34a; font-weight: bold;")
 
-    def load_orders(self):
-        session = Session()
-        try:
-            query = session.query(Order).join(Order.patient).outerjoin(Order.test)
-
-            # === APPLY FILTERS ===
-            status = self.status_filter.currentText()
-            if status == "Pending":
-                # Use more flexible filtering for pending status
-                query = query.filter(Order.status.in_(['Pending', 'pending', 'PENDING']))
-            elif status == "Completed":
-                # Use more flexible filtering for completed status
-                query = query.filter(Order.status.in_(['Completed', 'completed', 'COMPLETED']))
-
-            department = self.department_filter.currentText()
-            if department != "All":
-                query = query.filter(Test.department == department)
-
-            test_name = self.test_filter.currentText()
-            if test_name != "All":
-                query = query.filter(Test.name == test_name)
+    def _orders_query_builder(self):
+        """Snapshot the filter widgets and return ``build(session)`` for the pager.
+
+        The builder runs on a worker thread, so it must not touch any widget.
+        """
+        status = self.status_filter.currentText()
+        department = self.department_filter.currentText()
+        test_name = self.test_filter.currentText()
+        start = self.start_date.date().toPyDate()
+        end = self.end_date.date().toPyDate()
+        start_dt = datetime.combine(start, datetime.min.time())
+        end_dt = datetime.combine(end + timedelta(days=1), datetime.min.time()) - timedelta(microseconds=1)
+        patient_id = self.selected_patient_id
+        search_text = self.search_input.text().strip()
+
+        # Status values are stored in mixed case by older builds
+        statuses = {
+            "Pending": ['Pending', 'pending', 'PENDING'],
+            "Completed": ['Completed', 'completed', 'COMPLETED'],
+        }.get(status)
+
+        def build(session):
+            # Filters, including the search text, are all applied in SQL
+            return order_search_query(
+                session, search_text,
+                start=start_dt, end=end_dt, statuses=statuses,
+                department=department if department != "All" else None,
+                test_name=test_name if test_name != "All" else None,
+                patient_id=patient_id,
+            )
 
-            start = self.start_date.date().toPyDate()
-            end = self.end_date.date().toPyDate()
-            start_dt = datetime.combine(start, datetime.min.time())
-            end_dt = datetime.combine(end + timedelta(days=1), datetime.min.time()) - timedelta(microseconds=1)
-            query = query.filter(Order.order_date.between(start_dt, end_dt))
+        return build
 
-            if self.selected_patient_id:
-                query = query.filter(Order.patient_id == self.selected_patient_id)
+    def sort_orders(self, column, order):
+        keys = ORDER_SORT_KEYS.get(column)
+        if keys is None:
+            return False
+        self.order_sort = (keys, order == Qt.SortOrder.DescendingOrder)
+        self.load_orders()
 
-            # === ADD SEARCH FILTER ===
+    def load_orders(self):
+        try:
+            # First page (and the COUNT) load in the background, later pages on scroll
             search_text = self.search_input.text().strip()
-            if search_text:
-                # Search in patient name, PID, or test name
-                query = query.join(Patient).join(Test).filter(
-                    cast(Order.id, String).ilike(f'%{search_text}%') |
-                    Patient.pid.ilike(f'%{search_text}%') |
-                    Test.name.ilike(f'%{search_text}%')
-                )
-
-            # === EXECUTE QUERY ===
-            orders = query.order_by(Order.order_date.desc()).all()
-
-            # === DEBUG: Check what orders are being fetched ===
-            print(f"DEBUG: Found {len(orders)} orders")
-            for order in orders:
-                print(f"  Order {order.id}: Status='{order.status}', Patient={order.patient_id}, Test={order.test_id}")
-
-            # === POPULATE TABLE ===
-            self._populate_orders_table(orders)
+            keys, descending = self.order_sort
+            # Blind index candidates are confirmed in _order_rows, so a search may drop some
+            self.order_pager = KeysetPager(self._orders_query_builder(),
+                                           lambda orders: self._order_rows(orders, search_text),
+                                           page_size=ORDERS_PAGE_SIZE, keys=keys, descending=descending,
+                                           exact=not search_text)
 
             # === STATUS UPDATE ===
-            count = len(orders)
             filters = []
+            status = self.status_filter.currentText()
+            department = self.department_filter.currentText()
+            test_name = self.test_filter.currentText()
             if status != "All": filters.append(status)
             if department != "All": filters.append(department)
             if test_name != "All": filters.append(f"'{test_name}'")
             filter_text = f" ({', '.join(filters)})" if filters else ""
             patient_text = f" (Patient ID: {self.selected_patient_id})" if self.selected_patient_id else ""
+            self.orders_status_suffix = f"{patient_text}{filter_text}"
 
-            self.status_label.setText(f"Loaded {count} order(s){patient_text}{filter_text}")
-            self.status_label.setStyleSheet("color: #16a34a; font-weight: bold;")
-
+            self.status_label.setText("Loading orders...")
+            load_pages(self.query_runner, 'orders', self.orders_table, self.order_pager,
+                       on_update=self._update_orders_status, on_error=self._orders_load_failed)
         except Exception as e:
-            logger.error(f"Error loading orders: {e}")
-            self.status_label.setText(f"Error: {str(e)[:60]}")
-            self.status_label.setStyleSheet("color: #ef4444; font-weight: bold;")
-            QMessageBox.critical(self, "Database Error", f"Failed to load orders:\n{e}")
-        finally:
-            session.close()
+            self._orders_load_failed(str(e))
+
+    def _orders_load_failed(self, message):
+        logger.error("Error loading orders: %s", message)
+        self.status_label.setText(f"Error: {message[:60]}")
+        self.status_label.setStyleSheet("color: #ef4444; font-weight: bold;")
+        QMessageBox.critical(self, "Database Error", f"Failed to load orders:\n{message}")
+
+    def _update_orders_status(self, *args):
+        pager = getattr(self, 'order_pager', None)
+        total, exact = pager.matched() if pager is not None else (None, False)
+        if total is None:
+            return
+        shown = self.orders_table.model.rowCount()
+        self.status_label.setText(
+            f"Showing {shown} of {'' if exact else 'up to '}{total} order(s){self.orders_status_suffix}")
+        self.status_label.setStyleSheet("color: #16a34a; font-weight: bold;")
 
-    def _populate_orders_table(self, orders):
+    def _order_rows(self, orders, search_text=""):
+        # Decrypt all patient names in one parallel batch instead of per row
+        Patient.prefetch_decrypted((order.patient for order in orders),
+                                   ('name', 'contact') if search_text else ('name',))
+        if search_text:
+            # Drop the rare blind index false positives
+            orders = [order for order in orders if order_matches_search(order, search_text)]
         data = []
         for order in orders:
             # === ULTRA-SAFE PATIENT NAME ===
             try:
                 patient_name = order.patient.decrypted_name
             except Exception as e:
-                logger.warning(f"Decryption failed for patient {order.patient_id}: {e}")
+                logger.warning("Decryption failed for patient %s: %s", order.patient_id, e)
                 patient_name = f"[Encrypted] PID-{order.patient_id}"
 
             # === SAFE FALLBACKS ===
@@ -1238,16 +1274,14 @@ class ResultTab(QWidget):
                 status,
                 order_date
             ))
-
-        self.orders_table.update_data(data)
-        print(f"DEBUG: Populated {len(data)} orders in table")  # Remove later
+        return data
 
     def open_result_entry(self, item=None):
-        selected_row = self.orders_table.table.currentRow()
+        selected_row = self.orders_table.current_row()
         if selected_row < 0:
             QMessageBox.warning(self, "Warning", "Please select an order to enter results.")
             return
-        order_id = int(self.orders_table.table.item(selected_row, 0).text())
+        order_id = int(self.orders_table.cell(selected_row, 0))
         session = Session()
         try:
             has_result = session.query(Result).filter_by(order_id=order_id).first() is not None
@@ -1268,17 +1302,17 @@ class ResultTab(QWidget):
                 self.load_orders()
                 self.clear_form()
         except Exception as e:
-            logger.error(f"Error opening result entry: {e}")
+            logger.error("Error opening result entry: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to open result entry: {str(e)}")
         finally:
             session.close()
 
     def edit_result(self):
-        selected_row = self.orders_table.table.currentRow()
+        selected_row = self.orders_table.current_row()
         if selected_row < 0:
             QMessageBox.warning(self, "Error", "Please select an order to edit")
             return
-        order_id = int(self.orders_table.table.item(selected_row, 0).text())
+        order_id = int(self.orders_table.cell(selected_row, 0))
         session = Session()
         try:
             result = session.query(Result).filter_by(order_id=order_id).first()
@@ -1291,18 +1325,18 @@ class ResultTab(QWidget):
             else:
                 QMessageBox.warning(self, "Warning", "No result found for this order. Please enter a result first.")
         except Exception as e:
-            logger.error(f"Failed to load result: {e}")
+            logger.error("Failed to load result: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to load result: {str(e)}")
         finally:
             session.close()
 
     def delete_result(self):
-        selected_row = self.orders_table.table.currentRow()
+        selected_row = self.orders_table.current_row()
         if selected_row < 0:
             QMessageBox.warning(self, "Error", "Please select an order to delete result")
             return
-        order_id = int(self.orders_table.table.item(selected_row, 0).text())
-        test_name = self.orders_table.table.item(selected_row, 3).text()
+        order_id = int(self.orders_table.cell(selected_row, 0))
+        test_name = self.orders_table.cell(selected_row, 3)
         session = Session()
         try:
             result = session.query(Result).filter_by(order_id=order_id).first()
@@ -1340,23 +1374,23 @@ class ResultTab(QWidget):
                 self.clear_form()
         except Exception as e:
             session.rollback()
-            logger.error(f"Error deleting result: {e}")
+            logger.error("Error deleting result: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to delete result: {str(e)}")
         finally:
             session.close()
 
     def enable_buttons(self):
-        selected = self.orders_table.table.currentRow() >= 0
+        selected = self.orders_table.current_row() >= 0
         self.enter_result_btn.setEnabled(selected)
         if selected:
-            order_id = int(self.orders_table.table.item(self.orders_table.table.currentRow(), 0).text())
+            order_id = int(self.orders_table.cell(self.orders_table.current_row(), 0))
             session = Session()
             try:
                 result = session.query(Result).filter_by(order_id=order_id).first()
                 self.edit_btn.setEnabled(result is not None)
                 self.delete_btn.setEnabled(result is not None)
             except Exception as e:
-                logger.error(f"Error checking result: {e}")
+                logger.error("Error checking result: %s", e)
                 self.edit_btn.setEnabled(False)
                 self.delete_btn.setEnabled(False)
             finally:
@@ -416,7 +416,7 @@ class TestTab(QWidget):
         
         self.table = TestTable([], ["ID", "Code", "Name", "Department", "Rate (INR)", "Template", "Notes"])
         self.table.table.setAlternatingRowColors(True)
-        self.table.table.itemSelectionChanged.connect(self.on_test_selected)
+        self.table.selection_changed.connect(self.on_test_selected)
         table_scroll.setWidget(self.table)
         main_layout.addWidget(table_scroll, 1)
 
@@ -502,12 +502,12 @@ class TestTab(QWidget):
             self.save_test(test_data)
 
     def edit_test(self):
-        sel = self.table.table.selectedItems()
-        if not sel or len(sel) < 7:
+        sel = self.table.selected_rows()
+        if not sel:
             QMessageBox.warning(self, "Error", "Please select a test to edit.")
             return
-        row = self.table.table.currentRow()
-        test_id = int(self.table.table.item(row, 0).text())
+        row = self.table.current_row()
+        test_id = int(self.table.cell(row, 0))
         session = Session()
         try:
             test = session.query(Test).filter_by(id=test_id).first()
@@ -591,12 +591,12 @@ class TestTab(QWidget):
             session.close()
 
     def delete_test(self):
-        sel = self.table.table.selectedItems()
-        if not sel or len(sel) < 7:
+        sel = self.table.selected_rows()
+        if not sel:
             QMessageBox.warning(self, "Error", "Please select a test to delete.")
             return
-        row = self.table.table.currentRow()
-        test_id = int(self.table.table.item(row, 0).text())
+        row = self.table.current_row()
+        test_id = int(self.table.cell(row, 0))
         reply = QMessageBox.question(self, "Confirm Delete", "Delete this test?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
             session = Session()
@@ -615,12 +615,12 @@ class TestTab(QWidget):
                 session.close()
 
     def export_test(self):
-        sel = self.table.table.selectedItems()
-        if not sel or len(sel) < 7:
+        sel = self.table.selected_rows()
+        if not sel:
             QMessageBox.warning(self, "Error", "Select a test to export.")
             return
-        row = self.table.table.currentRow()
-        test_id = int(self.table.table.item(row, 0).text())
+        row = self.table.current_row()
+        test_id = int(self.table.cell(row, 0))
         session = Session()
         try:
             test = session.query(Test).filter_by(id=test_id).first()
@@ -777,7 +777,7 @@ class TestTab(QWidget):
             session.close()
 
     def on_test_selected(self):
-        sel = bool(self.table.table.selectedItems())
+        sel = bool(self.table.selected_rows())
         self.edit_test_btn.setEnabled(sel)
         self.delete_test_btn.setEnabled(sel)
         self.export_test_btn.setEnabled(sel)
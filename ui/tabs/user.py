@@ -5,6 +5,9 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt
 from database import Session
 from models import User, ReferringPhysician, Location
+import logging
+
+logger = logging.getLogger(__name__)
 
 class EditUserDialog(QDialog):
     def __init__(self, username, role, parent=None):
@@ -195,49 +198,49 @@ class UserTab(QWidget):
         session.close()
 
     def add_user(self):
-        print("Add user clicked")
+        logger.debug("Add user clicked")
 
     def edit_user(self):
         row = self.user_table.currentRow()
         if row < 0:
-            print("No user row selected")
+            logger.debug("No user row selected")
             return
         user_id = int(self.user_table.item(row, 0).text())
         username = self.user_table.item(row, 1).text()
         role = self.user_table.item(row, 2).text()
-        print(f"Edit user {user_id}: username={username}, role={role}")
+        logger.debug("Edit user %s: username=%s, role=%s", user_id, username, role)
 
     def delete_user(self):
-        print("Delete user clicked")
+        logger.debug("Delete user clicked")
 
     def add_referring_physician(self):
-        print("Add referring physician clicked")
+        logger.debug("Add referring physician clicked")
 
     def edit_referring_physician(self):
         row = self.physician_table.currentRow()
         if row < 0:
-            print("No physician row selected")
+            logger.debug("No physician row selected")
             return
         phys_id = int(self.physician_table.item(row, 0).text())
         name = self.physician_table.item(row, 1).text()
         specialty = self.physician_table.item(row, 2).text()
-        print(f"Edit physician {phys_id}: name={name}, specialty={specialty}")
+        logger.debug("Edit physician %s: name=%s, specialty=%s", phys_id, name, specialty)
 
     def delete_referring_physician(self):
-        print("Delete referring physician clicked")
+        logger.debug("Delete referring physician clicked")
 
     def add_location(self):
-        print("Add location clicked")
+        logger.debug("Add location clicked")
 
     def edit_location(self):
         row = self.location_table.currentRow()
         if row < 0:
-            print("No location row selected")
+            logger.debug("No location row selected")
             return
         loc_id = int(self.location_table.item(row, 0).text())
         name = self.location_table.item(row, 1).text()
         address = self.location_table.item(row, 2).text()
-        print(f"Edit location {loc_id}: name={name}, address={address}")
+        logger.debug("Edit location %s: name=%s, address=%s", loc_id, name, address)
 
     def delete_location(self):
-        print("Delete location clicked")
+        logger.debug("Delete location clicked")